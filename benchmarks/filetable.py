@@ -0,0 +1,89 @@
+"""
+Micro-benchmark: scanner internals on a List[Path] versus a FileTable.
+
+Generates N synthetic relative paths (no disk access) and times the work
+the scanner does per file in both representations:
+- build the listing from the sorted relative paths,
+- count files per extension (language detection),
+- derive every relative path again (context map and Repository Map).
+
+Peak memory of the listing itself is measured with tracemalloc.
+
+Usage: python benchmarks/filetable.py [--files 1000000] [--json]
+"""
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+from collections import Counter
+from pathlib import Path
+
+from vdoc.filetable import FileTable
+
+ROOT = Path("/repo")
+EXTENSIONS = [".py", ".ts", ".tsx", ".go", ".md", ".json", ".css", ""]
+
+def synthetic_paths(n: int) -> list:
+    """Sorted paths spread over a few thousand directories, up to six levels deep."""
+    rels = []
+    for i in range(n):
+        parts = [f"pkg{i % 7}", f"mod{i % 53}", f"sub{i % 211}", f"leaf{i % 997}"][: 1 + i % 4]
+        rels.append("/".join(parts + [f"file{i}{EXTENSIONS[i % len(EXTENSIONS)]}"]))
+    rels.sort()
+    return rels
+
+def path_pipeline(rels: list) -> int:
+    files = [ROOT / rel for rel in rels]
+    languages = Counter(f.suffix for f in files)
+    derived = sum(len(f.relative_to(ROOT).as_posix()) for f in files)
+    return len(languages) + derived
+
+def table_pipeline(rels: list) -> int:
+    table = FileTable(ROOT, rels)
+    languages = table.suffix_counts()
+    derived = sum(len(rel) for rel in table.rels())
+    return len(languages) + derived
+
+def timed(fn, rels: list) -> float:
+    start = time.perf_counter()
+    fn(rels)
+    return (time.perf_counter() - start) * 1000
+
+def listing_bytes(build, rels: list) -> int:
+    tracemalloc.start()
+    listing = build(rels)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del listing
+    return size
+
+def run(n: int) -> dict:
+    rels = synthetic_paths(n)
+    assert path_pipeline(rels) == table_pipeline(rels)
+    return {
+        "files": n,
+        "path_ms": round(timed(path_pipeline, rels), 1),
+        "table_ms": round(timed(table_pipeline, rels), 1),
+        # Path objects cache their string form once used, as the scanner does
+        "path_bytes": listing_bytes(lambda r: [p for p in (ROOT / rel for rel in r) if str(p)], rels),
+        "table_bytes": listing_bytes(lambda r: FileTable(ROOT, r), rels),
+    }
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--files", type=int, default=1_000_000)
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    result = run(args.files)
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print(f"{result['files']} files")
+        print(f"List[Path]: {result['path_ms']} ms, {result['path_bytes'] / 2**20:.1f} MiB")
+        print(f"FileTable:  {result['table_ms']} ms, {result['table_bytes'] / 2**20:.1f} MiB")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,133 @@
+"""
+Latency benchmark: a warm `vdoc serve` versus one CLI process per request.
+
+Generates a synthetic project of N source files, then measures
+- the CLI path: `vdoc update` in a fresh interpreter, which is what an agent
+  runs to get an up-to-date context map (scan cache warm after the first run),
+- the server path: one `vdoc serve` process (startup until `initialize` is
+  answered, reported separately), then round trips of `tools/call
+  context_map` and `prompts/get vdoc-update` over stdio.
+
+Usage: python benchmarks/serve.py [--files 5000] [--requests 20] [--cli-runs 5] [--json]
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+def make_project(root: Path, n: int) -> None:
+    (root / ".vdoc").mkdir()
+    for i in range(n):
+        d = root / "src" / f"pkg{i % 50:02d}" / f"mod{i % 7}"
+        d.mkdir(parents=True, exist_ok=True)
+        (d / f"file{i}.py").write_text(f"class Model{i}:\n    pass\n\ndef handler_{i}():\n    return {i}\n")
+    (root / "pyproject.toml").write_text('[project]\nname = "bench"\ndependencies = ["fastapi"]\n')
+
+def percentile(samples: list, q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+def summary(samples: list) -> dict:
+    return {
+        "median_ms": round(statistics.median(samples), 2),
+        "p95_ms": round(percentile(samples, 0.95), 2),
+    }
+
+def cli_latencies(root: Path, runs: int) -> list:
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-m", "vdoc.main", "update"], cwd=root, capture_output=True, check=True)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+class Client:
+    def __init__(self, root: Path):
+        self.proc = subprocess.Popen(
+            [sys.executable, "-m", "vdoc.main", "serve", "--no-watch"],
+            cwd=root, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True,
+        )
+        self.next_id = 0
+
+    def request(self, method: str, params: dict) -> dict:
+        self.next_id += 1
+        self.proc.stdin.write(json.dumps({"jsonrpc": "2.0", "id": self.next_id, "method": method, "params": params}) + "\n")
+        self.proc.stdin.flush()
+        response = json.loads(self.proc.stdout.readline())
+        if "error" in response:
+            raise RuntimeError(response["error"]["message"])
+        return response["result"]
+
+    def close(self) -> None:
+        self.proc.stdin.close()
+        self.proc.wait(timeout=30)
+
+def server_latencies(root: Path, requests: int) -> dict:
+    start = time.perf_counter()
+    client = Client(root)
+    try:
+        client.request("initialize", {"protocolVersion": "2024-11-05", "capabilities": {}})
+        startup = (time.perf_counter() - start) * 1000
+        samples = {"context_map": [], "update_prompt": []}
+        for _ in range(requests):
+            t = time.perf_counter()
+            client.request("tools/call", {"name": "context_map", "arguments": {}})
+            samples["context_map"].append((time.perf_counter() - t) * 1000)
+            t = time.perf_counter()
+            client.request("prompts/get", {"name": "vdoc-update", "arguments": {}})
+            samples["update_prompt"].append((time.perf_counter() - t) * 1000)
+    finally:
+        client.close()
+    return {"startup_ms": round(startup, 2), **{k: summary(v) for k, v in samples.items()}}
+
+def run(files: int, requests: int, cli_runs: int) -> dict:
+    root = Path(tempfile.mkdtemp(prefix="vdoc-serve-bench-"))
+    env_key = "VDOC_API_URL"
+    saved = os.environ.pop(env_key, None)
+    try:
+        make_project(root, files)
+        # Warm the scan cache so both paths start from the same state
+        cli_latencies(root, 1)
+        cli = summary(cli_latencies(root, cli_runs))
+        server = server_latencies(root, requests)
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+        if saved is not None:
+            os.environ[env_key] = saved
+    return {
+        "files": files,
+        "requests": requests,
+        "cli_update": cli,
+        "server": server,
+        "speedup": round(cli["median_ms"] / max(server["update_prompt"]["median_ms"], 0.01), 1),
+    }
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--files", type=int, default=5000)
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--cli-runs", type=int, default=5)
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    result = run(args.files, args.requests, args.cli_runs)
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return 0
+    server = result["server"]
+    print(f"{result['files']} files")
+    print(f"CLI `vdoc update`:        median {result['cli_update']['median_ms']} ms, p95 {result['cli_update']['p95_ms']} ms")
+    print(f"server startup:           {server['startup_ms']} ms (once)")
+    print(f"server context_map:       median {server['context_map']['median_ms']} ms, p95 {server['context_map']['p95_ms']} ms")
+    print(f"server vdoc-update:       median {server['update_prompt']['median_ms']} ms, p95 {server['update_prompt']['p95_ms']} ms")
+    print(f"speedup per request:      {result['speedup']}x")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
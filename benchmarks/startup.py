@@ -0,0 +1,87 @@
+"""
+Cold-start benchmark for the vdoc CLI.
+
+Runs `python -X importtime -c "import vdoc.main"` and `python -m vdoc.main --help`
+in fresh interpreters and reports median timings. Exits non-zero when:
+- any heavy dependency (GitPython, httpx, pydantic, toml, multiprocessing) is
+  imported just to build the CLI, or
+- vdoc's own import overhead (vdoc.main minus typer) exceeds the threshold.
+
+Usage: python benchmarks/startup.py [--runs 7] [--max-overhead-ms 25] [--json]
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+HEAVY_MODULES = ["git", "httpx", "pydantic", "toml", "multiprocessing", "vdoc.scanner", "vdoc.commands.init"]
+
+def import_times() -> dict:
+    """Cumulative import time (µs) per top-level module for one cold `import vdoc.main`."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import vdoc.main"],
+        capture_output=True, text=True, check=True,
+    )
+    times = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        try:
+            times[name.strip()] = int(cumulative)
+        except ValueError:
+            continue
+    return times
+
+def loaded_heavy_modules() -> list:
+    code = (
+        "import sys, vdoc.main; "
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout.strip()
+    return [m for m in out.split(",") if m]
+
+def help_wall_ms() -> float:
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-m", "vdoc.main", "--help"], capture_output=True, check=True)
+    return (time.perf_counter() - start) * 1000
+
+def run(runs: int) -> dict:
+    samples = [import_times() for _ in range(runs)]
+    total = [s.get("vdoc.main", 0) / 1000 for s in samples]
+    overhead = [(s.get("vdoc.main", 0) - s.get("typer", 0)) / 1000 for s in samples]
+    return {
+        "runs": runs,
+        "import_ms": round(statistics.median(total), 2),
+        "overhead_ms": round(statistics.median(overhead), 2),
+        "help_wall_ms": round(statistics.median(help_wall_ms() for _ in range(runs)), 2),
+        "heavy_modules": loaded_heavy_modules(),
+    }
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=7)
+    parser.add_argument("--max-overhead-ms", type=float, default=25.0)
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    result = run(args.runs)
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print(f"import vdoc.main: {result['import_ms']} ms (vdoc overhead {result['overhead_ms']} ms)")
+        print(f"vdoc --help wall: {result['help_wall_ms']} ms")
+
+    failed = False
+    if result["heavy_modules"]:
+        print(f"REGRESSION: heavy modules imported at startup: {', '.join(result['heavy_modules'])}", file=sys.stderr)
+        failed = True
+    if result["overhead_ms"] > args.max_overhead_ms:
+        print(f"REGRESSION: import overhead {result['overhead_ms']} ms > {args.max_overhead_ms} ms", file=sys.stderr)
+        failed = True
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
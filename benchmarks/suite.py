@@ -0,0 +1,218 @@
+"""
+Benchmark suite: scanner stages and commands on synthetic repositories.
+
+For every combination of size, shape and kind (git / plain) a deterministic
+repository is generated (see synthrepo.py; reused between runs) and these
+stages are timed (median wall and CPU time over --repeat runs), then run
+once more under tracemalloc for their peak Python memory:
+
+- list_files:       get_repo_files without the scan cache
+- analyze:          analyze_project_root (languages, manifests, frameworks)
+- symbols:          build_repository_map without the scan cache
+- imports:          build_import_graph without the scan cache
+- render:           iter_context_map of the scan
+- context_map_warm: generate_context_map with a warm scan cache
+- update:           `vdoc update --save` (warm cache, built-in prompts)
+- plan:             `vdoc plan --save`
+
+Results can be saved as a baseline and later runs compared against it; the
+exit status is 1 when a stage got slower than the tolerance allows.
+
+Usage: python benchmarks/suite.py [--sizes 1k,100k] [--shapes balanced,deep,wide]
+                                  [--kinds plain,git] [--manifests 20] [--repeat 3]
+                                  [--workdir DIR] [--save-baseline FILE]
+                                  [--baseline FILE] [--tolerance 0.25] [--json]
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+import synthrepo  # noqa: E402
+
+from vdoc import imports, scanner, symbols  # noqa: E402
+from vdoc.cache import ScanCache  # noqa: E402
+
+# Slowdowns smaller than this (ms) are treated as noise when comparing
+NOISE_FLOOR_MS = 5.0
+
+def parse_size(text: str) -> int:
+    text = text.strip().lower()
+    scale = {"k": 1_000, "m": 1_000_000}.get(text[-1:], 1)
+    return int(float(text[:-1] if scale > 1 else text) * scale)
+
+def _stages(root: Path) -> list:
+    """(name, callable) in run order; later stages rely on the state earlier ones leave."""
+    state = {}
+
+    def list_files():
+        state["files"] = scanner.get_repo_files(root, None)
+
+    def analyze():
+        state["stats"] = scanner.analyze_project_root(root, state["files"], None)
+
+    def build_symbols():
+        state["repo_map"] = symbols.build_repository_map(root, state["files"], None)
+
+    def build_imports():
+        state["import_graph"] = imports.build_import_graph(root, state["files"], None)
+
+    def render():
+        table = scanner.as_table(root, state["files"])
+        scan = scanner.ProjectScan(root, table, state["stats"], state["repo_map"], state["import_graph"])
+        with open(root / ".vdoc" / "context_map.md", "w") as f:
+            for line in scanner.iter_context_map(scan):
+                f.write(line + "\n")
+
+    def context_map_warm():
+        scanner.generate_context_map(root, use_cache=True)
+
+    def update():
+        from vdoc.commands import update as update_command
+        update_command.run_update(save=True)
+
+    def plan():
+        from vdoc.commands import plan as plan_command
+        plan_command.run_plan(save=True)
+
+    return [
+        ("list_files", list_files),
+        ("analyze", analyze),
+        ("symbols", build_symbols),
+        ("imports", build_imports),
+        ("render", render),
+        ("context_map_warm", context_map_warm),
+        ("update", update),
+        ("plan", plan),
+    ]
+
+def _prepare(root: Path) -> None:
+    """Resets what the commands leave behind, then primes the scan cache."""
+    shutil.rmtree(root / "product_documentation", ignore_errors=True)
+    for name in ("scan_cache.json", "fingerprints.json", "state.db", "state.db-wal", "state.db-shm", "doc_index.json"):
+        with contextlib.suppress(OSError):
+            (root / ".vdoc" / name).unlink()
+    (root / ".vdoc" / "spec.md").write_text("# Documentation Specification\n\nDocument the architecture.\n")
+    cache = ScanCache(root)
+    scanner.analyze_project_root(root, scanner.get_file_table(root, cache), cache)
+    symbols.build_repository_map(root, scanner.get_file_table(root, cache), cache)
+    imports.build_import_graph(root, scanner.get_file_table(root, cache), cache)
+    cache.save()
+
+def run_case(root: Path, repeat: int) -> dict:
+    """Timings and peak memory per stage for one generated repository."""
+    cwd = os.getcwd()
+    os.chdir(root)
+    results = {}
+    try:
+        _prepare(root)
+        sink = io.StringIO()
+        samples = {}
+        for _ in range(repeat):
+            for name, stage in _stages(root):
+                wall, cpu = time.perf_counter(), time.process_time()
+                with contextlib.redirect_stdout(sink):
+                    stage()
+                samples.setdefault(name, []).append(
+                    ((time.perf_counter() - wall) * 1000, (time.process_time() - cpu) * 1000)
+                )
+                sink.seek(0)
+                sink.truncate()
+        peaks = {}
+        for name, stage in _stages(root):
+            tracemalloc.start()
+            with contextlib.redirect_stdout(sink):
+                stage()
+            peaks[name] = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            sink.seek(0)
+            sink.truncate()
+        for name, runs in samples.items():
+            results[name] = {
+                "wall_ms": round(statistics.median(w for w, _ in runs), 2),
+                "cpu_ms": round(statistics.median(c for _, c in runs), 2),
+                "peak_mib": round(peaks[name] / 2**20, 2),
+            }
+    finally:
+        os.chdir(cwd)
+    return results
+
+def compare(current: dict, baseline: dict, tolerance: float) -> list:
+    """Rows of (stage key, baseline ms, current ms, ratio, regressed) for stages present in both."""
+    rows = []
+    for key, now in current.items():
+        before = baseline.get(key)
+        if before is None:
+            continue
+        ratio = now["wall_ms"] / max(before["wall_ms"], 0.01)
+        regressed = ratio > 1 + tolerance and now["wall_ms"] - before["wall_ms"] > NOISE_FLOOR_MS
+        rows.append((key, before["wall_ms"], now["wall_ms"], round(ratio, 2), regressed))
+    return rows
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", default="1k", help="Comma-separated file counts (1k, 100k, 1m, 2500 ...)")
+    parser.add_argument("--shapes", default="balanced", help=f"Comma-separated, of: {', '.join(synthrepo.SHAPES)}")
+    parser.add_argument("--kinds", default="plain,git", help="Comma-separated, of: plain, git")
+    parser.add_argument("--manifests", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--workdir", type=Path, default=Path(tempfile.gettempdir()) / "vdoc-bench")
+    parser.add_argument("--save-baseline", type=Path, help="Write the results to this file")
+    parser.add_argument("--baseline", type=Path, help="Compare against a saved baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown (0.25 = 25%%)")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    results = {}
+    for size in args.sizes.split(","):
+        files = parse_size(size)
+        for shape in args.shapes.split(","):
+            for kind in args.kinds.split(","):
+                case = f"{size.strip()}-{shape}-{kind}"
+                root = synthrepo.generate(
+                    args.workdir / case, files=files, shape=shape, manifests=args.manifests, git=kind == "git"
+                )
+                for stage, numbers in run_case(root, args.repeat).items():
+                    results[f"{case}/{stage}"] = numbers
+
+    report = {"python": sys.version.split()[0], "results": results}
+    if args.save_baseline:
+        args.save_baseline.write_text(json.dumps(report, indent=2))
+
+    rows = []
+    if args.baseline:
+        rows = compare(results, json.loads(args.baseline.read_text())["results"], args.tolerance)
+        report["comparison"] = [
+            {"stage": key, "baseline_ms": before, "current_ms": now, "ratio": ratio, "regressed": regressed}
+            for key, before, now, ratio, regressed in rows
+        ]
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"{'stage':<44} {'wall ms':>10} {'cpu ms':>10} {'peak MiB':>9}")
+        for key, numbers in results.items():
+            print(f"{key:<44} {numbers['wall_ms']:>10} {numbers['cpu_ms']:>10} {numbers['peak_mib']:>9}")
+        if rows:
+            print(f"\n{'stage':<44} {'baseline':>10} {'current':>10} {'ratio':>6}")
+            for key, before, now, ratio, regressed in rows:
+                flag = "  REGRESSION" if regressed else ""
+                print(f"{key:<44} {before:>10} {now:>10} {ratio:>6}{flag}")
+
+    regressions = [key for key, *_, regressed in rows if regressed]
+    if regressions:
+        print(f"REGRESSION: slower than baseline by more than {args.tolerance:.0%}: {', '.join(regressions)}", file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,113 @@
+"""
+Deterministic synthetic repository generator for the benchmarks.
+
+The same arguments always produce the same tree (paths, contents and
+manifests), so timings from different runs and machines are comparable.
+
+Shapes:
+- wide:     one level of many directories (about sqrt(N) of them)
+- deep:     a binary tree of directories twelve levels deep
+- balanced: three levels with an even fan-out
+
+Usage: python benchmarks/synthrepo.py DEST [--files 1000] [--shape balanced]
+                                            [--manifests 20] [--git] [--seed 0]
+"""
+import argparse
+import json
+import math
+import random
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+SHAPES = ("wide", "deep", "balanced")
+# Marker recording the parameters a tree was generated with (for reuse);
+# inside .vdoc/ so that it is never part of the scanned tree
+MARKER = ".vdoc/synthrepo.json"
+
+_SOURCES = [
+    (".py", "import os\n\nclass {Name}:\n    def run(self):\n        return {n}\n\ndef {name}_handler(event):\n    return {Name}().run()\n"),
+    (".ts", "export interface {Name}Props {{ id: number }}\n\nexport function {name}Handler(p: {Name}Props) {{\n  return p.id + {n};\n}}\n"),
+    (".go", "package {name}\n\ntype {Name} struct {{ ID int }}\n\nfunc New{Name}() *{Name} {{\n\treturn &{Name}{{ID: {n}}}\n}}\n"),
+    (".js", "const {name} = require('./util');\n\nfunction {name}Task() {{\n  return {n};\n}}\n\nmodule.exports = {{ {name}Task }};\n"),
+    (".md", "# {Name}\n\nNotes for component {n}.\n"),
+    (".json", '{{"name": "{name}", "id": {n}}}\n'),
+]
+
+_MANIFESTS = [
+    ("package.json", lambda name: json.dumps({"name": name, "dependencies": {"react": "^18.0.0", "express": "^4.0.0"}})),
+    ("pyproject.toml", lambda name: f'[project]\nname = "{name}"\ndependencies = ["fastapi>=0.100", "httpx"]\n'),
+    ("go.mod", lambda name: f"module example.com/{name}\n\ngo 1.21\n\nrequire github.com/gin-gonic/gin v1.9.1\n"),
+]
+
+def _dirs(n_files: int, shape: str) -> list:
+    """Directory for each file index (deterministic in n_files and shape)."""
+    if shape == "wide":
+        width = max(1, int(math.sqrt(n_files)))
+        return [f"d{i % width:05d}" for i in range(n_files)]
+    if shape == "deep":
+        return ["/".join(f"l{level}{(i >> level) & 1}" for level in range(12)) for i in range(n_files)]
+    fanout = max(2, round(n_files ** 0.25))
+    return [f"pkg{i % fanout:03d}/mod{(i // fanout) % fanout:03d}/sub{(i // fanout ** 2) % fanout:03d}" for i in range(n_files)]
+
+def generate(dest: Path, files: int = 1000, shape: str = "balanced", manifests: int = 20, git: bool = False, seed: int = 0) -> Path:
+    """
+    Writes the synthetic repository to dest (replacing it) unless dest already
+    holds one generated with the same parameters. Returns dest.
+    """
+    if shape not in SHAPES:
+        raise ValueError(f"unknown shape: {shape}")
+    params = {"files": files, "shape": shape, "manifests": manifests, "git": git, "seed": seed}
+    try:
+        if json.loads((dest / MARKER).read_text()) == params:
+            return dest
+    except (OSError, ValueError):
+        pass
+    if dest.exists():
+        shutil.rmtree(dest)
+    dest.mkdir(parents=True)
+
+    rng = random.Random(seed)
+    dirs = _dirs(files, shape)
+    made = set()
+    for i, rel_dir in enumerate(dirs):
+        if rel_dir not in made:
+            (dest / rel_dir).mkdir(parents=True, exist_ok=True)
+            made.add(rel_dir)
+        ext, template = _SOURCES[i % len(_SOURCES)]
+        name = f"c{rng.randrange(1 << 30):08x}"
+        (dest / rel_dir / f"f{i:07d}{ext}").write_text(template.format(name=name, Name=name.capitalize(), n=i))
+
+    # Manifests go into the first directories (in sorted order), one per directory
+    for k, rel_dir in enumerate(sorted(made)[:manifests]):
+        file_name, render = _MANIFESTS[k % len(_MANIFESTS)]
+        (dest / rel_dir / file_name).write_text(render(f"pkg{k}"))
+    (dest / "README.md").write_text("# Synthetic repository\n")
+    (dest / ".gitignore").write_text(".vdoc/\nnode_modules/\n")
+
+    if git:
+        git_cmd = ["git", "-c", "user.email=bench@vdoc", "-c", "user.name=bench"]
+        subprocess.run(git_cmd + ["init", "-q", "."], cwd=dest, check=True)
+        subprocess.run(git_cmd + ["add", "-A"], cwd=dest, check=True)
+        subprocess.run(git_cmd + ["commit", "-qm", "synthetic"], cwd=dest, check=True)
+
+    (dest / MARKER).parent.mkdir(exist_ok=True)
+    (dest / MARKER).write_text(json.dumps(params))
+    return dest
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("dest", type=Path)
+    parser.add_argument("--files", type=int, default=1000)
+    parser.add_argument("--shape", choices=SHAPES, default="balanced")
+    parser.add_argument("--manifests", type=int, default=20)
+    parser.add_argument("--git", action="store_true", help="Make it a git repository (files committed)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    generate(args.dest, args.files, args.shape, args.manifests, args.git, args.seed)
+    print(f"Generated {args.files} files ({args.shape}) in {args.dest}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,191 @@
+import math
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# Directory names whose contents rarely matter for architecture-level docs
+LOW_VALUE_DIRS = {
+    "test", "tests", "__tests__", "spec", "specs", "fixtures", "examples", "example",
+    "docs", "doc", "vendor", "third_party", "dist", "build", "out", "coverage",
+    "migrations", "assets", "static", "public",
+}
+
+# Share of a group's allocation reserved for its file listing when the
+# Repository Map would otherwise consume everything
+LISTING_SHARE = 0.4
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token, plus the newline)."""
+    return len(text) // 4 + 1
+
+def estimate_lines(lines: Iterable[str]) -> int:
+    return sum(estimate_tokens(line) for line in lines)
+
+def remaining(token_budget: int, lines: Iterable[str]) -> int:
+    """Budget left for the context map once the rest of a prompt is accounted for."""
+    return max(token_budget - estimate_lines(lines), 0)
+
+@dataclass
+class Group:
+    """
+    The part of the context map contributed by one top-level directory
+    (or the root files): a header that is always rendered unless the group
+    is collapsed, listing lines and Repository Map lines. fit_items and
+    fit_symbols pick the most important lines when the group is trimmed;
+    a group without them keeps its leading lines.
+    """
+    name: str
+    header: str
+    items: List[str] = field(default_factory=list)
+    symbols: List[str] = field(default_factory=list)
+    weight: float = 1.0
+    # Files in the group; `items` may hold only the first few of them
+    total_items: int = 0
+    # Files with symbols; `symbols` may hold only the most important of them
+    total_symbols: int = 0
+    # How many items/symbols to render (set by the builder or by fit_groups)
+    kept_items: int = 0
+    kept_symbols: int = 0
+    # Re-renders the listing within a token budget (with its own overflow
+    # markers); fit_groups uses it instead of keeping the leading lines
+    fit_items: Optional[Callable[[int], List[str]]] = None
+    # Picks the most important Repository Map lines within a token budget
+    # (see `fit_ranked`); total_symbols must then count all of them
+    fit_symbols: Optional[Callable[[int], List[str]]] = None
+
+    def header_cost(self) -> int:
+        return estimate_tokens(self.header) + 1  # plus the blank separator line
+
+def group_weight(name: str, file_count: int, symbol_files: int, is_root: bool = False) -> float:
+    """
+    Importance of a top-level group: grows with the amount of code in it
+    (sub-linearly, so one huge directory cannot starve the rest) and is
+    discounted for tests, docs, vendored and generated output.
+    """
+    weight = math.sqrt(1 + symbol_files) + 0.25 * math.log1p(file_count)
+    if is_root:
+        weight *= 2  # manifests, READMEs and entry points
+    if name.strip("/").lower() in LOW_VALUE_DIRS:
+        weight *= 0.3
+    return weight
+
+def _allocate(needs: Dict[str, int], weights: Dict[str, float], budget: int) -> Dict[str, int]:
+    """
+    Water-filling allocation: each group receives a share of the budget
+    proportional to its weight; groups needing less than their share are
+    satisfied in full and the surplus is redistributed among the rest.
+    """
+    alloc = {}
+    active = set(needs)
+    remaining = budget
+    while active and remaining > 0:
+        total_weight = sum(weights[k] for k in active)
+        share = {k: remaining * weights[k] / total_weight for k in active}
+        satisfied = [k for k in active if needs[k] <= share[k]]
+        if not satisfied:
+            for k in active:
+                alloc[k] = int(share[k])
+            return alloc
+        for k in satisfied:
+            alloc[k] = needs[k]
+            remaining -= needs[k]
+            active.discard(k)
+    for k in active:
+        alloc.setdefault(k, 0)
+    return alloc
+
+def fit_lines(render: Callable[[int], List[str]], limit: int, budget: int) -> List[str]:
+    """
+    The longest rendering render(n), n <= limit lines, that fits in budget
+    tokens (binary search; render is assumed to grow with n).
+    """
+    best: List[str] = []
+    low, high = 0, limit
+    while low <= high:
+        mid = (low + high) // 2
+        lines = render(mid)
+        if estimate_lines(lines) <= budget:
+            best, low = lines, mid + 1
+        else:
+            high = mid - 1
+    return best
+
+def fit_ranked(lines: List[str], scores: List[float], budget: int) -> List[str]:
+    """
+    The highest-scoring lines that fit in budget tokens, in their original
+    order. Lines are admitted best first (ties to the earlier line); one
+    that does not fit is skipped so shorter, less important lines can still
+    use the room.
+    """
+    order = sorted(range(len(lines)), key=lambda i: (-scores[i], i))
+    chosen = []
+    used = 0
+    for i in order:
+        cost = estimate_tokens(lines[i])
+        if used + cost <= budget:
+            chosen.append(i)
+            used += cost
+    return [lines[i] for i in sorted(chosen)]
+
+def _take(lines: List[str], budget: int) -> Tuple[int, int]:
+    """Number of leading lines fitting in budget, and their cost."""
+    used = 0
+    for i, line in enumerate(lines):
+        cost = estimate_tokens(line)
+        if used + cost > budget:
+            return i, used
+        used += cost
+    return len(lines), used
+
+def fit_groups(groups: List[Group], budget: int) -> Tuple[List[Group], List[Group]]:
+    """
+    Trims groups to fit a token budget. Returns (kept, collapsed).
+
+    Headers are mandatory; if even they do not fit, the least important
+    groups are collapsed (rendered as a single summary line by the caller)
+    until they do. The remaining budget is water-filled across groups by
+    weight and, within a group, split between the file listing and the
+    Repository Map, with room left for the overflow markers. A group's
+    fit_items and fit_symbols choose the lines that stay, by importance;
+    without them, lines are dropped from the end of each list.
+    """
+    kept = sorted(groups, key=lambda g: g.weight, reverse=True)
+    collapsed: List[Group] = []
+    overflow_cost = estimate_tokens("- ... (00000 more)")
+
+    def header_cost() -> int:
+        # Collapsed groups share one summary line, roughly a name per group
+        collapsed_cost = sum(estimate_tokens(g.name) + 1 for g in collapsed)
+        return sum(g.header_cost() for g in kept) + collapsed_cost
+
+    while kept and header_cost() > budget:
+        collapsed.append(kept.pop())
+
+    remaining = budget - header_cost()
+    needs = {g.name: estimate_lines(g.items) + estimate_lines(g.symbols) for g in kept}
+    alloc = _allocate(needs, {g.name: g.weight for g in kept}, max(remaining, 0))
+
+    for g in kept:
+        available = alloc.get(g.name, 0)
+        if available >= needs[g.name]:
+            g.kept_items, g.kept_symbols = len(g.items), len(g.symbols)
+            continue
+        # Reserve room for the overflow markers we are about to emit
+        available = max(available - 2 * overflow_cost, 0)
+        symbol_need = estimate_lines(g.symbols)
+        listing_budget = max(int(available * LISTING_SHARE), available - symbol_need)
+        if g.fit_items is not None:
+            g.items = g.fit_items(listing_budget)
+            g.kept_items = g.total_items = len(g.items)
+            listing_used = estimate_lines(g.items)
+        else:
+            g.kept_items, listing_used = _take(g.items, listing_budget)
+        if g.fit_symbols is not None:
+            g.symbols = g.fit_symbols(available - listing_used)
+            g.kept_symbols = len(g.symbols)
+        else:
+            g.kept_symbols, _ = _take(g.symbols, available - listing_used)
+
+    order = {id(g): i for i, g in enumerate(groups)}
+    kept.sort(key=lambda g: order[id(g)])
+    collapsed.sort(key=lambda g: order[id(g)])
+    return kept, collapsed
@@ -0,0 +1,304 @@
+import json
+import os
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+from vdoc import timing
+from vdoc.gitindex import find_git_dir
+from vdoc.ignore import IGNORE_FILE_NAMES
+
+CONFIG_DIR_NAME = ".vdoc"
+CACHE_FILE_NAME = "scan_cache.json"
+
+# Bump whenever the layout of the cache file changes.
+CACHE_VERSION = 2
+
+# Below this many jobs a pool costs more than it saves: process pools (CPU-
+# bound parsing) pay for worker start-up and pickling, thread pools (reads
+# and hashing that release the GIL) for handing out tasks
+PROCESS_POOL_THRESHOLD = 256
+THREAD_POOL_THRESHOLD = 64
+# Jobs per pool task (one task per file costs more than most files' work)
+POOL_CHUNK_SIZE = 64
+
+
+def file_stamp(path: Path) -> Optional[List[int]]:
+    """Returns a cheap change stamp ([mtime_ns, size]) for a path, or None if missing."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_mtime_ns, st.st_size]
+
+
+def git_signature(root_path: Path) -> Optional[List[Any]]:
+    """
+    Signature of the git index state: changes whenever files are staged,
+    committed, checked out or removed from the index.
+    """
+    git_dir = find_git_dir(root_path)
+    if git_dir is None:
+        return None
+    try:
+        head = (git_dir / "HEAD").read_text().strip()
+    except OSError:
+        head = None
+    return [str(git_dir), file_stamp(git_dir / "index"), head]
+
+
+def _parent_dirs(rel_files: Iterable[str]) -> List[str]:
+    """All directories (relative, posix) that contain a listed file, plus their ancestors."""
+    dirs = {""}
+    for rel in rel_files:
+        idx = rel.rfind("/")
+        while idx > 0:
+            parent = rel[:idx]
+            if parent in dirs:
+                break
+            dirs.add(parent)
+            idx = parent.rfind("/")
+    return sorted(dirs)
+
+
+class ScanCache:
+    """
+    Persistent scan cache stored in `.vdoc/scan_cache.json`.
+
+    Holds two kinds of data:
+    - The file listing, validated against the git index signature, the
+      `.gitignore` files and the mtimes of every directory the listing walked
+      or that contains a listed file (adding or removing a file bumps its
+      parent directory's mtime).
+    - Per-file derived data, grouped by namespace and keyed by relative path,
+      validated against the file's [mtime_ns, size] stamp. With fingerprints
+      attached (see `vdoc.fingerprint`), an entry also stays valid when only
+      the stamp changed and the content is identical.
+    """
+
+    def __init__(self, root_path: Path, data: Optional[Dict[str, Any]] = None):
+        self.root_path = root_path
+        self.data = data or self._empty()
+        self.dirty = data is None
+        # vdoc.fingerprint.Fingerprints refreshed for this scan, if any
+        self.fingerprints = None
+
+    def _empty(self) -> Dict[str, Any]:
+        return {
+            "version": CACHE_VERSION,
+            "root": str(self.root_path),
+            "listing": None,
+            "entries": {},
+        }
+
+    @staticmethod
+    def get_path(root_path: Path) -> Path:
+        return root_path / CONFIG_DIR_NAME / CACHE_FILE_NAME
+
+    @classmethod
+    def load(cls, root_path: Path) -> "ScanCache":
+        """Loads the cache from disk. Returns an empty cache if missing, corrupt or stale."""
+        cache_path = cls.get_path(root_path)
+        if not cache_path.exists():
+            return cls(root_path)
+        try:
+            with open(cache_path, "r") as f:
+                data = json.load(f)
+        except (json.JSONDecodeError, OSError):
+            return cls(root_path)
+        if not isinstance(data, dict) or data.get("version") != CACHE_VERSION or data.get("root") != str(root_path):
+            return cls(root_path)
+        return cls(root_path, data)
+
+    def save(self) -> None:
+        """Writes the cache atomically. Skipped when nothing changed or `.vdoc/` is absent."""
+        if not self.dirty:
+            return
+        cache_path = self.get_path(self.root_path)
+        if not cache_path.parent.exists():
+            return
+        tmp_path = cache_path.with_suffix(".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(self.data, f, separators=(",", ":"))
+        os.replace(tmp_path, cache_path)
+        self.dirty = False
+
+    # --- File listing ---
+
+    def _dir_mtimes(self, dirs: Iterable[str]) -> Dict[str, Optional[int]]:
+        mtimes = {}
+        for d in dirs:
+            stamp = file_stamp(self.root_path / d if d else self.root_path)
+            mtimes[d] = stamp[0] if stamp else None
+        return mtimes
+
+    def _ignore_stamps(self, rel_files: List[str]) -> Dict[str, Optional[List[int]]]:
+        """Stamps of every ignore file in the listing; editing one can change membership."""
+        names = list(IGNORE_FILE_NAMES)
+        names += [rel for rel in rel_files if rel.rsplit("/", 1)[-1] in IGNORE_FILE_NAMES and "/" in rel]
+        return {rel: file_stamp(self.root_path / rel) for rel in names}
+
+    def get_files(self) -> Optional[List[str]]:
+        """Returns the cached relative file listing, or None if it may be stale."""
+        listing = self.data.get("listing")
+        if not listing:
+            return None
+        if listing.get("git") != git_signature(self.root_path):
+            return None
+        ignore = listing.get("ignore", {})
+        if {rel: file_stamp(self.root_path / rel) for rel in ignore} != ignore:
+            return None
+        stored = listing.get("dirs", {})
+        if self._dir_mtimes(stored.keys()) != stored:
+            return None
+        return listing["files"]
+
+    def set_files(self, rel_files: List[str], walked_dirs: Iterable[str] = ()) -> None:
+        """
+        Stores a fresh relative file listing together with its validation key.
+        walked_dirs are the directories the listing walk visited: a file added
+        to one of them is noticed even if it held no listed file before.
+        """
+        dirs = set(_parent_dirs(rel_files))
+        dirs.update(walked_dirs)
+        self.data["listing"] = {
+            "git": git_signature(self.root_path),
+            "ignore": self._ignore_stamps(rel_files),
+            "dirs": self._dir_mtimes(sorted(dirs)),
+            "files": rel_files,
+        }
+        self.dirty = True
+
+    # --- Per-file entries ---
+
+    def stamp(self, rel: str, path: Path) -> Optional[List[int]]:
+        """A file's stamp: from the attached fingerprints (stat'ed once per scan) or from disk."""
+        if self.fingerprints is not None:
+            stamp = self.fingerprints.stamp(rel)
+            if stamp is not None:
+                return stamp
+        return file_stamp(path)
+
+    def lookup(self, namespace: str, rel: str, stamp: Optional[List[int]]) -> Any:
+        """Returns cached data for a file if its stamp is unchanged, else None."""
+        entry = self.data["entries"].get(namespace, {}).get(rel)
+        if entry is None or stamp is None:
+            return None
+        if entry[0] != stamp:
+            if self.fingerprints is None or not self.fingerprints.same_content(rel, entry[0], stamp):
+                return None
+            # Touched but unchanged: re-stamp so the next lookup is a plain hit
+            entry[0] = stamp
+            self.dirty = True
+        return entry[1]
+
+    def store(self, namespace: str, rel: str, stamp: Optional[List[int]], value: Any) -> None:
+        """Records derived data for a file under its current stamp."""
+        if stamp is None:
+            return
+        self.data["entries"].setdefault(namespace, {})[rel] = [stamp, value]
+        self.dirty = True
+
+    def prune(self, namespace: str, live: Iterable[str]) -> None:
+        """Drops entries for files that no longer exist in the listing."""
+        entries = self.data["entries"].get(namespace)
+        if not entries:
+            return
+        live_set = set(live)
+        stale = [rel for rel in entries if rel not in live_set]
+        for rel in stale:
+            del entries[rel]
+        if stale:
+            self.dirty = True
+
+
+def map_jobs(
+    worker: Callable[[Any], Any],
+    jobs: Sequence[Any],
+    workers: Optional[int] = None,
+    processes: bool = False,
+    initializer: Optional[Callable[..., None]] = None,
+    initargs: Tuple = (),
+) -> List[Any]:
+    """
+    worker(job) for every job, in order. Enough jobs are spread over a
+    process pool (processes; default one worker per CPU) or a thread pool
+    (default four per CPU, at most 32), POOL_CHUNK_SIZE jobs per task;
+    fewer run inline. initializer(*initargs) runs in each worker process,
+    or once in this one.
+    """
+    if not jobs:
+        return []
+    if processes:
+        threshold = PROCESS_POOL_THRESHOLD
+        if workers is None:
+            workers = os.cpu_count() or 1
+    else:
+        threshold = THREAD_POOL_THRESHOLD
+        if workers is None:
+            workers = min(32, (os.cpu_count() or 1) * 4)
+    if workers <= 1 or len(jobs) < threshold:
+        if initializer is not None:
+            initializer(*initargs)
+        return [worker(job) for job in jobs]
+    if processes:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=workers, initializer=initializer, initargs=initargs) as pool:
+            return list(pool.map(worker, jobs, chunksize=POOL_CHUNK_SIZE))
+
+    from concurrent.futures import ThreadPoolExecutor
+    if initializer is not None:
+        initializer(*initargs)
+    chunks = [jobs[i:i + POOL_CHUNK_SIZE] for i in range(0, len(jobs), POOL_CHUNK_SIZE)]
+    with ThreadPoolExecutor(max_workers=min(workers, len(chunks))) as pool:
+        done = pool.map(lambda chunk: [worker(job) for job in chunk], chunks)
+        return [result for chunk in done for result in chunk]
+
+
+def cached_map(
+    root_path: Path,
+    cache: Optional[ScanCache],
+    namespace: str,
+    files: Iterable[Tuple[str, Any]],
+    worker: Callable[[Tuple[str, str, Any]], Any],
+    counter: Optional[str] = None,
+    finish: Optional[Callable[[str, Any], Any]] = None,
+    **pool: Any,
+) -> Dict[str, Any]:
+    """
+    One value per existing file of files, (rel, arg) pairs. Values are
+    reused from a namespace of the scan cache while the file's stamp is
+    unchanged; the rest are worker((rel, path, arg)) on a pool (see
+    `map_jobs`, which takes **pool), passed through finish(rel, result)
+    when given, and stored. None values are neither returned nor stored.
+    counter (a `timing` count) records how many files were computed; the
+    namespace is pruned to the files that exist.
+    """
+    prefix = os.path.join(str(root_path), "")
+    values: Dict[str, Any] = {}
+    live = []
+    jobs = []
+    stamps = []
+    for rel, arg in files:
+        path = prefix + rel
+        stamp = cache.stamp(rel, path) if cache is not None else file_stamp(path)
+        if stamp is None:
+            continue
+        live.append(rel)
+        cached = cache.lookup(namespace, rel, stamp) if cache is not None else None
+        if cached is not None:
+            values[rel] = cached
+            continue
+        jobs.append((rel, path, arg))
+        stamps.append(stamp)
+
+    if counter is not None:
+        timing.count(counter, len(jobs))
+    for (rel, _, _), stamp, result in zip(jobs, stamps, map_jobs(worker, jobs, **pool)):
+        value = finish(rel, result) if finish is not None else result
+        if value is None:
+            continue
+        values[rel] = value
+        if cache is not None:
+            cache.store(namespace, rel, stamp, value)
+    if cache is not None:
+        cache.prune(namespace, live)
+    return values
@@ -1,7 +1,8 @@
 from pathlib import Path
+from typing import Iterator, List
 from rich.console import Console
 import typer
-from vdoc import config, services, prompts as prompt_data
+from vdoc import config, output, services, sources, timing, prompts as prompt_data
 
 console = Console()
 
@@ -35,13 +36,31 @@ def run_exec(save: bool = False):
     with open(plan_file, "r") as f:
         plan_content = f.read()
         
+    # 3.5 Gather the files the plan refers to, so the agent need not re-read them
+    with timing.phase("sources"):
+        referenced = sources.gather_sources(root_path, sources.extract_paths(plan_content))
+    timing.count("sources_inlined", sum(source.text is not None for source in referenced))
+
     # 4. Generate EXECUTION_PROMPT.md
     output_dir = root_path / "product_documentation"
     output_dir.mkdir(exist_ok=True)
     
     output_file = output_dir / "EXECUTION_PROMPT.md"
     
-    content = [
+    content = _iter_prompt(plan_content, referenced)
+    
+    if not save:
+        # Default behavior: Print to stdout
+        output.emit(content)
+        return
+
+    output.emit(content, output_file)
+        
+    console.print(f"[bold green]✓[/bold green] Generated [bold]{output_file.relative_to(root_path)}[/bold]")
+    console.print("Feed this file to your IDE Agent to write the documentation.")
+
+def _iter_prompt(plan_content: str, referenced: List[sources.Source]) -> Iterator[str]:
+    yield from [
         "# VDoc Execution Prompt",
         "",
         "> **Instructions for the Agent:**",
@@ -53,19 +72,18 @@ def run_exec(save: bool = False):
         plan_content,
         "",
         "---",
+    ]
+    if referenced:
+        yield from [
+            "## Referenced Files",
+            "Current contents of the files mentioned in the plan (large files are truncated).",
+            "",
+        ]
+        yield from sources.iter_source_lines(referenced)
+        yield "---"
+    yield from [
         "## Instruction",
         "Please execute the above plan. Write the documentation files as specified.",
         "Ensure you follow the project's documentation rules.",
         prompt_data.METADATA_INSTRUCTION
     ]
-    
-    if not save:
-        # Default behavior: Print to stdout
-        print("\n".join(content))
-        return
-
-    with open(output_file, "w") as f:
-        f.write("\n".join(content))
-        
-    console.print(f"[bold green]✓[/bold green] Generated [bold]{output_file.relative_to(root_path)}[/bold]")
-    console.print("Feed this file to your IDE Agent to write the documentation.")
@@ -1,17 +1,25 @@
-from typing import Optional
+from concurrent.futures import Future
+from typing import Dict, Iterable, Iterator, List, Optional
 import typer
 from rich.console import Console
 from pathlib import Path
-from vdoc.config import save_config, VDocConfig, get_config_path
+from vdoc.config import load_config, save_config, VDocConfig, get_config_path
 from vdoc.integrations import setup_integrations
-from vdoc import scanner, services, prompts as prompt_data
+from vdoc import budget, output, pipeline, scanner, timing, prompts as prompt_data
+from vdoc.delta import record_baseline
 
 console = Console()
 
-def run_init(api_key: Optional[str] = None):
+def run_init(
+    api_key: Optional[str] = None,
+    use_cache: bool = True,
+    token_budget: Optional[int] = None,
+    workspace: bool = False,
+):
     """
     Initialize the VDoc project.
     Scans the codebase and creates the initial context map.
+    With workspace, writes one map per monorepo package and an index instead.
     """
     config_path = get_config_path()
     root_path = config_path.parent.parent
@@ -43,7 +51,7 @@ def run_init(api_key: Optional[str] = None):
         if "5" in tools_input: selected_tools.append("claude")
     
     # Create default config
-    config = VDocConfig(api_key=api_key)
+    config = VDocConfig(api_key=api_key, tree_depth=load_config().tree_depth)
     # TODO: We might want to save project_name to config in future
     
     try:
@@ -54,13 +62,33 @@ def run_init(api_key: Optional[str] = None):
         # 2. Run Integrations (Inject Rules)
         setup_integrations(root_path, tools=selected_tools)
         
-        # 3. Scan & Create Context Map
-        with console.status("[bold green]Scanning codebase...[/bold green]"):
-            context_map_content = scanner.generate_context_map(root_path)
+        # 3. Scan & Create Context Map (prompts are fetched meanwhile)
+        def map_budget(prompts: Dict[str, str]) -> Optional[int]:
+            if token_budget is None:
+                return None
+            return budget.remaining(token_budget, _iter_prompt(prompts, []))
+
+        def scan(prompts_future: Future):
+            if workspace:
+                # Package maps are rendered while scanning: a budget needs the prompts first
+                ws_budget = map_budget(prompts_future.result()) if token_budget is not None else None
+                index = _build_workspace(root_path, use_cache, ws_budget, config.tree_depth)
+                if index is not None:
+                    return index
+            with console.status("[bold green]Scanning codebase...[/bold green]"):
+                return scanner.scan_project(root_path, use_cache=use_cache)
+
+        prepared = pipeline.scan_while_fetching(api_key, scan)
+        prompts = prepared.prompts
+        console.print(f"[bold green]✓[/bold green] Scanned codebase and fetched prompts in {prepared.timing_summary()}")
+
+        if isinstance(prepared.result, list):
+            map_lines = prepared.result
+        else:
+            map_lines = scanner.iter_context_map(prepared.result, map_budget(prompts), config.tree_depth)
             
         map_file = vdoc_dir / "context_map.md"
-        with open(map_file, "w") as f:
-            f.write(context_map_content)
+        output.emit(timing.timed("render", map_lines), map_file)
         console.print(f"[bold green]✓[/bold green] Generated [bold].vdoc/context_map.md[/bold]")
 
         # 3.5 Create Spec Template
@@ -80,28 +108,14 @@ def run_init(api_key: Optional[str] = None):
         output_dir = root_path / "product_documentation"
         output_dir.mkdir(exist_ok=True)
         
-        prompts = services.get_prompts_sync(api_key)
-        
-        init_prompt_content = [
-            "# VDoc Init Prompt",
-            "",
-            "> **Instructions for the Agent:**",
-            prompts.get("scout_system_prompt", "Analyze the context map and help the user define the documentation goals."), # Fallback if key missing
-            "",
-            "---",
-            "",
-            "## Context Map",
-            context_map_content,
-            "",
-            "---",
-            "## Instruction",
-            "Based on the project structure above, please help the user define the documentation specification.",
-            "Identify key areas that need documentation and suggest a structure for `.vdoc/spec.md`.",
-        ]
+        init_prompt_content = _iter_prompt(prompts, output.iter_file_lines(map_file))
         
         # Default: Print content to stdout (no --save logic for init for now as it's less critical, or just always print)
         # But per user request "injects prompt directly", init should also just print the prompt.
-        print("\n".join(init_prompt_content))
+        output.emit(init_prompt_content)
+        # Base for the next `vdoc update --delta`
+        with timing.phase("record"):
+            record_baseline(root_path)
         
         console.print("[green]Project initialized successfully.[/green]")
         console.print("The prompt above is ready for your Agent to start the Spec phase.")
@@ -109,3 +123,35 @@ def run_init(api_key: Optional[str] = None):
     except Exception as e:
         console.print(f"[bold red]Error initializing project:[/bold red] {e}")
         raise typer.Exit(code=1)
+
+def _build_workspace(root_path: Path, use_cache: bool, map_budget: Optional[int], tree_depth: Optional[int]) -> Optional[List[str]]:
+    """Builds the per-package maps; returns the index lines, or None when the repo has no packages."""
+    from vdoc.workspace import PACKAGES_DIR_NAME, build_workspace
+
+    with console.status("[bold green]Scanning workspace packages...[/bold green]"), timing.phase("workspace"):
+        index = build_workspace(root_path, use_cache, map_budget, tree_depth)
+    if index is None:
+        console.print("[yellow]! No workspace packages found. Mapping the whole project instead.[/yellow]")
+    else:
+        console.print(f"[bold green]✓[/bold green] Generated package maps in [bold].vdoc/{PACKAGES_DIR_NAME}/[/bold]")
+    return index
+
+def _iter_prompt(prompts: Dict[str, str], map_lines: Iterable[str]) -> Iterator[str]:
+    yield from [
+        "# VDoc Init Prompt",
+        "",
+        "> **Instructions for the Agent:**",
+        prompts.get("scout_system_prompt", "Analyze the context map and help the user define the documentation goals."), # Fallback if key missing
+        "",
+        "---",
+        "",
+        "## Context Map",
+    ]
+    yield from map_lines
+    yield from [
+        "",
+        "---",
+        "## Instruction",
+        "Based on the project structure above, please help the user define the documentation specification.",
+        "Identify key areas that need documentation and suggest a structure for `.vdoc/spec.md`.",
+    ]
@@ -1,13 +1,15 @@
 from pathlib import Path
+from typing import Iterable, Iterator, Optional
 from rich.console import Console
 import typer
-from vdoc import config, services, prompts as prompt_data
+from vdoc import budget, config, output, scanner, services, timing, prompts as prompt_data
 
 console = Console()
 
-def run_plan(save: bool = False):
+def run_plan(save: bool = False, token_budget: Optional[int] = None, package: Optional[str] = None):
     """
     Generate a documentation plan based on the Spec and Context Map.
+    With package, uses that workspace package's map instead of the project's.
     """
     config_path = config.get_config_path()
     vdoc_dir = config_path.parent
@@ -15,20 +17,37 @@ def run_plan(save: bool = False):
     
     map_file = vdoc_dir / "context_map.md"
     spec_file = vdoc_dir / "spec.md"
+    scan_root = root_path
+    if package:
+        from vdoc.workspace import package_map_path
+
+        package = package.strip("/")
+        map_file = package_map_path(root_path, package)
+        scan_root = root_path / package
     
     # 1. Pre-flight Check
     if not map_file.exists() or not spec_file.exists():
         console.print("[bold red]Error: Missing .vdoc artifacts.[/bold red]")
-        console.print("Please run [bold cyan]vdoc init[/bold cyan] first.")
+        if package:
+            console.print(f"No map for package '{package}'. Run [bold cyan]vdoc update --workspace[/bold cyan] first.")
+        else:
+            console.print("Please run [bold cyan]vdoc init[/bold cyan] first.")
         raise typer.Exit(code=1)
         
     # 2. Read Artifacts
-    with open(map_file, "r") as f:
-        map_content = f.read()
-    
     with open(spec_file, "r") as f:
         spec_content = f.read()
 
+    if token_budget is None:
+        map_lines = output.iter_file_lines(map_file)
+    else:
+        # Re-render the (cached) scan so that the whole prompt fits the budget
+        map_budget = budget.remaining(token_budget, _iter_prompt([], spec_content))
+        tree_depth = config.load_config().tree_depth
+        with timing.phase("scan"):
+            scan = scanner.scan_project(scan_root)
+        map_lines = timing.timed("render", scanner.iter_context_map(scan, map_budget, tree_depth))
+
     # 3. Fetch Prompts
     with console.status("[bold green]Fetching prompts...[/bold green]"):
         cfg = config.load_config()
@@ -45,8 +64,22 @@ def run_plan(save: bool = False):
     
     output_file = output_dir / "PLANNING_PROMPT.md"
     
-    # Generate content first
-    content = [
+    # Content is streamed: the map is never held in memory as a whole
+    content = _iter_prompt(map_lines, spec_content)
+    
+    if not save:
+        # Default behavior: Print to stdout
+        output.emit(content)
+        return
+
+    # If --save is used, write to file
+    output.emit(content, output_file)
+        
+    console.print(f"[bold green]✓[/bold green] Generated [bold]{output_file.relative_to(root_path)}[/bold]")
+    console.print("Feed this file to your IDE Agent to generate the plan.")
+
+def _iter_prompt(map_lines: Iterable[str], spec_content: str) -> Iterator[str]:
+    yield from [
         "# VDoc Planning Prompt",
         "",
         "> **Instructions for the Agent:**",
@@ -55,7 +88,9 @@ def run_plan(save: bool = False):
         "---",
         "",
         "## Context Map",
-        map_content,
+    ]
+    yield from map_lines
+    yield from [
         "",
         "---",
         "## Documentation Specification",
@@ -66,15 +101,3 @@ def run_plan(save: bool = False):
         "Based on the Specification and Context Map above, please create a detailed documentation plan.",
         "Save the plan to `.vdoc/doc_plan.md`."
     ]
-    
-    if not save:
-        # Default behavior: Print to stdout
-        print("\n".join(content))
-        return
-
-    # If --save is used, write to file
-    with open(output_file, "w") as f:
-        f.write("\n".join(content))
-        
-    console.print(f"[bold green]✓[/bold green] Generated [bold]{output_file.relative_to(root_path)}[/bold]")
-    console.print("Feed this file to your IDE Agent to generate the plan.")
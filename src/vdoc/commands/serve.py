@@ -0,0 +1,15 @@
+from rich.console import Console
+from vdoc import config
+
+# stdout carries the MCP protocol
+console = Console(stderr=True)
+
+def run_serve(watch_files: bool = True, poll: bool = False, use_cache: bool = True):
+    """
+    Serve prompts and context-map tools over MCP (stdio).
+    """
+    from vdoc.server import run_server
+
+    root_path = config.get_config_path().parent.parent
+    console.print(f"[bold blue]Serving vdoc (MCP over stdio) for:[/bold blue] {root_path}")
+    run_server(root_path, watch_files=watch_files, poll=poll, use_cache=use_cache)
@@ -1,26 +1,91 @@
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, Optional
 from rich.console import Console
 import typer
-from vdoc import config, services, scanner
+from vdoc import budget, config, docindex, output, pipeline, scanner, timing
+from vdoc.delta import Delta, DeltaError, compute_delta, iter_delta, record_baseline
+from vdoc.state import load_state
 
 console = Console()
 
-def run_update(save: bool = False):
+def run_update(
+    save: bool = False,
+    use_cache: bool = True,
+    token_budget: Optional[int] = None,
+    workspace: bool = False,
+    since: Optional[str] = None,
+    delta: bool = False,
+    stale: bool = False,
+):
     """
     Update documentation based on the current codebase state.
+    With workspace, refreshes the per-package maps and prompts with their index.
+    With since (or delta, which defaults to the commit recorded by the last
+    init/update), prompts with only what changed since that ref.
+    With stale, prompts with only the documents whose sources changed.
+    Only a saved prompt records the baseline for the next --delta: one
+    printed to stdout may never reach the agent.
     """
     config_path = config.get_config_path()
     root_path = config_path.parent.parent
 
     console.print(f"[bold blue]Scanning vdoc in:[/bold blue] {root_path}")
 
-    # 1. Scan Codebase (Fresh)
-    with console.status("[bold green]Scanning codebase...[/bold green]"):
-        context_map_content = scanner.generate_context_map(root_path)
+    cfg = config.load_config()
 
-    # 2. Fetch Prompts (Update)
-    with console.status("[bold green]Fetching prompts...[/bold green]"):
-        cfg = config.load_config()
-        prompts = services.get_prompts_sync(cfg.api_key)
+    if delta and since is None:
+        since = load_state().last_commit
+        if since is None:
+            console.print("[yellow]! No commit recorded by a previous run. Emitting the full context map instead.[/yellow]")
+    if sum([since is not None, workspace, stale]) > 1:
+        console.print("[bold red]Error: use only one of --workspace, --since/--delta and --stale.[/bold red]")
+        raise typer.Exit(code=1)
+    mode = "stale" if stale else "delta" if since is not None else "full"
+
+    def map_budget(prompts: Dict[str, str]) -> Optional[int]:
+        if token_budget is None:
+            return None
+        return budget.remaining(token_budget, _iter_prompt(prompts, []))
+
+    # 1. Scan Codebase (Fresh), or only what changed since the ref / under the docs
+    def scan(prompts_future: Future):
+        if stale:
+            with console.status("[bold green]Checking documentation sources...[/bold green]"), timing.phase("docindex"):
+                return docindex.refresh(root_path)
+        if since is not None:
+            with console.status(f"[bold green]Diffing against {since}...[/bold green]"), timing.phase("delta"):
+                return compute_delta(root_path, since)
+        if workspace:
+            from vdoc.workspace import build_workspace
+
+            # Package maps are rendered while scanning: a budget needs the prompts first
+            ws_budget = map_budget(prompts_future.result()) if token_budget is not None else None
+            with console.status("[bold green]Scanning workspace packages...[/bold green]"), timing.phase("workspace"):
+                index = build_workspace(root_path, use_cache, ws_budget, cfg.tree_depth)
+            if index is not None:
+                return index
+            console.print("[yellow]! No workspace packages found. Mapping the whole project instead.[/yellow]")
+        with console.status("[bold green]Scanning codebase...[/bold green]"):
+            return scanner.scan_project(root_path, use_cache=use_cache)
+
+    # 2. Fetch Prompts (Update), concurrently with the scan
+    try:
+        prepared = pipeline.scan_while_fetching(cfg.api_key, scan)
+    except DeltaError as e:
+        console.print(f"[bold red]Error: {e}[/bold red]")
+        raise typer.Exit(code=1)
+    prompts = prepared.prompts
+    console.print(f"[bold green]✓[/bold green] Scanned codebase and fetched prompts in {prepared.timing_summary()}")
+
+    if stale:
+        map_lines = docindex.iter_stale(*prepared.result)
+    elif isinstance(prepared.result, list):
+        map_lines = prepared.result
+    elif isinstance(prepared.result, Delta):
+        map_lines = iter_delta(prepared.result, map_budget(prompts))
+    else:
+        map_lines = scanner.iter_context_map(prepared.result, map_budget(prompts), cfg.tree_depth)
 
     # 3. Generate UPDATE_PROMPT.md
     output_dir = root_path / "product_documentation"
@@ -28,31 +93,57 @@ def run_update(save: bool = False):
     
     output_file = output_dir / "UPDATE_PROMPT.md"
     
-    content = [
-        "# VDoc Update Prompt",
-        "",
-        "> **Instructions for the Agent:**",
-        prompts.get("update_system_prompt", "Analyze the codebase context below and update the existing documentation to match."), # Fallback
-        "",
-        "---",
-        "",
-        "## Current Context Map",
-        context_map_content,
-        "",
-        "---",
-        "## Instruction",
-        "The above is the current state of the codebase.",
-        "Please review the files in `product_documentation/` and update them if they are outdated.",
-        "Pay attention to any new files or deleted files."
-    ]
+    content = _iter_prompt(prompts, timing.timed("render", map_lines), mode)
     
     if not save:
         # Default: Print content to stdout
-        print("\n".join(content))
+        output.emit(content)
         return
 
-    with open(output_file, "w") as f:
-        f.write("\n".join(content))
+    output.emit(content, output_file)
+    _record(root_path, stale)
         
     console.print(f"[bold green]✓[/bold green] Generated [bold]{output_file.relative_to(root_path)}[/bold]")
     console.print("Feed this file to your IDE Agent to update the documentation.")
+
+def _record(root_path: Path, stale: bool) -> None:
+    """Baselines for the next run, once the prompt is saved: the HEAD commit, and the doc index (already refreshed in stale mode)."""
+    with timing.phase("record"):
+        record_baseline(root_path)
+        if not stale:
+            docindex.refresh(root_path)
+
+# Closing instructions per update mode
+INSTRUCTIONS = {
+    "full": [
+        "The above is the current state of the codebase.",
+        "Please review the files in `product_documentation/` and update them if they are outdated.",
+        "Pay attention to any new files or deleted files."
+    ],
+    "delta": [
+        "The above lists every file that changed since the documentation was last updated.",
+        "Please review the files in `product_documentation/` that cover them and update those that are outdated.",
+        "Document added files, drop references to deleted ones and fix paths of renamed ones."
+    ],
+    "stale": [
+        "The above lists the documents whose source files changed since they were written.",
+        "Please update only these documents to match the current sources.",
+        "Documents not listed are still accurate and must not be rewritten."
+    ],
+}
+
+def _iter_prompt(prompts: Dict[str, str], map_lines: Iterable[str], mode: str = "full") -> Iterator[str]:
+    yield from [
+        "# VDoc Update Prompt",
+        "",
+        "> **Instructions for the Agent:**",
+        prompts.get("update_system_prompt", "Analyze the codebase context below and update the existing documentation to match."), # Fallback
+        "",
+        "---",
+        "",
+    ]
+    if mode == "full":
+        yield "## Current Context Map"
+    yield from map_lines
+    yield from ["", "---", "## Instruction"]
+    yield from INSTRUCTIONS[mode]
@@ -0,0 +1,40 @@
+from rich.console import Console
+import typer
+from vdoc import config
+from vdoc.watch import DEBOUNCE_SECONDS, LiveMap, watch
+
+console = Console()
+
+def run_watch(use_cache: bool = True, poll: bool = False, debounce: float = DEBOUNCE_SECONDS):
+    """
+    Keep `.vdoc/context_map.md` up to date while files change.
+    """
+    config_path = config.get_config_path()
+    vdoc_dir = config_path.parent
+    root_path = config_path.parent.parent
+
+    # 1. Pre-flight Check
+    if not vdoc_dir.exists():
+        console.print("[bold red]Error: Missing .vdoc directory.[/bold red]")
+        console.print("Please run [bold cyan]vdoc init[/bold cyan] first.")
+        raise typer.Exit(code=1)
+
+    # 2. Initial Scan
+    with console.status("[bold green]Scanning codebase...[/bold green]"):
+        live = LiveMap(root_path, use_cache=use_cache, tree_depth=config.load_config().tree_depth)
+        map_file = vdoc_dir / "context_map.md"
+        live.write(map_file)
+    console.print(f"[bold green]✓[/bold green] Generated [bold].vdoc/context_map.md[/bold] ({len(live.rels)} files)")
+
+    # 3. Watch
+    def on_write(events: int, seconds: float) -> None:
+        console.print(
+            f"[bold green]✓[/bold green] Updated context map after {events} change(s) "
+            f"in {seconds * 1000:.0f} ms ({len(live.rels)} files)"
+        )
+
+    console.print(f"[bold blue]Watching[/bold blue] {root_path} (Ctrl+C to stop)")
+    try:
+        watch(live, map_file, poll=poll, debounce=debounce, on_write=on_write)
+    except KeyboardInterrupt:
+        console.print("Stopped watching.")
@@ -7,6 +7,8 @@ import typer
 class VDocConfig(BaseModel):
     api_key: Optional[str] = None
     project_id: Optional[str] = None
+    # Directory levels expanded in the context map's Project Structure
+    tree_depth: Optional[int] = None
 
 CONFIG_DIR_NAME = ".vdoc"
 CONFIG_FILE_NAME = "config.json"
@@ -0,0 +1,223 @@
+import os
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+from vdoc import budget, symbols
+from vdoc.cache import CONFIG_DIR_NAME
+from vdoc.filetable import FileTable
+from vdoc.state import get_state_path, update_state
+
+# Paths written by vdoc itself, never reported as project changes
+SKIPPED_PREFIXES = (CONFIG_DIR_NAME + "/", "product_documentation/")
+# Entries listed per section before the rest are counted
+SECTION_CAP = 200
+# Untracked files larger than this are not read just to count their lines
+LINE_COUNT_MAX_BYTES = 1024 * 1024
+
+SECTIONS = [("A", "Added"), ("D", "Deleted"), ("R", "Renamed"), ("M", "Modified")]
+
+class DeltaError(Exception):
+    """The delta cannot be computed (not a git repository, unknown ref)."""
+
+@dataclass
+class Change:
+    # "A" added, "D" deleted, "R" renamed, "M" modified
+    status: str
+    rel: str
+    old_rel: Optional[str] = None
+    # Line counts from the diffstat (None for binary files)
+    added: Optional[int] = None
+    removed: Optional[int] = None
+
+@dataclass
+class Delta:
+    ref: str
+    commit: str
+    changes: List[Change] = field(default_factory=list)
+    # Top-level definitions of the added, renamed and modified source files
+    repo_map: Dict[str, List[str]] = field(default_factory=dict)
+
+def _open_repo(root_path: Path):
+    from git import Repo, exc
+
+    try:
+        repo = Repo(root_path, search_parent_directories=True)
+    except (exc.InvalidGitRepositoryError, exc.NoSuchPathError):
+        raise DeltaError(f"{root_path} is not inside a git repository")
+    git_root = Path(repo.working_dir).resolve()
+    resolved = root_path.resolve()
+    rel_root = resolved.relative_to(git_root).as_posix() if resolved != git_root else ""
+    return repo, rel_root
+
+def head_commit(root_path: Path) -> Optional[str]:
+    """The commit checked out at root_path, or None (not a repository, no commits yet)."""
+    try:
+        repo, _ = _open_repo(root_path)
+        return repo.head.commit.hexsha
+    except (DeltaError, ValueError):
+        return None
+
+def record_baseline(root_path: Path) -> None:
+    """
+    Stores the time and HEAD commit of this run in the state store (the
+    next delta's default base). Skipped when `.vdoc/` is absent.
+    """
+    if not get_state_path().parent.exists():
+        return
+    update_state(
+        last_run=datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        last_commit=head_commit(root_path),
+    )
+
+def _count(token: str) -> Optional[int]:
+    return int(token) if token.isdigit() else None
+
+def _parse_name_status(out: str) -> List[Change]:
+    """Parses `git diff -z --name-status` output."""
+    tokens = out.split("\0")
+    changes = []
+    i = 0
+    while i < len(tokens) and tokens[i]:
+        status = tokens[i][0]
+        if status in "RC":
+            old_rel, rel = tokens[i + 1], tokens[i + 2]
+            i += 3
+            # A copy leaves its source in place: the destination is new
+            changes.append(Change("R", rel, old_rel) if status == "R" else Change("A", rel))
+            continue
+        rel = tokens[i + 1]
+        i += 2
+        changes.append(Change({"A": "A", "D": "D"}.get(status, "M"), rel))
+    return changes
+
+def _parse_numstat(out: str) -> Dict[str, tuple]:
+    """Parses `git diff -z --numstat` output into {new path: (added, removed)}."""
+    stats = {}
+    tokens = out.split("\0")
+    i = 0
+    while i < len(tokens) and tokens[i]:
+        added, removed, rel = tokens[i].split("\t", 2)
+        i += 1
+        if not rel:
+            # Renames: the counts are followed by the old and the new path
+            rel = tokens[i + 1]
+            i += 2
+        stats[rel] = (_count(added), _count(removed))
+    return stats
+
+def _count_lines(path: str) -> Optional[int]:
+    """Line count of an untracked file, or None for binaries and very large files."""
+    try:
+        if os.path.getsize(path) > LINE_COUNT_MAX_BYTES:
+            return None
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+    if b"\0" in data[:8000]:
+        return None
+    return data.count(b"\n") + (1 if data and not data.endswith(b"\n") else 0)
+
+def compute_delta(root_path: Path, ref: str) -> Delta:
+    """
+    What changed under root_path between `ref` and the worktree: committed,
+    staged and unstaged changes to tracked files (renames detected) plus
+    untracked, non-ignored files, each with its diffstat.
+    """
+    from git import exc
+
+    repo, rel_root = _open_repo(root_path)
+    try:
+        commit = repo.git.rev_parse("--verify", "--quiet", f"{ref}^{{commit}}")
+    except exc.GitCommandError:
+        raise DeltaError(f"unknown git ref: {ref}")
+
+    pathspec = rel_root or "."
+    prefix = rel_root + "/" if rel_root else ""
+    changes = _parse_name_status(repo.git.diff("-z", "--name-status", "-M", commit, "--", pathspec))
+    stats = _parse_numstat(repo.git.diff("-z", "--numstat", "-M", commit, "--", pathspec))
+    for change in changes:
+        change.added, change.removed = stats.get(change.rel, (None, None))
+    for rel in repo.git.ls_files("-z", "--others", "--exclude-standard", "--", pathspec).split("\0"):
+        if rel:
+            changes.append(Change("A", rel, added=_count_lines(os.path.join(repo.working_dir, rel)), removed=0))
+
+    kept = []
+    skip = len(prefix)
+    for change in changes:
+        change.rel = change.rel[skip:]
+        if change.old_rel is not None:
+            change.old_rel = change.old_rel[skip:] if change.old_rel.startswith(prefix) else None
+            if change.old_rel is None:
+                change.status = "A"
+        if not change.rel.startswith(SKIPPED_PREFIXES):
+            kept.append(change)
+    kept.sort(key=lambda c: c.rel)
+
+    present = [c.rel for c in kept if c.status != "D" and os.path.isfile(os.path.join(root_path, c.rel))]
+    # No cache here: build_repository_map prunes its namespace to the files it is given
+    repo_map = symbols.build_repository_map(root_path, FileTable(root_path, present), workers=1)
+    return Delta(ref, commit, kept, repo_map)
+
+def _stat(change: Change) -> str:
+    if change.added is None:
+        return "binary" if change.status != "D" else ""
+    if change.status == "D":
+        return f"-{change.removed}"
+    if change.status == "A":
+        return f"+{change.added}"
+    return f"+{change.added} -{change.removed}"
+
+def _iter_entries(delta: Delta, status: str) -> Iterator[str]:
+    for change in delta.changes:
+        if change.status != status:
+            continue
+        name = f"{change.old_rel} -> {change.rel}" if change.status == "R" else change.rel
+        stat = _stat(change)
+        line = f"- {name} ({stat})" if stat else f"- {name}"
+        defs = delta.repo_map.get(change.rel)
+        if defs:
+            line += f": {', '.join(defs)}"
+        yield line
+
+def iter_delta(delta: Delta, token_budget: Optional[int] = None) -> Iterator[str]:
+    """
+    Renders a delta as markdown: a summary line, then one section per kind
+    of change (at most SECTION_CAP entries each). With token_budget, the
+    listing stops once the budget is spent.
+    """
+    counts = {status: 0 for status, _ in SECTIONS}
+    added = removed = 0
+    for change in delta.changes:
+        counts[change.status] += 1
+        added += change.added or 0
+        removed += change.removed or 0
+
+    short = delta.commit[:12]
+    base = short if delta.ref.startswith(short[:7]) else f"{delta.ref} ({short})"
+    yield f"## Changes Since {base}"
+    if not delta.changes:
+        yield "- No changes."
+        return
+    parts = ", ".join(f"{counts[s]} {title.lower()}" for s, title in SECTIONS if counts[s])
+    yield f"- **Files Changed:** {len(delta.changes)} ({parts}), +{added} -{removed} lines"
+    yield ""
+
+    spent = budget.estimate_lines([f"## Changes Since {base}", parts])
+    for status, title in SECTIONS:
+        if not counts[status]:
+            continue
+        lines = [f"### {title}"]
+        for i, line in enumerate(_iter_entries(delta, status)):
+            if i == SECTION_CAP:
+                lines.append(f"- ... ({counts[status] - SECTION_CAP} more)")
+                break
+            lines.append(line)
+        for line in lines:
+            spent += budget.estimate_tokens(line)
+            if token_budget is not None and spent > token_budget:
+                yield "- ... (truncated to fit the token budget)"
+                return
+            yield line
+        yield ""
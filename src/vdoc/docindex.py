@@ -0,0 +1,155 @@
+import hashlib
+import json
+import os
+import posixpath
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+from pydantic import BaseModel
+from vdoc import sources
+from vdoc.cache import CONFIG_DIR_NAME, file_stamp
+
+DOC_INDEX_FILE_NAME = "doc_index.json"
+DOCS_DIR_NAME = "product_documentation"
+DOC_SUFFIXES = (".md", ".mdx", ".markdown", ".rst", ".txt")
+# Prompts vdoc writes next to the documentation
+GENERATED_DOCS = {"INIT_PROMPT.md", "PLANNING_PROMPT.md", "EXECUTION_PROMPT.md", "UPDATE_PROMPT.md"}
+
+class DocEntry(BaseModel):
+    # Blob hash of the document when its sources were recorded
+    doc_hash: str
+    # Source path -> blob hash at that time
+    sources: Dict[str, str] = {}
+
+class DocIndex(BaseModel):
+    docs: Dict[str, DocEntry] = {}
+    # Path -> [mtime_ns, size, blob hash], so unchanged files are not re-hashed
+    blobs: Dict[str, List] = {}
+
+@dataclass
+class StaleDoc:
+    doc: str
+    # (source, "modified" or "deleted")
+    changed: List[Tuple[str, str]] = field(default_factory=list)
+
+def get_index_path(root_path: Path) -> Path:
+    return root_path / CONFIG_DIR_NAME / DOC_INDEX_FILE_NAME
+
+def load_index(root_path: Path) -> DocIndex:
+    """Loads the doc index. Returns an empty index if missing or corrupt."""
+    try:
+        with open(get_index_path(root_path), "r") as f:
+            return DocIndex(**json.load(f))
+    except Exception:
+        return DocIndex()
+
+def save_index(root_path: Path, index: DocIndex) -> None:
+    """Writes the index atomically. Skipped when `.vdoc/` is absent."""
+    index_path = get_index_path(root_path)
+    if not index_path.parent.exists():
+        return
+    tmp_path = index_path.with_suffix(".tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(index.model_dump(), f, separators=(",", ":"))
+    os.replace(tmp_path, index_path)
+
+def blob_hash(data: bytes) -> str:
+    """The git blob id of some content (what `git hash-object` prints)."""
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+def list_docs(root_path: Path) -> List[str]:
+    """Documentation files under product_documentation/, relative to the root."""
+    docs = []
+    for dirpath, dirnames, filenames in os.walk(root_path / DOCS_DIR_NAME):
+        dirnames[:] = [d for d in dirnames if not d.startswith(".")]
+        rel_dir = Path(dirpath).relative_to(root_path).as_posix()
+        docs.extend(
+            f"{rel_dir}/{name}" for name in filenames
+            if name.endswith(DOC_SUFFIXES) and name not in GENERATED_DOCS
+        )
+    return sorted(docs)
+
+def _hash(root_path: Path, rel: str, index: DocIndex, live: Dict[str, List]) -> Optional[str]:
+    """Blob hash of a file, reusing the recorded one while its stamp is unchanged."""
+    stamp = file_stamp(root_path / rel)
+    if stamp is None:
+        return None
+    known = index.blobs.get(rel)
+    if known is not None and known[:2] == stamp:
+        digest = known[2]
+    else:
+        try:
+            digest = blob_hash((root_path / rel).read_bytes())
+        except OSError:
+            return None
+    live[rel] = [*stamp, digest]
+    return digest
+
+def _referenced(root_path: Path, doc: str) -> List[str]:
+    """Existing project files a document mentions, root- or document-relative."""
+    try:
+        text = (root_path / doc).read_text(errors="replace")
+    except OSError:
+        return []
+    doc_dir = posixpath.dirname(doc)
+    found = []
+    for candidate in sources.extract_paths(text):
+        for rel in (candidate, posixpath.join(doc_dir, candidate)):
+            hit = sources.resolve(root_path, rel)
+            if hit is not None:
+                found.append(hit[0])
+                break
+    return list(dict.fromkeys(found))
+
+def refresh(root_path: Path) -> Tuple[List[StaleDoc], int]:
+    """
+    Brings the doc index up to date and returns (stale docs, number of docs).
+
+    A document that is new or was edited since the last run is taken to
+    describe its sources as they are now: its references are re-read and
+    their hashes recorded. Any other document is stale when one of its
+    recorded sources changed or disappeared since.
+    """
+    index = load_index(root_path)
+    live: Dict[str, List] = {}
+    docs = list_docs(root_path)
+    stale = []
+    entries = {}
+    for doc in docs:
+        doc_hash = _hash(root_path, doc, index, live)
+        if doc_hash is None:
+            continue
+        entry = index.docs.get(doc)
+        if entry is None or entry.doc_hash != doc_hash:
+            recorded = {}
+            for rel in _referenced(root_path, doc):
+                digest = _hash(root_path, rel, index, live)
+                if digest is not None:
+                    recorded[rel] = digest
+            entries[doc] = DocEntry(doc_hash=doc_hash, sources=recorded)
+            continue
+        entries[doc] = entry
+        changed = []
+        for rel, digest in entry.sources.items():
+            current = _hash(root_path, rel, index, live)
+            if current != digest:
+                changed.append((rel, "deleted" if current is None else "modified"))
+        if changed:
+            stale.append(StaleDoc(doc, changed))
+
+    save_index(root_path, DocIndex(docs=entries, blobs=live))
+    return stale, len(docs)
+
+def iter_stale(stale: List[StaleDoc], total_docs: int) -> Iterator[str]:
+    """Markdown listing the stale documents and the sources that changed under each."""
+    yield "## Stale Documentation"
+    if not stale:
+        yield f"- All {total_docs} documents are up to date." if total_docs else "- No documentation found."
+        return
+    yield f"- **Stale:** {len(stale)} of {total_docs} documents"
+    yield ""
+    for doc in stale:
+        yield f"### {doc.doc}"
+        for rel, change in doc.changed:
+            yield f"- {rel} ({change})"
+        yield ""
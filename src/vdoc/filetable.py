@@ -0,0 +1,94 @@
+import os
+from array import array
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Sequence, Union
+
+class FileTable:
+    """
+    The files of a scan, as sorted posix paths relative to root_path, stored
+    compactly for repos with millions of entries.
+
+    Directory prefixes ("" or "src/vdoc/") and extensions are interned once
+    and referenced by id from arrays; base names live in one string indexed
+    by an offsets array. A path costs a few bytes of array slots instead of a
+    `Path` object plus its cached parts and string forms.
+    """
+    __slots__ = ("root_path", "dirs", "dir_ids", "exts", "ext_ids", "_names", "_offsets")
+
+    def __init__(self, root_path: Path, rels: Iterable[str] = ()):
+        self.root_path = root_path
+        self.dirs: List[str] = []
+        self.dir_ids = array("I")
+        self.exts: List[str] = []
+        self.ext_ids = array("I")
+        self._offsets = array("Q", [0])
+
+        dir_index: Dict[str, int] = {}
+        ext_index: Dict[str, int] = {}
+        names = []
+        end = 0
+        for rel in rels:
+            slash = rel.rfind("/") + 1
+            prefix, name = rel[:slash], rel[slash:]
+            did = dir_index.get(prefix)
+            if did is None:
+                did = dir_index[prefix] = len(self.dirs)
+                self.dirs.append(prefix)
+            ext = _suffix(name)
+            eid = ext_index.get(ext)
+            if eid is None:
+                eid = ext_index[ext] = len(self.exts)
+                self.exts.append(ext)
+            self.dir_ids.append(did)
+            self.ext_ids.append(eid)
+            names.append(name)
+            end += len(name)
+            self._offsets.append(end)
+        self._names = "".join(names)
+
+    @classmethod
+    def from_paths(cls, root_path: Path, paths: Iterable[Path]) -> "FileTable":
+        """Builds a table from absolute paths below root_path (by string slicing)."""
+        skip = len(str(root_path / "_")) - 1
+        rels = (str(p)[skip:] for p in paths)
+        if os.sep != "/":
+            rels = (rel.replace(os.sep, "/") for rel in rels)
+        return cls(root_path, rels)
+
+    def __len__(self) -> int:
+        return len(self.dir_ids)
+
+    def name(self, i: int) -> str:
+        return self._names[self._offsets[i]:self._offsets[i + 1]]
+
+    def rel(self, i: int) -> str:
+        return self.dirs[self.dir_ids[i]] + self.name(i)
+
+    def suffix(self, i: int) -> str:
+        return self.exts[self.ext_ids[i]]
+
+    def path(self, i: int) -> Path:
+        return self.root_path / self.rel(i)
+
+    def rels(self) -> Iterator[str]:
+        dirs, dir_ids, names, offsets = self.dirs, self.dir_ids, self._names, self._offsets
+        for i in range(len(dir_ids)):
+            yield dirs[dir_ids[i]] + names[offsets[i]:offsets[i + 1]]
+
+    def paths(self) -> List[Path]:
+        root = self.root_path
+        return [root / rel for rel in self.rels()]
+
+    def suffix_counts(self) -> Counter:
+        """Number of files per extension ("" for none), without touching any path."""
+        return Counter({self.exts[eid]: n for eid, n in Counter(self.ext_ids).items()})
+
+def _suffix(name: str) -> str:
+    """Same as `PurePath.suffix` for a single path component."""
+    dot = name.rfind(".")
+    return name[dot:] if 0 < dot < len(name) - 1 else ""
+
+def as_table(root_path: Path, files: Union[FileTable, Sequence[Path]]) -> FileTable:
+    """Accepts either a FileTable or a list of paths (the pre-table API)."""
+    return files if isinstance(files, FileTable) else FileTable.from_paths(root_path, files)
@@ -0,0 +1,153 @@
+import json
+import mmap
+import os
+import zlib
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+from vdoc import timing
+from vdoc.cache import CONFIG_DIR_NAME, map_jobs
+
+try:
+    import xxhash
+except ImportError:  # optional: a faster, stronger 64-bit hash when installed
+    xxhash = None
+
+FINGERPRINT_FILE_NAME = "fingerprints.json"
+# Bump whenever the layout of the file changes
+FINGERPRINT_VERSION = 1
+ALGORITHM = "xxh3_64" if xxhash is not None else "crc32+adler32"
+
+# Files at least this large are memory-mapped rather than read
+MMAP_THRESHOLD = 1024 * 1024
+
+# rel -> [size, mtime_ns, inode, content hash]
+Record = List
+
+def digest(data) -> str:
+    """Fast non-cryptographic content hash (64 bits, hex) of a bytes-like object."""
+    if xxhash is not None:
+        return xxhash.xxh3_64_hexdigest(data)
+    # Both release the GIL on large buffers, so threads hash in parallel
+    return f"{zlib.crc32(data):08x}{zlib.adler32(data):08x}"
+
+def _hash_file(path: str, size: int) -> Optional[str]:
+    try:
+        with open(path, "rb") as f:
+            if size >= MMAP_THRESHOLD:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    return digest(mapped)
+            return digest(f.read())
+    except (OSError, ValueError):
+        return None
+
+def _hash_job(job: Tuple[str, str, Record]) -> Optional[str]:
+    """Worker: content hash of one (rel, path, [size, mtime_ns, inode]) file."""
+    _, path, stat = job
+    return _hash_file(path, stat[0])
+
+class Fingerprints:
+    """
+    Content fingerprints of the scanned files, stored in `.vdoc/fingerprints.json`.
+
+    `refresh` re-hashes only files whose (size, mtime_ns, inode) changed and
+    classifies every file against the previous run: added, modified, deleted,
+    or touched (stamp changed, content identical, e.g. after a branch switch
+    or a save without edits). This works without git and for untracked files.
+    """
+
+    def __init__(self, root_path: Path, records: Optional[Dict[str, Record]] = None):
+        self.root_path = root_path
+        self.previous: Dict[str, Record] = records or {}
+        self.records: Dict[str, Record] = dict(self.previous)
+        self.added: List[str] = []
+        self.modified: List[str] = []
+        self.deleted: List[str] = []
+        self.touched: List[str] = []
+        self.dirty = False
+
+    @staticmethod
+    def get_path(root_path: Path) -> Path:
+        return root_path / CONFIG_DIR_NAME / FINGERPRINT_FILE_NAME
+
+    @classmethod
+    def load(cls, root_path: Path) -> "Fingerprints":
+        """Loads the fingerprints of the last run. Empty if missing, corrupt or hashed differently."""
+        try:
+            with open(cls.get_path(root_path), "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return cls(root_path)
+        if not isinstance(data, dict) or data.get("version") != FINGERPRINT_VERSION or data.get("algorithm") != ALGORITHM:
+            return cls(root_path)
+        return cls(root_path, data.get("files") or {})
+
+    def save(self) -> None:
+        """Writes the fingerprints atomically. Skipped when nothing changed or `.vdoc/` is absent."""
+        path = self.get_path(self.root_path)
+        if not self.dirty or not path.parent.exists():
+            return
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump({"version": FINGERPRINT_VERSION, "algorithm": ALGORITHM, "files": self.records}, f, separators=(",", ":"))
+        os.replace(tmp_path, path)
+        self.dirty = False
+
+    def refresh(self, rels: Iterable[str], workers: Optional[int] = None) -> "Fingerprints":
+        """Fingerprints the listed files (hashing on a thread pool) and classifies them against the last run."""
+        prefix = os.path.join(str(self.root_path), "")
+        records: Dict[str, Record] = {}
+        previous = self.previous
+        # 1. Stat every file; unchanged (size, mtime_ns, inode) keeps its hash.
+        #    A plain loop: per-file pool tasks cost more than the stat itself.
+        jobs = []
+        for rel in rels:
+            path = prefix + rel
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            before = previous.get(rel)
+            if before is not None and before[1] == st.st_mtime_ns and before[0] == st.st_size and before[2] == st.st_ino:
+                records[rel] = before
+            else:
+                jobs.append((rel, path, [st.st_size, st.st_mtime_ns, st.st_ino]))
+
+        # 2. Hash the rest, on a thread pool when there are many
+        hashes = map_jobs(_hash_job, jobs, workers)
+
+        # 3. Classify against the last run
+        for (rel, _, stat), content in zip(jobs, hashes):
+            if content is None:
+                continue
+            records[rel] = stat + [content]
+            before = self.previous.get(rel)
+            if before is None:
+                self.added.append(rel)
+            elif before[3] == content:
+                self.touched.append(rel)
+            else:
+                self.modified.append(rel)
+        self.deleted = [rel for rel in self.previous if rel not in records]
+        self.dirty = self.dirty or bool(jobs) or bool(self.deleted)
+        self.records = records
+        timing.count("files_hashed", len(jobs))
+        return self
+
+    def stamp(self, rel: str) -> Optional[List[int]]:
+        """The scan cache stamp ([mtime_ns, size]) recorded for a file by this refresh, if any."""
+        record = self.records.get(rel)
+        return None if record is None else [record[1], record[0]]
+
+    def changed(self) -> List[str]:
+        """Files added or modified since the last run (touched files are not changes)."""
+        return self.added + self.modified
+
+    def same_content(self, rel: str, old_stamp: Optional[List[int]], stamp: Optional[List[int]]) -> bool:
+        """
+        Whether a file last seen with old_stamp ([mtime_ns, size], as in the
+        scan cache) still has the same content now that its stamp is stamp.
+        """
+        before, now = self.previous.get(rel), self.records.get(rel)
+        if before is None or now is None or old_stamp is None or stamp is None:
+            return False
+        return [before[1], before[0]] == old_stamp and [now[1], now[0]] == stamp and before[3] == now[3]
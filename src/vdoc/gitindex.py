@@ -0,0 +1,221 @@
+import struct
+from pathlib import Path
+from typing import List, Optional, Set, Tuple
+from vdoc import walker
+from vdoc.ignore import global_rules, load_rules
+
+class IndexFormatError(ValueError):
+    """Raised when `.git/index` cannot be parsed (unknown version, corruption)."""
+
+# Entry modes that are not regular files in the worktree
+_MODE_DIRECTORY = 0o040000  # sparse-index directory entries
+
+def find_git_dir(root_path: Path) -> Optional[Path]:
+    """
+    Locates the git directory for root_path (searching parent directories).
+    Handles worktrees/submodules where `.git` is a file pointing elsewhere.
+    """
+    located = find_repository(root_path)
+    return located[1] if located else None
+
+def find_repository(root_path: Path) -> Optional[Tuple[Path, Path]]:
+    """
+    Returns (worktree_root, git_dir) for root_path, searching parent
+    directories, or None when root_path is not inside a git worktree.
+    """
+    for candidate in [root_path, *root_path.parents]:
+        dot_git = candidate / ".git"
+        if dot_git.is_dir():
+            return candidate, dot_git
+        if dot_git.is_file():
+            try:
+                content = dot_git.read_text().strip()
+            except OSError:
+                return None
+            if not content.startswith("gitdir:"):
+                return None
+            git_dir = Path(content[len("gitdir:"):].strip())
+            if not git_dir.is_absolute():
+                git_dir = candidate / git_dir
+            return candidate, git_dir
+    return None
+
+def common_dir(git_dir: Path) -> Path:
+    """The shared git directory (differs from git_dir for linked worktrees)."""
+    try:
+        common = (git_dir / "commondir").read_text().strip()
+    except OSError:
+        return git_dir
+    path = Path(common)
+    return path if path.is_absolute() else (git_dir / path).resolve()
+
+def _hash_size(git_dir: Path) -> int:
+    """20 for SHA-1 repositories, 32 when `extensions.objectFormat = sha256`."""
+    try:
+        config = (common_dir(git_dir) / "config").read_text(errors="replace").lower()
+    except OSError:
+        return 20
+    return 32 if "objectformat = sha256" in config.replace("\t", " ") else 20
+
+def _decode_varint(data: bytes, pos: int) -> Tuple[int, int]:
+    """Decodes git's offset varint (used for v4 path prefix lengths)."""
+    c = data[pos]
+    pos += 1
+    value = c & 0x7F
+    while c & 0x80:
+        value += 1
+        c = data[pos]
+        pos += 1
+        value = (value << 7) | (c & 0x7F)
+    return value, pos
+
+def _ewah_bits(data: bytes, pos: int) -> Tuple[Set[int], int]:
+    """
+    Decodes an EWAH-compressed bitmap (as used by the split-index `link`
+    extension). Returns the set bit positions and the offset after the bitmap.
+    """
+    _bit_size, word_count = struct.unpack_from(">II", data, pos)
+    pos += 8
+    words = struct.unpack_from(">%dQ" % word_count, data, pos)
+    pos += 8 * word_count + 4  # trailing running-length-word position
+    bits = set()
+    word_index = 0
+    i = 0
+    while i < word_count:
+        marker = words[i]
+        run_bit = marker & 1
+        run_len = (marker >> 1) & 0xFFFFFFFF
+        literal_count = marker >> 33
+        if run_bit:
+            start = word_index * 64
+            bits.update(range(start, start + run_len * 64))
+        word_index += run_len
+        for literal in words[i + 1:i + 1 + literal_count]:
+            base = word_index * 64
+            while literal:
+                low = literal & -literal
+                bits.add(base + low.bit_length() - 1)
+                literal ^= low
+            word_index += 1
+        i += 1 + literal_count
+    return bits, pos
+
+def _parse_index(data: bytes, hash_size: int) -> Tuple[List[Tuple[str, int]], Optional[Tuple[bytes, Set[int], Set[int]]]]:
+    """
+    Parses an index file body into [(path, mode)] in index order, plus the
+    split-index link (shared index hash, delete bitmap, replace bitmap) if present.
+    """
+    if len(data) < 12 + hash_size or data[:4] != b"DIRC":
+        raise IndexFormatError("not a git index file")
+    version, count = struct.unpack_from(">II", data, 4)
+    if version not in (2, 3, 4):
+        raise IndexFormatError(f"unsupported index version {version}")
+
+    entries = []
+    pos = 12
+    previous = b""
+    fixed = 40 + hash_size  # stat data + object name
+    try:
+        for _ in range(count):
+            entry_start = pos
+            mode = struct.unpack_from(">I", data, pos + 24)[0]
+            flags = struct.unpack_from(">H", data, pos + fixed)[0]
+            pos += fixed + 2
+            if version >= 3 and flags & 0x4000:
+                pos += 2  # extended flags
+            if version == 4:
+                strip, pos = _decode_varint(data, pos)
+                end = data.index(b"\x00", pos)
+                name = previous[:len(previous) - strip] + data[pos:end]
+                pos = end + 1
+            else:
+                end = data.index(b"\x00", pos)
+                name = data[pos:end]
+                # Entries are NUL padded to a multiple of 8 bytes
+                pos = entry_start + ((end - entry_start + 8) & ~7)
+            previous = name
+            entries.append((name.decode("utf-8", "surrogateescape"), mode))
+    except (struct.error, ValueError, IndexError) as e:
+        raise IndexFormatError(f"truncated index entry: {e}")
+
+    # Extensions: 4-byte signature, 4-byte length, payload
+    link = None
+    end_of_extensions = len(data) - hash_size
+    while pos + 8 <= end_of_extensions:
+        signature = data[pos:pos + 4]
+        size = struct.unpack_from(">I", data, pos + 4)[0]
+        payload_start = pos + 8
+        if signature == b"link":
+            shared = data[payload_start:payload_start + hash_size]
+            delete_bits, offset = _ewah_bits(data, payload_start + hash_size)
+            replace_bits, _ = _ewah_bits(data, offset)
+            link = (shared, delete_bits, replace_bits)
+        pos = payload_start + size
+    return entries, link
+
+def read_index_paths(git_dir: Path) -> List[str]:
+    """
+    Reads tracked paths (relative to the worktree root, posix) directly from
+    the binary index, without spawning git. Supports index versions 2-4,
+    including split indexes. A missing index (fresh repository) is empty.
+    Conflicted paths appear once; sparse-directory entries are skipped.
+    """
+    index_path = git_dir / "index"
+    try:
+        with open(index_path, "rb") as f:
+            data = f.read()
+    except FileNotFoundError:
+        return []
+    hash_size = _hash_size(git_dir)
+    entries, link = _parse_index(data, hash_size)
+
+    if link is not None and link[0].strip(b"\x00"):
+        shared, delete_bits, replace_bits = link
+        shared_path = git_dir / f"sharedindex.{shared.hex()}"
+        try:
+            with open(shared_path, "rb") as f:
+                shared_entries, _ = _parse_index(f.read(), hash_size)
+        except OSError as e:
+            raise IndexFormatError(f"missing shared index: {e}")
+        # Replaced entries keep their shared path; the split index lists them
+        # first (possibly with empty names), followed by newly added entries.
+        kept = [e for i, e in enumerate(shared_entries) if i not in delete_bits]
+        entries = kept + entries[len(replace_bits):]
+
+    paths = []
+    last = None
+    for name, mode in sorted(entries) if link is not None else entries:
+        if name == last or (mode & 0o170000) == _MODE_DIRECTORY:
+            continue
+        paths.append(name)
+        last = name
+    return paths
+
+def list_untracked(
+    worktree: Path,
+    git_dir: Path,
+    tracked: Set[str],
+    start: str = "",
+    visited_dirs: Optional[List[str]] = None,
+) -> List[str]:
+    """
+    Discovers untracked, non-ignored files below `start` (a posix path
+    relative to the worktree root) in a single walk. Honours `.gitignore`
+    files at every level, `info/exclude` and the global excludes file;
+    ignored directories, `.git` and nested repositories are pruned without
+    descending. The directories walked are appended to visited_dirs.
+    """
+    stack = global_rules(common_dir(git_dir))
+    # .gitignore files of the ancestors of `start`; the walker loads the rest
+    parts = [p for p in start.split("/") if p]
+    for depth in range(len(parts)):
+        rel = "/".join(parts[:depth])
+        rules = load_rules(worktree / rel / ".gitignore", rel)
+        if rules:
+            stack.append(rules)
+
+    found = walker.walk(
+        worktree, start, ignore_files=(".gitignore",), base_stack=stack, skip_nested_repos=True,
+        visited_dirs=visited_dirs,
+    )
+    return [rel for rel in found if rel not in tracked]
@@ -0,0 +1,192 @@
+import os
+import re
+from pathlib import Path
+from typing import List, Optional, Sequence
+
+# Per-directory ignore files, lowest precedence first. `.vdocignore` lets a
+# project hide paths from vdoc without touching its git configuration.
+IGNORE_FILE_NAMES = (".gitignore", ".vdocignore")
+
+def _translate(pattern: str) -> str:
+    """
+    Translates the body of a gitignore glob into a regular expression.
+    Supports `*`, `?`, `[...]`, backslash escapes and the `**` forms
+    (leading `**/`, inner `/**/` and trailing `/**`).
+    """
+    res = []
+    i, n = 0, len(pattern)
+    while i < n:
+        at_segment_start = i == 0 or pattern[i - 1] == "/"
+        if at_segment_start and pattern.startswith("**/", i):
+            res.append("(?:.*/)?")
+            i += 3
+            continue
+        if at_segment_start and pattern.startswith("**", i) and i + 2 == n:
+            res.append(".*")
+            i += 2
+            continue
+        c = pattern[i]
+        if c == "*":
+            res.append("[^/]*")
+        elif c == "?":
+            res.append("[^/]")
+        elif c == "[":
+            j = pattern.find("]", i + 2)
+            if j == -1:
+                res.append("\\[")
+            else:
+                body = pattern[i + 1:j]
+                if body.startswith("!"):
+                    body = "^" + body[1:]
+                res.append("[" + body.replace("\\", "\\\\") + "]")
+                i = j
+        elif c == "\\" and i + 1 < n:
+            i += 1
+            res.append(re.escape(pattern[i]))
+        else:
+            res.append(re.escape(c))
+        i += 1
+    return "".join(res)
+
+class IgnoreRules:
+    """
+    The compiled patterns of one ignore file (e.g. a `.gitignore`).
+
+    Paths are matched relative to `base`, the directory the file lives in.
+    All patterns are folded into one alternation so the common "nothing
+    matches" case costs a single regex call; per-pattern evaluation (last
+    match wins) only happens when negations are present.
+    """
+
+    def __init__(self, lines: Sequence[str], base: str = ""):
+        self.base = base.strip("/")
+        # (regex, negated, dir_only) in file order
+        self.patterns = []
+        for line in lines:
+            compiled = self._compile_line(line)
+            if compiled is not None:
+                self.patterns.append(compiled)
+        self.has_negation = any(neg for _, neg, _ in self.patterns)
+        self._any_re = self._combine([p for p in self.patterns])
+        self._file_re = self._combine([p for p in self.patterns if not p[2]])
+
+    @staticmethod
+    def _compile_line(line: str):
+        line = line.rstrip("\n").rstrip("\r")
+        if not line or line.startswith("#"):
+            return None
+        # Trailing spaces are ignored unless escaped
+        stripped = line.rstrip(" ")
+        if stripped.endswith("\\") and len(stripped) < len(line):
+            stripped += " "
+        line = stripped
+        negated = line.startswith("!")
+        if negated:
+            line = line[1:]
+        elif line.startswith("\\!") or line.startswith("\\#"):
+            line = line[1:]
+        dir_only = line.endswith("/")
+        line = line.rstrip("/")
+        if not line:
+            return None
+        anchored = "/" in line
+        line = line.lstrip("/")
+        prefix = "" if anchored else "(?:.*/)?"
+        return (re.compile(prefix + _translate(line) + r"\Z"), negated, dir_only)
+
+    @staticmethod
+    def _combine(patterns):
+        if not patterns:
+            return None
+        return re.compile("|".join("(?:%s)" % p[0].pattern for p in patterns))
+
+    def __bool__(self) -> bool:
+        return bool(self.patterns)
+
+    def match(self, rel_path: str, is_dir: bool) -> Optional[bool]:
+        """
+        Returns True if the path is ignored, False if it is explicitly
+        re-included by a negation, and None if no pattern applies.
+        """
+        if self.base:
+            if not rel_path.startswith(self.base + "/"):
+                return None
+            rel_path = rel_path[len(self.base) + 1:]
+        combined = self._any_re if is_dir else self._file_re
+        if combined is None or combined.match(rel_path) is None:
+            return None
+        if not self.has_negation:
+            return True
+        for regex, negated, dir_only in reversed(self.patterns):
+            if dir_only and not is_dir:
+                continue
+            if regex.match(rel_path):
+                return not negated
+        return None
+
+def load_rules(path: Path, base: str = "") -> Optional[IgnoreRules]:
+    """Reads an ignore file into compiled rules. Returns None if missing or empty."""
+    try:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            rules = IgnoreRules(f.readlines(), base)
+    except OSError:
+        return None
+    return rules if rules else None
+
+def is_ignored(stack: Sequence[IgnoreRules], rel_path: str, is_dir: bool) -> bool:
+    """
+    Evaluates a stack of rule sets ordered from lowest to highest precedence
+    (global excludes, info/exclude, then `.gitignore` files root to leaf).
+    The highest-precedence set with a matching pattern decides.
+    """
+    for rules in reversed(stack):
+        verdict = rules.match(rel_path, is_dir)
+        if verdict is not None:
+            return verdict
+    return False
+
+def _read_config_value(config_path: Path, section: str, key: str) -> Optional[str]:
+    """Minimal git-config lookup for a single `[section] key = value` entry."""
+    try:
+        lines = config_path.read_text(errors="replace").splitlines()
+    except OSError:
+        return None
+    current = None
+    value = None
+    for raw in lines:
+        line = raw.strip()
+        if not line or line[0] in "#;":
+            continue
+        if line.startswith("["):
+            current = line[1:line.find("]")].strip().lower()
+            continue
+        if current == section and "=" in line:
+            k, v = line.split("=", 1)
+            if k.strip().lower() == key:
+                value = v.strip().strip('"')
+    return value
+
+def global_rules(git_dir: Optional[Path] = None) -> List[IgnoreRules]:
+    """
+    The repository-independent ignore sources, lowest precedence first:
+    `core.excludesFile` (or the XDG default) and `$GIT_DIR/info/exclude`.
+    """
+    stack = []
+    excludes = None
+    for config in ([git_dir / "config"] if git_dir else []) + [Path.home() / ".gitconfig"]:
+        excludes = _read_config_value(config, "core", "excludesfile")
+        if excludes:
+            break
+    if excludes:
+        excludes_path = Path(os.path.expanduser(excludes))
+    else:
+        xdg = os.environ.get("XDG_CONFIG_HOME") or str(Path.home() / ".config")
+        excludes_path = Path(xdg) / "git" / "ignore"
+    rules = load_rules(excludes_path)
+    if rules:
+        stack.append(rules)
+    if git_dir is not None:
+        rules = load_rules(git_dir / "info" / "exclude")
+        if rules:
+            stack.append(rules)
+    return stack
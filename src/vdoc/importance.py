@@ -0,0 +1,101 @@
+import heapq
+import math
+import os
+import re
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
+
+# Importance of a file (repo-relative posix path) when a listing is too long
+# to show in full: higher is shown first. Any callable of this shape can
+# replace the default scorer.
+Scorer = Callable[[str], float]
+
+# File names (without extension) that usually start a program or package
+ENTRY_POINT_STEMS = {
+    "main", "index", "app", "cli", "server", "__main__", "manage", "wsgi", "asgi",
+    "lib", "mod", "root", "program", "application", "bootstrap",
+}
+
+# Test files and directories, across the common naming conventions
+TEST_NAME = re.compile(r"(?:^test_.*|.*_test\.\w+|.*[.-](?:test|spec)\.\w+|conftest\.py|.*Tests?\.(?:java|kt|cs|swift))\Z")
+TEST_DIRS = {"test", "tests", "__tests__", "spec", "specs", "testdata", "fixtures"}
+
+# Build output, bundles, lockfiles and code generated from schemas
+GENERATED_NAME = re.compile(
+    r".*(?:\.min\.(?:js|css)|\.map|\.lock|-lock\.(?:json|yaml)|_pb2(?:_grpc)?\.pyi?|\.pb\.go|\.pb\.(?:h|cc)"
+    r"|\.g\.dart|\.generated\.\w+|\.designer\.cs|\.snap)\Z"
+)
+
+# Score weights of the default scorer
+ENTRY_POINT_BONUS = 3.0
+MANIFEST_BONUS = 6.0
+# Per doubling of size above SIZE_UNIT bytes, up to SIZE_CAP
+SIZE_WEIGHT = 0.5
+SIZE_UNIT = 256
+SIZE_CAP = 6.0
+DEPTH_PENALTY = 0.5
+TEST_PENALTY = 4.0
+GENERATED_PENALTY = 5.0
+# Dotfiles (.eslintrc, .editorconfig) and package markers (__init__.py)
+NOISE_PENALTY = 2.0
+
+def score_file(rel: str, size: Optional[int], referenced: bool = False) -> float:
+    """
+    Default importance of one file: entry-point names, files a manifest
+    references and larger files score higher; deeper paths, tests,
+    generated files, dotfiles and package markers score lower.
+    """
+    name = rel[rel.rfind("/") + 1:]
+    stem = name.split(".", 1)[0] if not name.startswith(".") else name
+    score = 0.0
+    if referenced:
+        score += MANIFEST_BONUS
+    if stem.lower() in ENTRY_POINT_STEMS:
+        score += ENTRY_POINT_BONUS
+    if size:
+        score += min(SIZE_WEIGHT * math.log2(1 + size / SIZE_UNIT), SIZE_CAP)
+    score -= DEPTH_PENALTY * rel.count("/")
+    if TEST_NAME.match(name) or not TEST_DIRS.isdisjoint(rel.split("/")[:-1]):
+        score -= TEST_PENALTY
+    if GENERATED_NAME.match(name):
+        score -= GENERATED_PENALTY
+    if name.startswith(".") or name == "__init__.py":
+        score -= NOISE_PENALTY
+    return score
+
+def default_scorer(root_path: Path, referenced: Iterable[str] = ()) -> Scorer:
+    """
+    The default scorer for a project. Sizes are stat'ed lazily, so only
+    files in listings that actually overflow are touched, and each file is
+    scored once (budget fitting renders a listing several times).
+    """
+    prefix = os.path.join(str(root_path), "")
+    manifest_refs = set(referenced)
+    scores: Dict[str, float] = {}
+
+    def score(rel: str) -> float:
+        known = scores.get(rel)
+        if known is not None:
+            return known
+        try:
+            size: Optional[int] = os.stat(prefix + rel).st_size
+        except OSError:
+            size = None
+        scores[rel] = known = score_file(rel, size, rel in manifest_refs)
+        return known
+
+    return score
+
+def top_k(names: List[str], k: int, score: Callable[[str], float]) -> List[str]:
+    """
+    The k highest-scoring names, kept in their original order. Selected with
+    a bounded heap (O(n log k)) rather than a full sort; ties go to the
+    earlier name.
+    """
+    if len(names) <= k:
+        return list(names)
+    if k <= 0:
+        return []
+    scores = [score(name) for name in names]
+    best = heapq.nlargest(k, range(len(names)), key=lambda i: (scores[i], -i))
+    return [names[i] for i in sorted(best)]
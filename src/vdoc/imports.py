@@ -0,0 +1,332 @@
+import posixpath
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple, Union
+from vdoc import budget, timing
+from vdoc.cache import ScanCache, cached_map
+from vdoc.filetable import FileTable, as_table
+
+# Extension -> import grammar. go.mod files are read too, for the module path
+# that Go imports of the repo's own packages start with.
+IMPORT_LANGUAGES = {
+    ".py": "python", ".pyi": "python",
+    ".js": "js", ".mjs": "js", ".cjs": "js", ".jsx": "js",
+    ".ts": "js", ".mts": "js", ".cts": "js", ".tsx": "js",
+    ".go": "go",
+}
+GO_MOD = "go.mod"
+
+# Files larger than this are almost always generated or minified
+MAX_IMPORT_FILE_BYTES = 1_000_000
+
+# Extensions tried, in order, for an extensionless relative JS/TS import
+JS_RESOLVE_EXTENSIONS = (".ts", ".tsx", ".js", ".jsx", ".mjs", ".cjs", ".mts", ".cts")
+# TypeScript ESM code imports './x.js' for the source file x.ts
+JS_SOURCE_FOR = {".js": (".ts", ".tsx"), ".jsx": (".tsx",), ".mjs": (".mts",), ".cjs": (".cts",)}
+
+# Lines of the map's Dependencies section
+HUB_CAP = 8
+FAN_OUT_CAP = 5
+DIR_EDGE_CAP = 8
+# Smaller (hubs, fan-out, directory edges) caps tried, in order, when the
+# section has to fit a token limit
+SUMMARY_FALLBACK_CAPS = ((4, 3, 4), (2, 1, 2), (1, 1, 1))
+
+_PY_IMPORT = re.compile(r"^[ \t]*import[ \t]+([\w. \t,]+)", re.M)
+_PY_FROM = re.compile(r"^[ \t]*from[ \t]+(\.*[\w.]*)[ \t]+import[ \t]+(\([^)]*\)|[^\n#;]+)", re.M)
+_JS_FROM = re.compile(r"""(?:^|[;}\s])(?:import|export)\b[^'";]*?\bfrom\s*['"]([^'"\n]+)['"]""", re.M)
+_JS_BARE = re.compile(r"""^[ \t]*import\s*['"]([^'"\n]+)['"]""", re.M)
+_JS_CALL = re.compile(r"""\b(?:require|import)\s*\(\s*['"]([^'"\n]+)['"]\s*\)""")
+_GO_SINGLE = re.compile(r'^import[ \t]+(?:[\w.]+[ \t]+)?"([^"]+)"', re.M)
+_GO_BLOCK = re.compile(r"^import[ \t]*\(([^)]*)\)", re.M)
+_GO_SPEC = re.compile(r'^[ \t]*(?:[\w.]+[ \t]+)?"([^"]+)"', re.M)
+_GO_MODULE = re.compile(r"^module[ \t]+(\S+)", re.M)
+
+def _as_names(clause: str) -> List[str]:
+    """Names of an import clause: 'a as b, c' -> ['a', 'c']."""
+    return [part.split()[0] for part in clause.strip("() \t").replace("\n", " ").split(",") if part.strip()]
+
+def extract_imports(text: str, lang: str) -> List[str]:
+    """
+    Import specifiers of a source file, in file order without duplicates:
+    dotted modules for Python (`from a import b` gives 'a.b', since b may be
+    a submodule), module strings for JS/TS and Go, the module path for go.mod.
+    """
+    found: List[Tuple[int, str]] = []
+    if lang == "python":
+        for m in _PY_IMPORT.finditer(text):
+            found.extend((m.start(), name) for name in _as_names(m.group(1)))
+        for m in _PY_FROM.finditer(text):
+            base = m.group(1)
+            sep = "" if base.endswith(".") else "."
+            for name in _as_names(m.group(2)):
+                found.append((m.start(), base if name == "*" else base + sep + name))
+    elif lang == "js":
+        for regex in (_JS_FROM, _JS_BARE, _JS_CALL):
+            found.extend((m.start(1), m.group(1)) for m in regex.finditer(text))
+    elif lang == "go":
+        found.extend((m.start(), m.group(1)) for m in _GO_SINGLE.finditer(text))
+        for block in _GO_BLOCK.finditer(text):
+            found.extend((block.start(), m.group(1)) for m in _GO_SPEC.finditer(block.group(1)))
+    elif lang == "gomod":
+        m = _GO_MODULE.search(text)
+        return [m.group(1)] if m else []
+    found.sort(key=lambda item: item[0])
+    return list(dict.fromkeys(spec for _, spec in found))
+
+def _parse_file(job: Tuple[str, str, str]) -> Optional[List[str]]:
+    """Worker: import specifiers of one (rel, path, grammar) file; None when unreadable."""
+    _, path, lang = job
+    try:
+        with open(path, "rb") as f:
+            data = f.read(MAX_IMPORT_FILE_BYTES + 1)
+    except OSError:
+        return None
+    if len(data) > MAX_IMPORT_FILE_BYTES:
+        return []
+    return extract_imports(data.decode("utf-8", "replace"), lang)
+
+@dataclass
+class ImportGraph:
+    """
+    Module-level import graph of the repo's own code. Nodes are source files
+    for Python and JS/TS, and package directories (with a trailing slash,
+    './' for the root) for Go. Imports of third-party code are left out.
+    """
+    edges: Dict[str, List[str]] = field(default_factory=dict)
+
+    def fan_in(self) -> Counter:
+        """Number of modules importing each module."""
+        counts: Counter = Counter()
+        for targets in self.edges.values():
+            counts.update(targets)
+        return counts
+
+    def fan_out(self) -> Counter:
+        """Number of repo modules each module imports."""
+        return Counter({node: len(targets) for node, targets in self.edges.items() if targets})
+
+    def directory_edges(self) -> Counter:
+        """Imports between different directories, counted per (importer dir, imported dir)."""
+        counts: Counter = Counter()
+        for node, targets in self.edges.items():
+            source = _directory(node)
+            for target in targets:
+                target_dir = _directory(target)
+                if target_dir != source:
+                    counts[(source, target_dir)] += 1
+        return counts
+
+    def relative_to(self, prefix: str) -> "ImportGraph":
+        """The part of the graph inside directory prefix ('pkg/'), with paths relative to it."""
+        skip = len(prefix)
+        edges = {}
+        for node, targets in self.edges.items():
+            if node.startswith(prefix):
+                edges[node[skip:] or "./"] = [t[skip:] or "./" for t in targets if t.startswith(prefix)]
+        return ImportGraph(edges)
+
+def _directory(node: str) -> str:
+    if node.endswith("/"):
+        return node
+    slash = node.rfind("/")
+    return node[:slash + 1] if slash >= 0 else "./"
+
+def _go_package(rel: str) -> str:
+    slash = rel.rfind("/")
+    return rel[:slash + 1] if slash >= 0 else "./"
+
+class _Resolver:
+    """Maps import specifiers to repo nodes, using the set of listed source files."""
+
+    def __init__(self, known: Set[str], go_modules: Dict[str, str]):
+        self.known = known
+        self.go_dirs = {_go_package(rel) for rel in known if rel.endswith(".go")}
+        # Python module paths without extension, and every directory holding
+        # Python code: a base directory is only searched when the first
+        # component of an import is one of them
+        self.py_heads: Set[str] = set()
+        for rel in known:
+            if rel.endswith((".py", ".pyi")):
+                self.py_heads.add(rel[:rel.rfind(".")])
+                slash = rel.rfind("/")
+                while slash > 0 and rel[:slash] not in self.py_heads:
+                    self.py_heads.add(rel[:slash])
+                    slash = rel.rfind("/", 0, slash)
+        # Last components of the above: an absolute import whose first
+        # component is not among them (stdlib, third-party) is rejected at once
+        self.py_names = {head[head.rfind("/") + 1:] for head in self.py_heads}
+        # Longest module path first, so nested modules win
+        self.go_modules = sorted(go_modules.items(), key=lambda item: -len(item[0]))
+
+    def python(self, rel: str, spec: str) -> Optional[str]:
+        dots = len(spec) - len(spec.lstrip("."))
+        parts = [p for p in spec[dots:].split(".") if p]
+        if not dots and (not parts or parts[0] not in self.py_names):
+            return None
+        here = rel.split("/")[:-1]
+        if dots:
+            if dots - 1 > len(here):
+                return None
+            bases = ["/".join(here[:len(here) - (dots - 1)])]
+        else:
+            # Absolute imports: the importing file's directory and each ancestor
+            # (covers sub-projects), deepest first, each also with a src/ layout
+            bases = []
+            for i in range(len(here), -1, -1):
+                base = "/".join(here[:i])
+                bases += [base, base + "/src" if base else "src"]
+        for base in bases:
+            prefix = base + "/" if base else ""
+            if parts and prefix + parts[0] not in self.py_heads and not dots:
+                continue
+            for n in range(len(parts), 0, -1):
+                stem = prefix + "/".join(parts[:n])
+                for candidate in (stem + ".py", stem + "/__init__.py", stem + ".pyi"):
+                    if candidate in self.known:
+                        return candidate
+            if dots and prefix + "__init__.py" in self.known:
+                return prefix + "__init__.py"
+        return None
+
+    def js(self, rel: str, spec: str) -> Optional[str]:
+        if not spec.startswith("."):
+            return None  # packages and path aliases
+        spec = spec.split("?", 1)[0]
+        directory = rel[:rel.rfind("/") + 1]
+        if spec.startswith("./") and "/." not in spec:
+            path = directory + spec[2:]
+        else:
+            path = posixpath.normpath(directory + spec)
+            if path == ".." or path.startswith("../"):
+                return None
+        if path in self.known:
+            return path
+        stem, ext = posixpath.splitext(path)
+        for source_ext in JS_SOURCE_FOR.get(ext, ()):
+            if stem + source_ext in self.known:
+                return stem + source_ext
+        for candidate_ext in JS_RESOLVE_EXTENSIONS:
+            if path + candidate_ext in self.known:
+                return path + candidate_ext
+        index = "index" if path == "." else path + "/index"
+        for candidate_ext in JS_RESOLVE_EXTENSIONS:
+            if index + candidate_ext in self.known:
+                return index + candidate_ext
+        return None
+
+    def go(self, spec: str) -> Optional[str]:
+        for module, directory in self.go_modules:
+            if spec == module or spec.startswith(module + "/"):
+                node = directory + spec[len(module) + 1:]
+                node = node + "/" if node and not node.endswith("/") else node or "./"
+                return node if node in self.go_dirs else None
+        return None
+
+def build_import_graph(
+    root_path: Path,
+    files: Union[FileTable, List[Path]],
+    cache: Optional[ScanCache] = None,
+    workers: Optional[int] = None,
+) -> ImportGraph:
+    """
+    Builds the import graph of the Python, JS/TS and Go files in the listing.
+    Import specifiers are extracted per file (on a process pool for large
+    batches) and cached while the file's stamp is unchanged; resolving them
+    to repo paths is redone on every build, since it depends on the listing.
+    """
+    with timing.phase("imports"):
+        return graph_from_specs(_specs(root_path, as_table(root_path, files), cache, workers))
+
+def import_specs(
+    root_path: Path,
+    files: Union[FileTable, List[Path]],
+    cache: Optional[ScanCache] = None,
+    workers: Optional[int] = None,
+) -> Dict[str, Tuple[str, List[str]]]:
+    """
+    (grammar, import specifiers) per file, as build_import_graph extracts
+    them. For callers that keep the specifiers up to date file by file and
+    resolve them with `graph_from_specs`.
+    """
+    with timing.phase("imports"):
+        return _specs(root_path, as_table(root_path, files), cache, workers)
+
+def _specs(root_path: Path, table: FileTable, cache: Optional[ScanCache], workers: Optional[int]) -> Dict[str, Tuple[str, List[str]]]:
+    ext_langs = [IMPORT_LANGUAGES.get(ext) for ext in table.exts]
+    ext_ids = table.ext_ids
+    langs: Dict[str, str] = {}
+    for i, rel in enumerate(table.rels()):
+        lang = ext_langs[ext_ids[i]]
+        if lang is None:
+            if rel != GO_MOD and not rel.endswith("/" + GO_MOD):
+                continue
+            lang = "gomod"
+        langs[rel] = lang
+    # Cached specifiers for unchanged files; the rest are parsed on a process pool
+    found = cached_map(
+        root_path, cache, "imports", langs.items(), _parse_file,
+        counter="import_files_parsed", workers=workers, processes=True,
+    )
+    return {rel: (langs[rel], specs) for rel, specs in found.items()}
+
+def graph_from_specs(specs: Dict[str, Tuple[str, List[str]]]) -> ImportGraph:
+    """Resolves per-file import specifiers (see `import_specs`) to the repo's modules."""
+    go_modules = {}
+    for rel, (lang, found) in specs.items():
+        if lang == "gomod" and found:
+            go_modules[found[0]] = rel[:-len(GO_MOD)]
+    resolver = _Resolver({rel for rel, (lang, _) in specs.items() if lang != "gomod"}, go_modules)
+    edges: Dict[str, Set[str]] = {}
+    for rel, (lang, found) in specs.items():
+        if lang == "gomod" or not found:
+            continue
+        node = _go_package(rel) if lang == "go" else rel
+        targets = edges.setdefault(node, set())
+        for spec in found:
+            if lang == "python":
+                target = resolver.python(rel, spec)
+            elif lang == "js":
+                target = resolver.js(rel, spec)
+            else:
+                target = resolver.go(spec)
+            if target is not None and target != node:
+                targets.add(target)
+    return ImportGraph({node: sorted(targets) for node, targets in sorted(edges.items()) if targets})
+
+def summary_lines(graph: ImportGraph, max_tokens: Optional[int] = None) -> List[str]:
+    """
+    The map's Dependencies section: the most imported modules (hubs), the
+    modules importing the most others, and the busiest directory-to-directory
+    dependencies. Empty when the repo's modules do not import each other.
+    With max_tokens, fewer entries are listed until the section fits, and it
+    is left out when even one entry per line does not.
+    """
+    fan_in = graph.fan_in()
+    if not fan_in:
+        return []
+    fan_out = graph.fan_out()
+    dir_counts = graph.directory_edges()
+    for caps in ((HUB_CAP, FAN_OUT_CAP, DIR_EDGE_CAP),) + SUMMARY_FALLBACK_CAPS:
+        lines = _summary(fan_in, fan_out, dir_counts, *caps)
+        if max_tokens is None or budget.estimate_lines(lines) <= max_tokens:
+            return lines
+    return []
+
+def _summary(fan_in: Counter, fan_out: Counter, dir_counts: Counter, hub_cap: int, fan_out_cap: int, dir_cap: int) -> List[str]:
+    lines = ["## Dependencies"]
+    hubs = [(node, n) for node, n in _ranked(fan_in, hub_cap) if n > 1]
+    if hubs:
+        lines.append("- **Most imported:** " + ", ".join(f"{node} ({n})" for node, n in hubs))
+    lines.append("- **Most imports:** " + ", ".join(f"{node} ({n})" for node, n in _ranked(fan_out, fan_out_cap)))
+    dir_edges = _ranked(dir_counts, dir_cap)
+    if dir_edges:
+        lines.append("- **Between directories:** " + ", ".join(f"{a} -> {b} ({n})" for (a, b), n in dir_edges))
+    lines.append("")
+    return lines
+
+def _ranked(counts: Counter, cap: int) -> List[Tuple]:
+    """Top entries by count, ties broken by name so the map is stable."""
+    return sorted(counts.items(), key=lambda item: (-item[1], item[0]))[:cap]
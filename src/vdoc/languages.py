@@ -0,0 +1,163 @@
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+from vdoc import timing
+from vdoc.cache import ScanCache, cached_map
+from vdoc.filetable import FileTable, as_table
+
+# Language detection by extension
+EXTENSIONS = {
+    ".py": "Python", ".pyi": "Python", ".pyw": "Python",
+    ".js": "JavaScript", ".mjs": "JavaScript", ".cjs": "JavaScript",
+    ".ts": "TypeScript", ".mts": "TypeScript", ".cts": "TypeScript",
+    ".tsx": "TypeScript (React)", ".jsx": "JavaScript (React)",
+    ".vue": "Vue", ".svelte": "Svelte",
+    ".go": "Go", ".rs": "Rust", ".java": "Java",
+    ".kt": "Kotlin", ".kts": "Kotlin", ".scala": "Scala", ".groovy": "Groovy", ".gradle": "Groovy",
+    ".c": "C", ".h": "C", ".cpp": "C++", ".cc": "C++", ".cxx": "C++", ".hpp": "C++", ".hh": "C++", ".hxx": "C++",
+    ".cs": "C#", ".fs": "F#", ".m": "Objective-C", ".mm": "Objective-C", ".swift": "Swift",
+    ".rb": "Ruby", ".php": "PHP", ".pl": "Perl", ".pm": "Perl", ".lua": "Lua", ".r": "R", ".R": "R",
+    ".dart": "Dart", ".ex": "Elixir", ".exs": "Elixir", ".erl": "Erlang", ".hs": "Haskell",
+    ".clj": "Clojure", ".ml": "OCaml", ".zig": "Zig", ".nim": "Nim", ".jl": "Julia",
+    ".sh": "Shell", ".bash": "Shell", ".zsh": "Shell", ".fish": "Shell", ".ps1": "PowerShell",
+    ".sql": "SQL", ".proto": "Protocol Buffers", ".graphql": "GraphQL", ".tf": "HCL",
+    ".html": "HTML", ".htm": "HTML", ".css": "CSS", ".scss": "SCSS", ".sass": "SCSS", ".less": "Less",
+    ".md": "Markdown", ".mdx": "Markdown", ".rst": "reStructuredText",
+}
+
+# Well-known file names without a telling extension
+FILENAMES = {
+    "Makefile": "Makefile", "GNUmakefile": "Makefile", "makefile": "Makefile",
+    "Dockerfile": "Dockerfile", "Containerfile": "Dockerfile",
+    "Rakefile": "Ruby", "Gemfile": "Ruby", "Vagrantfile": "Ruby", "Podfile": "Ruby",
+    "Jenkinsfile": "Groovy", "CMakeLists.txt": "CMake",
+    "BUILD": "Starlark", "BUILD.bazel": "Starlark", "WORKSPACE": "Starlark",
+}
+
+# Shebang interpreters (after `env` and version suffixes are stripped)
+INTERPRETERS = {
+    "python": "Python", "node": "JavaScript", "deno": "TypeScript", "bun": "JavaScript",
+    "sh": "Shell", "bash": "Shell", "zsh": "Shell", "dash": "Shell", "ksh": "Shell", "fish": "Shell",
+    "ruby": "Ruby", "perl": "Perl", "php": "PHP", "lua": "Lua", "Rscript": "R", "pwsh": "PowerShell",
+}
+
+# Bytes read from an extensionless file to look for a shebang
+SNIFF_BYTES = 256
+# Line counting reads files in chunks of this size
+CHUNK_BYTES = 1024 * 1024
+
+@dataclass
+class LanguageStats:
+    files: int = 0
+    lines: int = 0
+    bytes: int = 0
+
+# (language, lines, bytes) of one file
+FileLanguage = Tuple[str, int, int]
+
+def classify_name(name: str) -> Optional[str]:
+    """Language of a file name, by well-known name or extension (no I/O), or None."""
+    lang = FILENAMES.get(name)
+    if lang is not None:
+        return lang
+    return EXTENSIONS.get(os.path.splitext(name)[1])
+
+def sniff_shebang(head: bytes) -> Optional[str]:
+    """Language named by a `#!` line, e.g. `#!/usr/bin/env python3` -> Python."""
+    if not head.startswith(b"#!"):
+        return None
+    words = head[2:].split(b"\n", 1)[0].decode("utf-8", "replace").split()
+    if words and words[0].rsplit("/", 1)[-1] == "env":
+        words = [w for w in words[1:] if not w.startswith("-") and "=" not in w]
+    if not words:
+        return None
+    interpreter = words[0].rsplit("/", 1)[-1].rstrip("0123456789.")
+    return INTERPRETERS.get(interpreter)
+
+def _measure(job: Tuple[str, str, Optional[str]]) -> List:
+    """
+    Worker: [language, lines, bytes] of one (rel, path, language) file. A
+    file without a known language is only sniffed for a shebang
+    (SNIFF_BYTES) and stays [None, 0, 0] without one; otherwise its lines
+    are counted.
+    """
+    _, path, lang = job
+    try:
+        with open(path, "rb") as f:
+            chunk = f.read(SNIFF_BYTES if lang is None else CHUNK_BYTES)
+            if lang is None:
+                lang = sniff_shebang(chunk)
+                if lang is None:
+                    return [None, 0, 0]
+                chunk += f.read(CHUNK_BYTES)
+            lines, size, last = 0, 0, b"\n"
+            while chunk:
+                lines += chunk.count(b"\n")
+                size += len(chunk)
+                last = chunk[-1:]
+                chunk = f.read(CHUNK_BYTES)
+    except OSError:
+        return [None, 0, 0]
+    # A last line without a trailing newline still counts
+    return [lang, lines + (last != b"\n"), size]
+
+def language_stats(
+    root_path: Path,
+    files: Union[FileTable, List[Path]],
+    cache: Optional[ScanCache] = None,
+    workers: Optional[int] = None,
+) -> Dict[str, LanguageStats]:
+    """
+    Files, lines and bytes per language. Files are classified by name,
+    extension or (extensionless files only) shebang; lines are counted on a
+    thread pool. Per-file results are reused from the scan cache while the
+    file's stamp is unchanged.
+    """
+    with timing.phase("languages"):
+        return summarize(_collect(root_path, as_table(root_path, files), cache, workers))
+
+def file_languages(
+    root_path: Path,
+    files: Union[FileTable, List[Path]],
+    cache: Optional[ScanCache] = None,
+    workers: Optional[int] = None,
+) -> Dict[str, FileLanguage]:
+    """
+    Per-file (language, lines, bytes) of the files with a language, as
+    language_stats measures them. For callers that keep the stats up to
+    date file by file (see `summarize`).
+    """
+    with timing.phase("languages"):
+        return _collect(root_path, as_table(root_path, files), cache, workers)
+
+def summarize(measured: Dict[str, FileLanguage]) -> Dict[str, LanguageStats]:
+    """Files, lines and bytes per language from per-file measurements."""
+    stats: Dict[str, LanguageStats] = {}
+    for lang, lines, size in measured.values():
+        entry = stats.get(lang)
+        if entry is None:
+            entry = stats[lang] = LanguageStats()
+        entry.files += 1
+        entry.lines += lines
+        entry.bytes += size
+    return stats
+
+def _collect(root_path: Path, table: FileTable, cache: Optional[ScanCache], workers: Optional[int]) -> Dict[str, FileLanguage]:
+    # 1. Classify by name; only known languages and extensionless files are read
+    ext_langs = [EXTENSIONS.get(ext) for ext in table.exts]
+    ext_ids = table.ext_ids
+    files = []
+    for i, rel in enumerate(table.rels()):
+        eid = ext_ids[i]
+        lang = ext_langs[eid]
+        if lang is None:
+            # No well-known file name has a known extension, so this matches classify_name
+            lang = FILENAMES.get(rel[rel.rfind("/") + 1:])
+            if lang is None and table.exts[eid]:
+                continue
+        files.append((rel, lang))
+
+    # 2. Cached results for unchanged files; the rest are measured on a thread pool
+    found = cached_map(root_path, cache, "languages", files, _measure, counter="files_measured", workers=workers)
+    return {rel: (lang, lines, size) for rel, (lang, lines, size) in found.items() if lang is not None}
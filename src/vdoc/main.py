@@ -1,7 +1,9 @@
 import typer
-from .commands import init, plan, exec, update, delete_cli
+from pathlib import Path
 from typing import Optional
-import importlib.metadata
+
+# Command modules (and the git/httpx/pydantic stacks behind them) are imported
+# inside each command, so `vdoc --help` and light commands start fast.
 
 app = typer.Typer(
     help="VDoc - Local Context Builder for IDE Agents",
@@ -11,6 +13,7 @@ app = typer.Typer(
 
 def version_callback(value: bool):
     if value:
+        import importlib.metadata
         try:
             version = importlib.metadata.version("vdoc")
         except importlib.metadata.PackageNotFoundError:
@@ -18,40 +21,125 @@ def version_callback(value: bool):
         typer.echo(f"vdoc version: {version}")
         raise typer.Exit()
 
+TIMINGS_FORMATS = ("text", "json")
+
 @app.callback()
 def main(
+    ctx: typer.Context,
     version: Optional[bool] = typer.Option(
         None, "--version", "-v", help="Show the application version and exit.", callback=version_callback, is_eager=True
-    )
+    ),
+    timings: bool = typer.Option(False, "--timings", help="Report wall/CPU time per phase and counts on stderr"),
+    timings_format: str = typer.Option("text", "--timings-format", help="Format of the --timings report: text or json"),
+    profile: Optional[Path] = typer.Option(None, "--profile", metavar="FILE", help="Write a cProfile (pstats) dump of the command to FILE")
 ):
     """
     VDoc - Local Context Builder for IDE Agents
     """
-    pass
+    if timings_format not in TIMINGS_FORMATS:
+        raise typer.BadParameter(f"expected one of: {', '.join(TIMINGS_FORMATS)}", param_hint="--timings-format")
+    if timings:
+        _start_timings(ctx, timings_format)
+    if profile is not None:
+        _start_profile(ctx, profile)
+
+def _start_timings(ctx: typer.Context, fmt: str) -> None:
+    """Records phases for the rest of the run; the report is printed when the command finishes (or fails)."""
+    import sys
+    from . import timing
+
+    recorder = timing.enable()
+
+    def report():
+        timing.disable()
+        formatter = timing.format_json if fmt == "json" else timing.format_text
+        print(formatter(recorder.report()), file=sys.stderr)
+
+    ctx.call_on_close(report)
+
+def _start_profile(ctx: typer.Context, path: Path) -> None:
+    """Profiles the command (main thread only) and dumps pstats to path when it finishes."""
+    import cProfile
+    import sys
+
+    profiler = cProfile.Profile()
+
+    def dump():
+        profiler.disable()
+        profiler.dump_stats(str(path))
+        print(f"Profile written to {path} (inspect with: python -m pstats {path})", file=sys.stderr)
+
+    ctx.call_on_close(dump)
+    profiler.enable()
 
 @app.command(name="init")
-def main_init(api_key: str = typer.Option(None, help="VibePM API Key")):
+def main_init(
+    api_key: str = typer.Option(None, help="VibePM API Key"),
+    no_cache: bool = typer.Option(False, "--no-cache", help="Ignore and rebuild the scan cache"),
+    token_budget: Optional[int] = typer.Option(None, "--token-budget", min=1, help="Trim the context map so the prompt fits N tokens"),
+    workspace: bool = typer.Option(False, "--workspace", help="Build one context map per monorepo package plus an index")
+):
     """Initialize the VDoc project."""
-    init.run_init(api_key)
+    from .commands import init
+    init.run_init(api_key, use_cache=not no_cache, token_budget=token_budget, workspace=workspace)
 
 @app.command(name="plan")
-def main_plan(save: bool = typer.Option(False, "--save", help="Save prompt to file instead of stdout")):
+def main_plan(
+    save: bool = typer.Option(False, "--save", help="Save prompt to file instead of stdout"),
+    token_budget: Optional[int] = typer.Option(None, "--token-budget", min=1, help="Trim the context map so the prompt fits N tokens"),
+    package: Optional[str] = typer.Option(None, "--package", help="Plan one workspace package (see --workspace)")
+):
     """Generate a documentation context map and planning prompt."""
-    plan.run_plan(save)
+    from .commands import plan
+    plan.run_plan(save, token_budget=token_budget, package=package)
 
 @app.command(name="exec")
 def main_exec(save: bool = typer.Option(False, "--save", help="Save prompt to file instead of stdout")):
     """Execute a documentation plan."""
+    from .commands import exec
     exec.run_exec(save)
 
 @app.command(name="update")
-def main_update(save: bool = typer.Option(False, "--save", help="Save prompt to file instead of stdout")):
+def main_update(
+    save: bool = typer.Option(False, "--save", help="Save prompt to file instead of stdout"),
+    no_cache: bool = typer.Option(False, "--no-cache", help="Ignore and rebuild the scan cache"),
+    token_budget: Optional[int] = typer.Option(None, "--token-budget", min=1, help="Trim the context map so the prompt fits N tokens"),
+    workspace: bool = typer.Option(False, "--workspace", help="Refresh one context map per monorepo package plus an index"),
+    since: Optional[str] = typer.Option(None, "--since", metavar="REF", help="Only emit what changed since a git ref"),
+    delta: bool = typer.Option(False, "--delta", help="Only emit what changed since the commit recorded by the last init or saved update"),
+    stale: bool = typer.Option(False, "--stale", help="Only list the docs whose source files changed since they were written")
+):
     """Update documentation based on the current codebase state."""
-    update.run_update(save)
+    from .commands import update
+    update.run_update(
+        save, use_cache=not no_cache, token_budget=token_budget, workspace=workspace,
+        since=since, delta=delta, stale=stale,
+    )
+
+@app.command(name="watch")
+def main_watch(
+    no_cache: bool = typer.Option(False, "--no-cache", help="Ignore and rebuild the scan cache"),
+    poll: bool = typer.Option(False, "--poll", help="Poll for changes instead of using inotify"),
+    debounce: float = typer.Option(0.3, "--debounce", min=0.0, help="Seconds without changes before the map is rewritten")
+):
+    """Keep the context map up to date while files change."""
+    from .commands import watch
+    watch.run_watch(use_cache=not no_cache, poll=poll, debounce=debounce)
+
+@app.command(name="serve")
+def main_serve(
+    no_watch: bool = typer.Option(False, "--no-watch", help="Do not refresh the index from file changes"),
+    poll: bool = typer.Option(False, "--poll", help="Poll for changes instead of using inotify"),
+    no_cache: bool = typer.Option(False, "--no-cache", help="Ignore and rebuild the scan cache")
+):
+    """Serve prompts and context-map tools over MCP (stdio)."""
+    from .commands import serve
+    serve.run_serve(watch_files=not no_watch, poll=poll, use_cache=not no_cache)
 
 @app.command(name="delete-cli")
 def main_delete_cli():
     """Remove all VDoc configuration and integrations."""
+    from .commands import delete_cli
     delete_cli.run_delete_cli()
 
 if __name__ == "__main__":
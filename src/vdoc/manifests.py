@@ -0,0 +1,334 @@
+import json
+import os
+import re
+import xml.etree.ElementTree as ElementTree
+from typing import Dict, Iterable, List, Optional, Set
+
+# Dependency rules: (ecosystem, full-match pattern on the dependency name, framework).
+# Names are normalised before matching: Python per PEP 503, everything else lowercased.
+FRAMEWORK_RULES = [
+    ("python", r"django", "Django"),
+    ("python", r"fastapi", "FastAPI"),
+    ("python", r"flask", "Flask"),
+    ("python", r"tornado", "Tornado"),
+    ("python", r"pyramid", "Pyramid"),
+    ("python", r"bottle", "Bottle"),
+    ("python", r"falcon", "Falcon"),
+    ("python", r"sanic", "Sanic"),
+    ("python", r"starlette", "Starlette"),
+    ("python", r"litestar", "Litestar"),
+    ("npm", r"react", "React"),
+    ("npm", r"vue", "Vue"),
+    ("npm", r"@angular/core|angular", "Angular"),
+    ("npm", r"next", "Next.js"),
+    ("npm", r"nuxt3?", "Nuxt"),
+    ("npm", r"svelte|@sveltejs/kit", "Svelte"),
+    ("npm", r"express", "Express"),
+    ("npm", r"@nestjs/core", "NestJS"),
+    ("npm", r"koa", "Koa"),
+    ("npm", r"fastify", "Fastify"),
+    ("npm", r"@hapi/hapi|hapi", "Hapi"),
+    ("npm", r"meteor-node-stubs", "Meteor"),
+    ("npm", r"sails", "Sails"),
+    ("npm", r"@adonisjs/core", "AdonisJS"),
+    ("go", r"github\.com/gin-gonic/gin", "Gin"),
+    ("go", r"github\.com/gofiber/fiber(?:/v\d+)?", "Fiber"),
+    ("go", r"github\.com/labstack/echo(?:/v\d+)?", "Echo"),
+    ("go", r"github\.com/go-chi/chi(?:/v\d+)?", "Chi"),
+    ("go", r"github\.com/beego/beego(?:/v\d+)?|github\.com/astaxie/beego", "Beego"),
+    ("maven", r"org\.springframework\.boot:.*", "Spring Boot"),
+    ("maven", r"io\.micronaut(?:\.[\w.-]+)?:.*", "Micronaut"),
+    ("maven", r"io\.quarkus(?:\.[\w.-]+)?:.*", "Quarkus"),
+    ("maven", r"jakarta\.[\w.-]+:.*", "Jakarta EE"),
+    ("gem", r"rails", "Ruby on Rails"),
+    ("gem", r"sinatra", "Sinatra"),
+    ("gem", r"hanami", "Hanami"),
+    ("composer", r"laravel/framework", "Laravel"),
+    ("composer", r"symfony/framework-bundle", "Symfony"),
+    ("composer", r"codeigniter4?/framework", "CodeIgniter"),
+    ("composer", r"cakephp/cakephp", "CakePHP"),
+]
+
+# Directories whose manifests describe third-party code, not the project
+VENDORED_DIRS = {"node_modules", "vendor", "bower_components", "site-packages"}
+
+def _build_matcher():
+    """
+    Folds every rule into one regex over "ecosystem:name" keys, with one
+    capturing group per rule, so each dependency is classified by a single
+    match call whatever the number of rules.
+    """
+    alternatives = "|".join(f"({re.escape(eco)}:(?:{pattern}))" for eco, pattern, _ in FRAMEWORK_RULES)
+    return re.compile(rf"\A(?:{alternatives})\Z"), [framework for _, _, framework in FRAMEWORK_RULES]
+
+_MATCHER, _FRAMEWORKS = _build_matcher()
+
+def match_frameworks(ecosystem: str, names: Iterable[str]) -> Set[str]:
+    found = set()
+    for name in names:
+        m = _MATCHER.match(f"{ecosystem}:{name}")
+        if m is not None:
+            found.add(_FRAMEWORKS[m.lastindex - 1])
+    return found
+
+# --- Parsers: each returns the declared dependency names of one manifest ---
+
+_PEP508_NAME = re.compile(r"^\s*([A-Za-z0-9][A-Za-z0-9._-]*)")
+
+def _python_name(spec: str) -> Optional[str]:
+    m = _PEP508_NAME.match(spec)
+    return re.sub(r"[-_.]+", "-", m.group(1)).lower() if m else None
+
+def _load_toml(path: str) -> Dict:
+    import toml
+    return toml.load(path)
+
+def _parse_pyproject(path: str) -> Set[str]:
+    data = _load_toml(path)
+    specs: List[str] = []
+    project = data.get("project", {})
+    specs.extend(project.get("dependencies", []))
+    for group in project.get("optional-dependencies", {}).values():
+        specs.extend(group)
+    for group in data.get("dependency-groups", {}).values():
+        specs.extend(s for s in group if isinstance(s, str))
+    poetry = data.get("tool", {}).get("poetry", {})
+    specs.extend(poetry.get("dependencies", {}))
+    specs.extend(poetry.get("dev-dependencies", {}))
+    for group in poetry.get("group", {}).values():
+        specs.extend(group.get("dependencies", {}))
+    names = {_python_name(s) for s in specs}
+    names.discard(None)
+    names.discard("python")
+    return names
+
+def _parse_requirements(path: str) -> Set[str]:
+    names = set()
+    with open(path, encoding="utf-8", errors="replace") as f:
+        for line in f:
+            line = line.split(" #", 1)[0].strip()
+            # Options (-r, -e, --index-url ...), comments and direct URLs
+            if not line or line[0] in "#-" or "://" in line.split("@", 1)[0]:
+                continue
+            name = _python_name(line)
+            if name:
+                names.add(name)
+    return names
+
+def _parse_poetry_lock(path: str) -> Set[str]:
+    return {_python_name(p.get("name", "")) for p in _load_toml(path).get("package", [])} - {None}
+
+def _npm_deps(data: Dict) -> Set[str]:
+    names = set()
+    for key in ("dependencies", "devDependencies", "peerDependencies", "optionalDependencies"):
+        names.update(k.lower() for k in data.get(key) or {})
+    return names
+
+def _parse_package_json(path: str) -> Set[str]:
+    with open(path, encoding="utf-8") as f:
+        return _npm_deps(json.load(f))
+
+def _parse_package_lock(path: str) -> Set[str]:
+    # lockfileVersion >= 2 records the root package's own dependencies under
+    # packages[""]; older lockfiles only have the flattened (transitive) tree,
+    # which would report frameworks the project merely depends on indirectly.
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    return _npm_deps(data.get("packages", {}).get("", {}))
+
+_NPM_DEP_SECTIONS = ("dependencies", "devDependencies", "optionalDependencies")
+
+def _parse_pnpm_lock(path: str) -> Set[str]:
+    """
+    Direct dependencies from pnpm-lock.yaml: the top-level sections of
+    single-package lockfiles and each importer (workspace package) of newer
+    ones. A line-based reader is enough for this fixed layout.
+    """
+    names = set()
+    section, dep_indent = None, None
+    with open(path, encoding="utf-8", errors="replace") as f:
+        for line in f:
+            stripped = line.strip()
+            if not stripped or stripped.startswith("#"):
+                continue
+            indent = len(line) - len(line.lstrip(" "))
+            key = stripped.split(":", 1)[0].strip("'\"")
+            if indent == 0:
+                section = key
+                dep_indent = 2 if key in _NPM_DEP_SECTIONS else None
+            elif section == "importers" and indent == 4:
+                dep_indent = 6 if key in _NPM_DEP_SECTIONS else None
+            elif indent == dep_indent:
+                names.add(key.lower())
+    return names
+
+_GO_REQUIRE = re.compile(r"^\s*(?:require\s+)?([\w.\-~]+(?:/[\w.\-~]+)+)\s+v\S+", re.M)
+
+def _parse_go_mod(path: str) -> Set[str]:
+    with open(path, encoding="utf-8", errors="replace") as f:
+        return {m.group(1).lower() for m in _GO_REQUIRE.finditer(f.read())}
+
+def _parse_pom(path: str) -> Set[str]:
+    root = ElementTree.parse(path).getroot()
+    names = set()
+    for el in root.iter():
+        tag = el.tag.rsplit("}", 1)[-1]
+        if tag not in ("dependency", "parent", "plugin"):
+            continue
+        fields = {child.tag.rsplit("}", 1)[-1]: (child.text or "").strip() for child in el}
+        if fields.get("groupId"):
+            names.add(f"{fields['groupId']}:{fields.get('artifactId', '')}".lower())
+    return names
+
+_GEM = re.compile(r"""^\s*gem\s*\(?\s*["']([^"']+)["']""", re.M)
+
+def _parse_gemfile(path: str) -> Set[str]:
+    with open(path, encoding="utf-8", errors="replace") as f:
+        return {m.group(1).lower() for m in _GEM.finditer(f.read())}
+
+def _parse_composer(path: str) -> Set[str]:
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    return {k.lower() for key in ("require", "require-dev") for k in data.get(key) or {}}
+
+# Manifest file name -> (ecosystem, parser)
+MANIFEST_PARSERS: Dict[str, tuple] = {
+    "pyproject.toml": ("python", _parse_pyproject),
+    "requirements.txt": ("python", _parse_requirements),
+    "poetry.lock": ("python", _parse_poetry_lock),
+    "package.json": ("npm", _parse_package_json),
+    "package-lock.json": ("npm", _parse_package_lock),
+    "pnpm-lock.yaml": ("npm", _parse_pnpm_lock),
+    "go.mod": ("go", _parse_go_mod),
+    "pom.xml": ("maven", _parse_pom),
+    "Gemfile": ("gem", _parse_gemfile),
+    "composer.json": ("composer", _parse_composer),
+}
+
+# Lockfiles only count when the manifest they belong to is absent: most of
+# them list transitive packages too, which would report frameworks the
+# project merely depends on indirectly.
+LOCKFILE_OWNERS = {
+    "poetry.lock": "pyproject.toml",
+    "package-lock.json": "package.json",
+    "pnpm-lock.yaml": "package.json",
+}
+
+_REQUIREMENTS = re.compile(r"requirements[\w.-]*\.(?:txt|in)\Z")
+
+def manifest_kind(rel: str) -> Optional[tuple]:
+    """(ecosystem, parser) for a manifest path, or None if the file is not one."""
+    parts = rel.split("/")
+    name = parts[-1]
+    if VENDORED_DIRS.intersection(parts[:-1]):
+        return None
+    kind = MANIFEST_PARSERS.get(name)
+    if kind is None and (_REQUIREMENTS.match(name) or (len(parts) > 1 and parts[-2] == "requirements" and name.endswith(".txt"))):
+        kind = MANIFEST_PARSERS["requirements.txt"]
+    return kind
+
+def find_manifests(rels: Iterable[str]) -> List[str]:
+    """Manifests anywhere in a listing, shallowest first (the root's come first)."""
+    found = []
+    for rel in rels:
+        name = rel[rel.rfind("/") + 1:]
+        if name in MANIFEST_PARSERS or name.startswith("requirements") or "requirements/" in rel:
+            if manifest_kind(rel) is not None:
+                found.append(rel)
+    present = set(found)
+    kept = []
+    for rel in found:
+        slash = rel.rfind("/") + 1
+        owner = LOCKFILE_OWNERS.get(rel[slash:])
+        if owner is None or rel[:slash] + owner not in present:
+            kept.append(rel)
+    return sorted(kept, key=lambda rel: (rel.count("/"), rel))
+
+def detect_frameworks(path: str, rel: str) -> List[str]:
+    """Frameworks declared by one manifest (empty if unreadable or malformed)."""
+    kind = manifest_kind(rel)
+    if kind is None:
+        return []
+    ecosystem, parser = kind
+    try:
+        names = parser(path)
+    except Exception:
+        return []
+    return sorted(match_frameworks(ecosystem, names))
+
+def _npm_entry_paths(value) -> List[str]:
+    """Relative file paths named by a package.json field (string, or nested maps such as bin/exports)."""
+    if isinstance(value, str):
+        return [value] if not value.startswith(("http:", "https:")) and "*" not in value else []
+    if isinstance(value, dict):
+        return [p for v in value.values() for p in _npm_entry_paths(v)]
+    return []
+
+def _package_json_entries(path: str) -> List[str]:
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    paths = []
+    for key in ("main", "module", "browser", "types", "bin", "exports"):
+        paths.extend(_npm_entry_paths(data.get(key)))
+    return paths
+
+def _python_module_paths(target: str) -> List[str]:
+    """Candidate files for a `package.module:function` script target."""
+    module = target.split(":", 1)[0].strip().replace(".", "/")
+    if not module:
+        return []
+    return [f"{base}{module}{suffix}" for base in ("", "src/") for suffix in (".py", "/__init__.py", "/__main__.py")]
+
+def _pyproject_entries(path: str) -> List[str]:
+    data = _load_toml(path)
+    project = data.get("project", {})
+    targets = list(project.get("scripts", {}).values()) + list(project.get("gui-scripts", {}).values())
+    for group in project.get("entry-points", {}).values():
+        targets.extend(group.values())
+    for value in data.get("tool", {}).get("poetry", {}).get("scripts", {}).values():
+        targets.append(value.get("callable", "") if isinstance(value, dict) else value)
+    return [p for target in targets if isinstance(target, str) for p in _python_module_paths(target)]
+
+# Manifest file name -> parser of the source files it names as entry points
+ENTRY_POINT_PARSERS = {
+    "package.json": _package_json_entries,
+    "pyproject.toml": _pyproject_entries,
+}
+
+def entry_points(path: str, rel: str) -> List[str]:
+    """
+    Source files a manifest names as entry points (package.json main/bin/exports,
+    pyproject scripts), as repo-relative paths. Python targets expand to every
+    plausible module file, so some of them may not exist.
+    """
+    slash = rel.rfind("/") + 1
+    parser = ENTRY_POINT_PARSERS.get(rel[slash:])
+    if parser is None:
+        return []
+    try:
+        paths = parser(path)
+    except Exception:
+        return []
+    found = []
+    for p in paths:
+        p = os.path.normpath(rel[:slash] + p.replace("\\", "/")).replace(os.sep, "/")
+        if p not in (".", "..") and not p.startswith("../") and p not in found:
+            found.append(p)
+    return found
+
+def detect_all(root_path: str, rels: List[str], workers: Optional[int] = None) -> Dict[str, List[str]]:
+    """
+    Detects frameworks for many manifests, parsing them on a thread pool
+    (parsing is mostly file I/O and C-level json/xml). Returns {rel: frameworks}.
+    """
+    def detect(rel: str) -> List[str]:
+        return detect_frameworks(os.path.join(root_path, rel), rel)
+
+    if workers is None:
+        workers = min(32, (os.cpu_count() or 1) * 4)
+    if len(rels) < 2 or workers < 2:
+        return {rel: detect(rel) for rel in rels}
+
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(max_workers=min(workers, len(rels))) as pool:
+        return dict(zip(rels, pool.map(detect, rels)))
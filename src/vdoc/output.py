@@ -0,0 +1,39 @@
+import sys
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+from vdoc import timing
+
+def emit(lines: Iterable[str], path: Optional[Path] = None) -> int:
+    """
+    Streams lines to `path` (or stdout) as they are produced, instead of
+    joining a whole prompt in memory first. Stdout is flushed after the first
+    line so a consuming agent sees output immediately.
+    Returns the number of bytes written.
+    """
+    with timing.phase("write"):
+        if path is not None:
+            with open(path, "w") as f:
+                written = _write(lines, f)
+        else:
+            written = _write(lines, sys.stdout)
+            sys.stdout.flush()
+    timing.count("bytes_written", written)
+    return written
+
+def _write(lines: Iterable[str], stream) -> int:
+    written = 0
+    first = True
+    for line in lines:
+        chunk = line + "\n"
+        stream.write(chunk)
+        written += len(chunk.encode("utf-8", "replace"))
+        if first:
+            stream.flush()
+            first = False
+    return written
+
+def iter_file_lines(path: Path) -> Iterator[str]:
+    """Yields the lines of a text file lazily, without trailing newlines."""
+    with open(path, "r") as f:
+        for line in f:
+            yield line.rstrip("\n")
@@ -0,0 +1,46 @@
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Callable, Dict, Generic, Optional, TypeVar
+from vdoc import services, timing
+
+T = TypeVar("T")
+
+@dataclass
+class Prepared(Generic[T]):
+    """Result of a scan overlapped with the prompt fetch, with phase timings (seconds)."""
+    prompts: Dict[str, str]
+    result: T
+    scan_seconds: float
+    fetch_seconds: float
+    wall_seconds: float
+
+    def timing_summary(self) -> str:
+        return (
+            f"{self.wall_seconds:.2f}s "
+            f"(scan {self.scan_seconds:.2f}s, prompts {self.fetch_seconds:.2f}s)"
+        )
+
+def scan_while_fetching(api_key: Optional[str], scan: Callable[[Future], T]) -> Prepared[T]:
+    """
+    Runs `scan` on the calling thread while the prompts are fetched on the
+    services loop, so the wall-clock time is max(scan, fetch) rather than the
+    sum. `scan` receives the prompts future; a scan that needs the prompts
+    itself (e.g. to size a token budget) can wait on it.
+    """
+    started = time.perf_counter()
+    fetch_done = []
+    future = services.start_prompt_fetch(api_key)
+    future.add_done_callback(lambda _: fetch_done.append(time.perf_counter()))
+
+    scan_started = time.perf_counter()
+    with timing.phase("scan"):
+        result = scan(future)
+    scan_seconds = time.perf_counter() - scan_started
+
+    with timing.phase("prompts_wait"):
+        prompts = future.result()
+    finished = time.perf_counter()
+    # The done callback may run a moment after result() returns
+    fetch_seconds = (fetch_done[0] if fetch_done else finished) - started
+    return Prepared(prompts, result, scan_seconds, fetch_seconds, finished - started)
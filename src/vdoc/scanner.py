@@ -1,229 +1,453 @@
-import os
-import json
-import toml
+from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Dict, Set
-from git import Repo, exc
+from typing import Callable, List, Dict, Iterator, Optional, Tuple, Union
 from collections import Counter
+from vdoc import budget, gitindex, importance, imports, languages, manifests, symbols, timing, tree, walker
+from vdoc.cache import ScanCache, CONFIG_DIR_NAME, file_stamp
+from vdoc.fingerprint import Fingerprints
+from vdoc.filetable import FileTable, as_table
 
-def get_repo_files(root_path: Path) -> List[Path]:
+# Config files named in the overview before the rest are only counted
+OVERVIEW_CONFIG_CAP = 10
+
+# Languages named in the overview (by lines of code)
+OVERVIEW_LANGUAGE_CAP = 3
+
+# Listing lines, and Repository Map files, per top-level directory when no
+# token budget is given
+DIR_LISTING_CAP = 50
+
+# Most of a token budget (after the overview) the Dependencies section may
+# take; it is shortened or left out to stay within it
+DEPENDENCY_SHARE = 0.2
+
+def get_repo_files(root_path: Path, cache: Optional[ScanCache] = None) -> List[Path]:
     """
     Returns a list of files in the repository, respecting gitignore.
     Falls back to simple walk if not a git repo.
+    When a scan cache is given, the previous listing is reused while still valid.
+    """
+    return get_file_table(root_path, cache).paths()
+
+def get_file_table(root_path: Path, cache: Optional[ScanCache] = None) -> FileTable:
+    """Same listing as `get_repo_files`, as a compact FileTable (what the scan uses)."""
+    with timing.phase("list_files"):
+        rels = cache.get_files() if cache is not None else None
+        if rels is None:
+            walked: List[str] = []
+            rels = [rel for rel in _list_repo_files(root_path, walked) if not _is_vdoc_artifact(rel)]
+            if cache is not None:
+                cache.set_files(rels, [d for d in walked if not _is_vdoc_artifact(d + "/")])
+        table = FileTable(root_path, rels)
+    timing.count("files_listed", len(table))
+    return table
+
+def _is_vdoc_artifact(rel: str) -> bool:
+    """Files under .vdoc/ are vdoc's own output (maps, caches) and never part of the scan."""
+    return rel.startswith(CONFIG_DIR_NAME + "/")
+
+def _list_repo_files(root_path: Path, visited_dirs: Optional[List[str]] = None) -> List[str]:
     """
+    Sorted posix paths relative to root_path. When the listing comes from a
+    walk, the directories it visited (relative to root_path, even those with
+    no listed file) are appended to visited_dirs.
+    """
+    located = gitindex.find_repository(root_path)
+    if located is None:
+        return _walk_files(root_path, visited_dirs)
+
+    git_root, git_dir = located
+    try:
+        return _list_git_files(root_path, git_root, git_dir, visited_dirs)
+    except gitindex.IndexFormatError:
+        # Unreadable index (e.g. a future format): let git itself answer
+        pass
+
+    from git import Repo, exc
+
     try:
         repo = Repo(root_path, search_parent_directories=True)
         git_root = Path(repo.working_dir)
-        files = [git_root / f for f in repo.git.ls_files().split('\n') if f]
+        files = [f for f in repo.git.ls_files().split('\n') if f]
         
         # Add untracked files (newly created)
-        for f in repo.untracked_files:
-             files.append(git_root / f)
+        files.extend(repo.untracked_files)
              
         # Filter to ensure they are within strict root_path
-        return sorted([f for f in files if root_path in f.parents or f == root_path])
+        rel_root = root_path.relative_to(git_root).as_posix() if root_path != git_root else ""
+        prefix = rel_root + "/" if rel_root else ""
+        return sorted(f[len(prefix):] for f in files if f.startswith(prefix))
         
     except (exc.InvalidGitRepositoryError, exc.NoSuchPathError):
-        # Fallback: naive walk (skipping hidden)
-        file_list = []
-        for root, dirs, files in os.walk(root_path):
-            dirs[:] = [d for d in dirs if not d.startswith('.')]
-            for file in files:
-                if not file.startswith('.'):
-                    file_list.append(Path(root) / file)
-        return sorted(file_list)
+        return _walk_files(root_path, visited_dirs)
+
+def _walk_files(root_path: Path, visited_dirs: Optional[List[str]] = None) -> List[str]:
+    """
+    Fallback for trees that are not git repos: a parallel walk (skipping
+    hidden entries) that honours .gitignore/.vdocignore files and a small
+    set of default dependency-folder excludes.
+    """
+    return sorted(walker.walk(root_path, base_stack=walker.default_rules(), skip_hidden=True, visited_dirs=visited_dirs))
 
-def analyze_project_root(root_path: Path, files: List[Path]) -> Dict:
+def _list_git_files(root_path: Path, git_root: Path, git_dir: Path, visited_dirs: Optional[List[str]] = None) -> List[str]:
+    """
+    Tracked files straight from `.git/index` plus untracked, non-ignored files
+    from one walk of the worktree. No git subprocess is spawned.
+    """
+    rel_root = root_path.relative_to(git_root).as_posix() if root_path != git_root else ""
+    prefix = rel_root + "/" if rel_root else ""
+
+    tracked = gitindex.read_index_paths(git_dir)
+    if prefix:
+        tracked = [p for p in tracked if p.startswith(prefix)]
+    walked: List[str] = []
+    untracked = gitindex.list_untracked(git_root, git_dir, set(tracked), rel_root, walked)
+
+    skip = len(prefix)
+    if visited_dirs is not None:
+        visited_dirs.extend(d[skip:] if d != rel_root else "" for d in walked)
+    return [rel[skip:] for rel in sorted(set(tracked).union(untracked))]
+
+def analyze_project_root(
+    root_path: Path,
+    files: Union[FileTable, List[Path]],
+    cache: Optional[ScanCache] = None,
+) -> Dict:
     """
     Analyzes the project to detect languages and frameworks.
+    Languages are weighted by lines of code (see `vdoc.languages`): stats
+    holds a Counter of lines per language plus the files/lines/bytes
+    breakdown under "language_stats". Frameworks come from the
+    dependencies declared in every manifest in the listing (see
+    `vdoc.manifests`), and "entry_points" lists the source files those
+    manifests name. Manifest results are reused from the scan cache while
+    the manifest is unchanged.
     """
+    with timing.phase("analyze"):
+        return _analyze(root_path, as_table(root_path, files), cache)
+
+def _analyze(root_path: Path, table: FileTable, cache: Optional[ScanCache]) -> Dict:
+    # 1. Language Detection by name, extension and shebang, weighted by lines
+    language_stats = languages.language_stats(root_path, table, cache)
+
+    # 2. Framework Detection (manifests anywhere in the tree)
+    found = read_manifests(root_path, manifests.find_manifests(table.rels()), cache)
+    if cache is not None:
+        cache.prune("manifests", found)
+        cache.prune("entry_points", found)
+    return project_stats(language_stats, found)
+
+def read_manifests(
+    root_path: Path,
+    rels: List[str],
+    cache: Optional[ScanCache] = None,
+) -> Dict[str, Tuple[List[str], List[str]]]:
+    """
+    (frameworks, entry points) of each manifest in rels that still exists,
+    in the order given. Results are reused from the scan cache while the
+    manifest is unchanged.
+    """
+    found: Dict[str, Tuple[List[str], List[str]]] = {}
+    pending = []
+    for rel in rels:
+        stamp = cache.stamp(rel, root_path / rel) if cache is not None else file_stamp(root_path / rel)
+        if stamp is None:
+            continue
+        detected = cache.lookup("manifests", rel, stamp) if cache is not None else None
+        entries = cache.lookup("entry_points", rel, stamp) if cache is not None else None
+        if detected is None or entries is None:
+            pending.append((rel, stamp))
+        found[rel] = (detected, entries)
+
+    results = manifests.detect_all(str(root_path), [rel for rel, _ in pending])
+    timing.count("manifests_parsed", len(pending))
+    for rel, stamp in pending:
+        entries = manifests.entry_points(str(root_path / rel), rel)
+        found[rel] = (results[rel], entries)
+        if cache is not None:
+            cache.store("manifests", rel, stamp, results[rel])
+            cache.store("entry_points", rel, stamp, entries)
+    return found
+
+def project_stats(
+    language_stats: Dict[str, languages.LanguageStats],
+    found_manifests: Dict[str, Tuple[List[str], List[str]]],
+) -> Dict:
+    """The stats `analyze_project_root` returns, from its per-language and per-manifest results."""
     stats = {
-        "languages": Counter(),
+        "languages": Counter({lang: s.lines for lang, s in language_stats.items()}),
+        "language_stats": language_stats,
         "frameworks": set(),
-        "config_files": []
+        "config_files": list(found_manifests),
+        "entry_points": [],
     }
-    
-    # 1. Language Detection by Extension
-    ext_map = {
-        '.py': 'Python', '.js': 'JavaScript', '.ts': 'TypeScript', '.tsx': 'TypeScript (React)',
-        '.jsx': 'JavaScript (React)', '.go': 'Go', '.rs': 'Rust', '.java': 'Java',
-        '.cpp': 'C++', '.c': 'C', '.html': 'HTML', '.css': 'CSS', '.md': 'Markdown'
-    }
-    
-    for f in files:
-        if f.suffix in ext_map:
-            stats["languages"][ext_map[f.suffix]] += 1
-            
-    # 2. Framework Detection (Configs)
-    # Python (pyproject.toml)
-    pyproject = root_path / "pyproject.toml"
-    if pyproject.exists():
-        stats["config_files"].append("pyproject.toml")
-        try:
-            data = toml.load(pyproject)
-            deps = str(data).lower() # Naive search
-            
-            frameworks = {
-                "django": "Django", "fastapi": "FastAPI", "flask": "Flask",
-                "tornado": "Tornado", "pyramid": "Pyramid", "bottle": "Bottle",
-                "falcon": "Falcon", "sanic": "Sanic", "starlette": "Starlette",
-                "litestar": "Litestar"
-            }
-            for k, v in frameworks.items():
-                if k in deps: stats["frameworks"].add(v)
-        except Exception:
-            pass
-
-    # Node (package.json)
-    package_json = root_path / "package.json"
-    if package_json.exists():
-        stats["config_files"].append("package.json")
-        try:
-            with open(package_json) as f:
-                data = json.load(f)
-                all_deps = {**data.get('dependencies', {}), **data.get('devDependencies', {})}
-                keys = " ".join(all_deps.keys()).lower()
-                
-                frameworks = {
-                    "react": "React", "vue": "Vue", "angular": "Angular",
-                    "next": "Next.js", "nuxt": "Nuxt", "svelte": "Svelte",
-                    "express": "Express", "nest": "NestJS", "koa": "Koa",
-                    "fastify": "Fastify", "hapi": "Hapi", "meteor": "Meteor",
-                    "sails": "Sails", "adonis": "AdonisJS"
-                }
-                for k, v in frameworks.items():
-                    if k in keys: stats["frameworks"].add(v)
-                
-                # Special check for Angular core
-                if "@angular/core" in keys: stats["frameworks"].add("Angular")
-
-        except Exception:
-            pass
-
-    # Go (go.mod)
-    go_mod = root_path / "go.mod"
-    if go_mod.exists():
-        stats["config_files"].append("go.mod")
-        try:
-            content = go_mod.read_text().lower()
-            frameworks = {
-                "github.com/gin-gonic/gin": "Gin",
-                "github.com/gofiber/fiber": "Fiber",
-                "github.com/labstack/echo": "Echo",
-                "github.com/go-chi/chi": "Chi",
-                "github.com/beego/beego": "Beego"
-            }
-            for k, v in frameworks.items():
-                if k in content: stats["frameworks"].add(v)
-        except Exception:
-            pass
-
-    # Java (pom.xml - Maven)
-    pom_xml = root_path / "pom.xml"
-    if pom_xml.exists():
-        stats["config_files"].append("pom.xml")
-        try:
-            content = pom_xml.read_text().lower()
-            if "org.springframework.boot" in content: stats["frameworks"].add("Spring Boot")
-            if "io.micronaut" in content: stats["frameworks"].add("Micronaut")
-            if "io.quarkus" in content: stats["frameworks"].add("Quarkus")
-            if "jakarta" in content: stats["frameworks"].add("Jakarta EE")
-        except Exception:
-            pass
-
-    # Ruby (Gemfile)
-    gemfile = root_path / "Gemfile"
-    if gemfile.exists():
-        stats["config_files"].append("Gemfile")
-        try:
-            content = gemfile.read_text().lower()
-            if "rails" in content: stats["frameworks"].add("Ruby on Rails")
-            if "sinatra" in content: stats["frameworks"].add("Sinatra")
-            if "hanami" in content: stats["frameworks"].add("Hanami")
-        except Exception:
-            pass
-            
-    # PHP (composer.json)
-    composer_json = root_path / "composer.json"
-    if composer_json.exists():
-        stats["config_files"].append("composer.json")
-        try:
-            content = composer_json.read_text().lower()
-            if "laravel/framework" in content: stats["frameworks"].add("Laravel")
-            if "symfony/framework-bundle" in content: stats["frameworks"].add("Symfony")
-            if "codeigniter/framework" in content: stats["frameworks"].add("CodeIgniter")
-            if "cakephp/cakephp" in content: stats["frameworks"].add("CakePHP")
-        except Exception:
-            pass
-            
+    for detected, entries in found_manifests.values():
+        stats["frameworks"].update(detected)
+        stats["entry_points"].extend(entries)
     return stats
 
-def generate_context_map(root_path: Path) -> str:
+@dataclass
+class ProjectScan:
+    """Everything the context map is rendered from."""
+    root_path: Path
+    files: FileTable
+    stats: Dict
+    repo_map: Dict[str, List[str]]
+    import_graph: Optional[imports.ImportGraph] = None
+
+def scan_project(root_path: Path, use_cache: bool = True) -> ProjectScan:
+    """
+    Scans the project: file listing, language/framework analysis, symbols and imports.
+    With use_cache, unchanged scan results are reused from `.vdoc/scan_cache.json`,
+    including files whose stamp changed but whose content fingerprint did not.
+    """
+    with timing.phase("cache_load"):
+        cache = ScanCache.load(root_path) if use_cache else None
+    files = get_file_table(root_path, cache)
+    if cache is not None:
+        with timing.phase("fingerprint"):
+            cache.fingerprints = Fingerprints.load(root_path).refresh(files.rels())
+    stats = analyze_project_root(root_path, files, cache)
+    repo_map = symbols.build_repository_map(root_path, files, cache)
+    import_graph = imports.build_import_graph(root_path, files, cache)
+    if cache is not None:
+        with timing.phase("cache_save"):
+            cache.save()
+            cache.fingerprints.save()
+    return ProjectScan(root_path, files, stats, repo_map, import_graph)
+
+def generate_context_map(
+    root_path: Path,
+    use_cache: bool = True,
+    token_budget: Optional[int] = None,
+    tree_depth: Optional[int] = None,
+) -> str:
     """
     Generates a structured, smart markdown map of the project.
     """
-    files = get_repo_files(root_path)
-    stats = analyze_project_root(root_path, files)
+    return render_context_map(scan_project(root_path, use_cache), token_budget, tree_depth)
+
+def render_context_map(
+    scan: ProjectScan,
+    token_budget: Optional[int] = None,
+    tree_depth: Optional[int] = None,
+    scorer: Optional[importance.Scorer] = None,
+) -> str:
+    """Renders a scan as one markdown string (see `iter_context_map`)."""
+    return "\n".join(iter_context_map(scan, token_budget, tree_depth, scorer))
+
+def iter_context_map(
+    scan: ProjectScan,
+    token_budget: Optional[int] = None,
+    tree_depth: Optional[int] = None,
+    scorer: Optional[importance.Scorer] = None,
+) -> Iterator[str]:
+    """
+    Renders a scan as markdown, one line at a time.
+
+    Each top-level directory is rendered as a tree expanded tree_depth levels
+    deep (default `tree.DEFAULT_TREE_DEPTH`); deeper subtrees are summarised
+    by file count and dominant languages.
+
+    Without a budget, directory groups are built and emitted one at a time
+    (each listing at most DIR_LISTING_CAP lines), so memory stays bounded by
+    the largest directory rather than the repo. Directories with more files
+    than fit list the most important ones, ranked by scorer (default
+    `importance.default_scorer`). With token_budget, all groups are needed
+    up front to trim the map to fit (see `budget.fit_groups`). A scan with
+    an import graph ends with a short Dependencies section (see
+    `imports.summary_lines`); with a budget it gets at most DEPENDENCY_SHARE
+    of what the overview leaves, listing fewer entries or none to fit.
+    """
+    stats = scan.stats
+    if tree_depth is None:
+        tree_depth = tree.DEFAULT_TREE_DEPTH
     
-    # Calculate top languages
-    total_code_files = sum(stats["languages"].values())
-    top_langs = [f"{lang} ({count})" for lang, count in stats["languages"].most_common(3)]
+    # Calculate top languages (by lines of code)
+    breakdown = stats.get("language_stats", {})
+    top_langs = []
+    for lang, lines in stats["languages"].most_common(OVERVIEW_LANGUAGE_CAP):
+        files = breakdown[lang].files if lang in breakdown else None
+        detail = f"{lines:,} lines" if files is None else f"{lines:,} lines in {files} file{'s' if files != 1 else ''}"
+        top_langs.append(f"{lang} ({detail})")
     
-    output = ["# Context Map", ""]
+    header = ["# Context Map", ""]
     
     # Section 1: Overview
-    output.append("## Project Overview")
+    header.append("## Project Overview")
     if top_langs:
-        output.append(f"- **Languages:** {', '.join(top_langs)}")
+        header.append(f"- **Languages:** {', '.join(top_langs)}")
     if stats["frameworks"]:
-        output.append(f"- **Frameworks:** {', '.join(sorted(stats['frameworks']))}")
+        header.append(f"- **Frameworks:** {', '.join(sorted(stats['frameworks']))}")
     if stats["config_files"]:
-        output.append(f"- **Config Files:** {', '.join(stats['config_files'])}")
-    output.append(f"- **Total Files:** {len(files)}")
-    output.append("")
+        config_files = stats["config_files"]
+        listed = ", ".join(config_files[:OVERVIEW_CONFIG_CAP])
+        if len(config_files) > OVERVIEW_CONFIG_CAP:
+            listed += f" (+{len(config_files) - OVERVIEW_CONFIG_CAP} more)"
+        header.append(f"- **Config Files:** {listed}")
+    header.append(f"- **Total Files:** {len(scan.files)}")
+    header.append("")
+    yield from header
+
+    dependencies: List[str] = []
+    kept, collapsed = None, []
+    if token_budget is None:
+        if scan.import_graph is not None:
+            dependencies = imports.summary_lines(scan.import_graph)
+    else:
+        fixed = budget.estimate_lines(header) + budget.estimate_lines(["## Project Structure", "## Repository Map", ""])
+        if scan.import_graph is not None:
+            share = int(max(token_budget - fixed, 0) * DEPENDENCY_SHARE)
+            dependencies = imports.summary_lines(scan.import_graph, share)
+            fixed += budget.estimate_lines(dependencies)
+        all_groups = list(_iter_groups(scan, tree_depth=tree_depth, scorer=scorer))
+        kept, collapsed = budget.fit_groups(all_groups, max(token_budget - fixed, 0))
+
+    def groups() -> Iterator[budget.Group]:
+        return _iter_groups(scan, DIR_LISTING_CAP, tree_depth, scorer) if kept is None else iter(kept)
 
     # Section 2: Structure (Grouped)
-    output.append("## Project Structure")
-    
-    # Group files by top-level directory
-    structure = {}
-    root_files = []
-    
-    for f in files:
-        rel = f.relative_to(root_path)
-        parts = rel.parts
-        if len(parts) == 1:
-            root_files.append(str(rel))
+    yield "## Project Structure"
+    for g in groups():
+        yield g.header
+        yield from g.items[:g.kept_items]
+        if g.kept_items < g.total_items:
+            yield f"- ... ({g.total_items - g.kept_items} more)"
+        yield ""
+    if collapsed:
+        yield "### Other Directories"
+        yield "- " + ", ".join(g.name for g in collapsed)
+        yield ""
+
+    # Section 3: Repository Map (top-level definitions per source file)
+    if any(scan.repo_map.values()):
+        in_section = False
+        for g in groups():
+            if g.kept_symbols and not in_section:
+                yield "## Repository Map"
+                in_section = True
+            yield from g.symbols[:g.kept_symbols]
+            hidden = max(g.total_symbols, len(g.symbols)) - g.kept_symbols
+            if g.kept_symbols and hidden:
+                yield f"- ... ({hidden} more {'file' if hidden == 1 else 'files'} in {g.name})"
+        if in_section:
+            yield ""
+
+    # Section 4: Dependencies (import graph summary)
+    yield from dependencies
+
+def language_of(name: str) -> Optional[str]:
+    """Language of a file name by well-known name or extension (see `vdoc.languages`), or None."""
+    return languages.classify_name(name)
+
+def _flat_listing(rels: List[str], max_lines: Optional[int], scorer: importance.Scorer) -> List[str]:
+    """Listing lines for files in one directory: all of them, or the highest-scoring ones within max_lines."""
+    if max_lines is None or len(rels) <= max_lines:
+        return [f"- {rel}" for rel in rels]
+    if max_lines <= 0:
+        return []
+    shown = importance.top_k(rels, max_lines - 1, scorer)
+    hidden = len(rels) - len(shown)
+    return [f"- {rel}" for rel in shown] + [f"- ... ({hidden} more {'file' if hidden == 1 else 'files'})"]
+
+def _iter_groups(
+    scan: ProjectScan,
+    item_cap: Optional[int] = None,
+    tree_depth: int = tree.DEFAULT_TREE_DEPTH,
+    scorer: Optional[importance.Scorer] = None,
+) -> Iterator[budget.Group]:
+    """
+    Yields one group per top-level directory (root files first) with the
+    listing and Repository Map lines it contributes to the map.
+    Relies on scan.files being sorted, so that each top-level directory is a
+    contiguous run; the run is turned into a tree (see `tree.build_tree`)
+    once it ends. With item_cap, each listing is rendered in at most that
+    many lines (directory summaries first, then the highest-scoring files;
+    see `tree.render_tree`) and the Repository Map keeps the item_cap
+    highest-scoring files; without it every file is listed and the token
+    budget keeps the highest-scoring ones that fit.
+    """
+    repo_map = scan.repo_map
+    files_per_dir = tree.FILES_PER_DIR if item_cap is not None else None
+    if scorer is None:
+        scorer = importance.default_scorer(scan.root_path, scan.stats.get("entry_points", ()))
+
+    def symbol_lines(prefix: str, items: List[str]) -> Tuple[List[str], List[str], int]:
+        """
+        Repository Map lines (the item_cap most important files when capped),
+        the files they describe and the number of files with symbols.
+        """
+        mapped = [prefix + item for item in items if repo_map.get(prefix + item)]
+        if item_cap is not None and len(mapped) > item_cap:
+            shown = importance.top_k(mapped, item_cap, scorer)
         else:
-            top_dir = parts[0]
-            if top_dir not in structure:
-                structure[top_dir] = []
-            structure[top_dir].append(str(Path(*parts[1:])))
-            
+            shown = mapped
+        lines = []
+        for rel in shown:
+            defs = repo_map[rel]
+            line = ", ".join(defs[:symbols.MAX_SYMBOLS_PER_FILE])
+            if len(defs) > symbols.MAX_SYMBOLS_PER_FILE:
+                line += f", ... ({len(defs) - symbols.MAX_SYMBOLS_PER_FILE} more)"
+            lines.append(f"- {rel}: {line}")
+        return lines, shown, len(mapped)
+
+    def make_group(
+        name: str, header: str, prefix: str, items: List[str], render: Callable[[Optional[int]], List[str]], is_root: bool = False,
+    ) -> budget.Group:
+        mapped, mapped_rels, mapped_files = symbol_lines(prefix, items)
+        # Listings are rendered within item_cap lines; without a cap, the
+        # budget re-renders them to fit (see `budget.fit_groups`)
+        listing = render(item_cap)
+
+        def fit_symbols(tokens: int) -> List[str]:
+            return budget.fit_ranked(mapped, [scorer(rel) for rel in mapped_rels], tokens)
+
+        return budget.Group(
+            name=name,
+            header=header,
+            items=listing,
+            symbols=mapped,
+            total_items=len(listing),
+            kept_items=len(listing),
+            total_symbols=mapped_files,
+            kept_symbols=len(mapped),
+            weight=budget.group_weight(prefix, len(items), mapped_files, is_root=is_root),
+            fit_items=lambda tokens: budget.fit_lines(render, len(listing), tokens),
+            fit_symbols=fit_symbols,
+        )
+
+    def dir_group(top_dir: str, items: List[str]) -> budget.Group:
+        node = tree.build_tree(items, language_of)
+
+        def render(max_lines: Optional[int]) -> List[str]:
+            return tree.render_tree(node, tree_depth, files_per_dir, scorer, top_dir + "/", max_lines)
+
+        header = f"### {top_dir}/ ({tree.summarize(node)})"
+        return make_group(f"{top_dir}/", header, top_dir + "/", items, render)
+
     # Print Root Files first
+    root_files = [rel for rel in scan.files.rels() if "/" not in rel]
     if root_files:
-        output.append("### Root")
-        for f in sorted(root_files):
-            output.append(f"- {f}")
-        output.append("")
-            
-    # Print Directories
-    for d in sorted(structure.keys()):
-        offset = len(structure[d])
-        output.append(f"### {d}/ ({offset} files)")
-        # If too many files, truncate? For now, list all.
-        # Ideally we'd show a tree, but a list is token-efficient.
-        # Let's show up to 20 files per dir, then truncate.
-        items = sorted(structure[d])
-        for item in items[:50]: # Increased cap slightly
-            output.append(f"- {item}")
-        if len(items) > 50:
-            output.append(f"- ... ({len(items) - 50} more)")
-        output.append("")
-
-    return "\n".join(output)
+        yield make_group("Root", "### Root", "", root_files, lambda max_lines: _flat_listing(root_files, max_lines, scorer), is_root=True)
+
+    # Then each directory, as its contiguous run of files ends
+    current, items = None, []
+    for rel in scan.files.rels():
+        slash = rel.find("/")
+        if slash < 0:
+            continue
+        top_dir = rel[:slash]
+        if top_dir != current:
+            if current is not None:
+                yield dir_group(current, items)
+            current, items = top_dir, []
+        items.append(rel[slash + 1:])
+    if current is not None:
+        yield dir_group(current, items)
 
 def is_repo_dirty(root_path: Path) -> bool:
+    from git import Repo, exc
+
     try:
         repo = Repo(root_path, search_parent_directories=True)
         return repo.is_dirty() or len(repo.untracked_files) > 0
@@ -0,0 +1,358 @@
+import fnmatch
+import json
+import sys
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, TextIO, Tuple
+from vdoc import budget, config, docindex, scanner, sources
+from vdoc.cache import CONFIG_DIR_NAME
+from vdoc.delta import compute_delta, iter_delta
+from vdoc.watch import LiveMap, watch
+
+PROTOCOL_VERSION = "2024-11-05"
+SERVER_NAME = "vdoc"
+
+# JSON-RPC error codes
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+
+# Most paths a find_files call returns
+FIND_FILES_LIMIT = 200
+
+class RequestError(Exception):
+    """A JSON-RPC error to report back to the client."""
+
+    def __init__(self, code: int, message: str):
+        super().__init__(message)
+        self.code = code
+
+def _argument(name: str, description: str, required: bool = False) -> Dict[str, Any]:
+    return {"name": name, "description": description, "required": required}
+
+PROMPTS = [
+    {
+        "name": "vdoc-plan",
+        "description": "Planning prompt: the context map and spec, asking for a documentation plan.",
+        "arguments": [_argument("token_budget", "Trim the context map so the prompt fits N tokens")],
+    },
+    {
+        "name": "vdoc-exec",
+        "description": "Execution prompt: the documentation plan with the files it references inlined.",
+        "arguments": [],
+    },
+    {
+        "name": "vdoc-update",
+        "description": "Update prompt: the current context map, what changed since a git ref, or the stale docs.",
+        "arguments": [
+            _argument("mode", "full (default), delta or stale"),
+            _argument("since", "Git ref for delta mode (default: the commit recorded by the last init/update)"),
+            _argument("token_budget", "Trim the context so the prompt fits N tokens"),
+        ],
+    },
+]
+
+TOOLS = [
+    {
+        "name": "context_map",
+        "description": "The project's context map (overview, structure and top-level definitions).",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "token_budget": {"type": "integer", "minimum": 1, "description": "Trim the map to N tokens"},
+                "tree_depth": {"type": "integer", "minimum": 0, "description": "Directory levels to expand"},
+            },
+        },
+    },
+    {
+        "name": "find_files",
+        "description": "Project files whose path matches a glob (e.g. 'src/**/*.py') or contains a substring.",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "pattern": {"type": "string"},
+                "limit": {"type": "integer", "minimum": 1},
+            },
+            "required": ["pattern"],
+        },
+    },
+    {
+        "name": "symbols",
+        "description": "Top-level definitions of a file, or of every file below a directory.",
+        "inputSchema": {
+            "type": "object",
+            "properties": {"path": {"type": "string"}},
+            "required": ["path"],
+        },
+    },
+]
+
+class Server:
+    """
+    MCP server over stdio (newline-delimited JSON-RPC 2.0). Requests are
+    answered from a LiveMap kept warm in memory; with watch_files, a
+    background thread applies file events to it (and keeps
+    `.vdoc/context_map.md` fresh), so no request lists or parses the tree.
+    """
+
+    def __init__(self, root_path: Path, live: LiveMap, api_key: Optional[str] = None):
+        self.root_path = root_path
+        self.live = live
+        self.api_key = api_key
+        self._prompts: Optional[Dict[str, str]] = None
+        self._rendered: Optional[Tuple] = None
+        self._stop = threading.Event()
+        self._watcher: Optional[threading.Thread] = None
+        self.handlers: Dict[str, Callable[[Dict], Any]] = {
+            "initialize": self.initialize,
+            "ping": lambda params: {},
+            "prompts/list": lambda params: {"prompts": PROMPTS},
+            "prompts/get": self.get_prompt,
+            "tools/list": lambda params: {"tools": TOOLS},
+            "tools/call": self.call_tool,
+        }
+
+    # --- Lifecycle ---
+
+    def start_watching(self, poll: bool = False) -> None:
+        map_path = self.root_path / CONFIG_DIR_NAME / "context_map.md"
+        self._watcher = threading.Thread(
+            target=watch, args=(self.live, map_path),
+            kwargs={"poll": poll, "stop": self._stop}, name="vdoc-watch", daemon=True,
+        )
+        self._watcher.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.join(timeout=2)
+        else:
+            self.live.close()
+
+    def serve(self, stdin: TextIO, stdout: TextIO) -> None:
+        """Answers requests line by line until stdin closes."""
+        for line in stdin:
+            if not line.strip():
+                continue
+            response = self.handle_line(line)
+            if response is not None:
+                stdout.write(json.dumps(response) + "\n")
+                stdout.flush()
+
+    # --- Dispatch ---
+
+    def handle_line(self, line: str) -> Optional[Dict]:
+        try:
+            message = json.loads(line)
+        except ValueError:
+            return _error(None, PARSE_ERROR, "Parse error")
+        return self.handle(message)
+
+    def handle(self, message: Any) -> Optional[Dict]:
+        """One JSON-RPC message; returns the response, or None for notifications."""
+        if not isinstance(message, dict) or not isinstance(message.get("method"), str):
+            return _error(message.get("id") if isinstance(message, dict) else None, INVALID_REQUEST, "Invalid request")
+        request_id = message.get("id")
+        is_notification = "id" not in message
+        handler = self.handlers.get(message["method"])
+        if handler is None:
+            return None if is_notification else _error(request_id, METHOD_NOT_FOUND, f"Unknown method: {message['method']}")
+        params = message.get("params")
+        if params is None:
+            params = {}
+        elif not isinstance(params, dict):
+            # Positional (array) params are not part of the protocol
+            return None if is_notification else _error(request_id, INVALID_PARAMS, "params must be an object")
+        try:
+            result = handler(params)
+        except RequestError as e:
+            return None if is_notification else _error(request_id, e.code, str(e))
+        except Exception as e:
+            return None if is_notification else _error(request_id, INTERNAL_ERROR, f"{type(e).__name__}: {e}")
+        return None if is_notification else {"jsonrpc": "2.0", "id": request_id, "result": result}
+
+    def initialize(self, params: Dict) -> Dict:
+        return {
+            "protocolVersion": params.get("protocolVersion") or PROTOCOL_VERSION,
+            "capabilities": {"prompts": {}, "tools": {}},
+            "serverInfo": {"name": SERVER_NAME, "version": _version()},
+        }
+
+    # --- Prompts ---
+
+    def prompts(self) -> Dict[str, str]:
+        """Service prompts, fetched once per server (see services.fetch_prompts)."""
+        if self._prompts is None:
+            from vdoc import services
+            self._prompts = services.get_prompts_sync(self.api_key)
+        return self._prompts
+
+    def get_prompt(self, params: Dict) -> Dict:
+        name = params.get("name")
+        arguments = _arguments(params)
+        builders = {"vdoc-plan": self._plan_prompt, "vdoc-exec": self._exec_prompt, "vdoc-update": self._update_prompt}
+        if name not in builders:
+            raise RequestError(INVALID_PARAMS, f"Unknown prompt: {name}")
+        text = "\n".join(builders[name](arguments))
+        description = next(p["description"] for p in PROMPTS if p["name"] == name)
+        return {"description": description, "messages": [{"role": "user", "content": {"type": "text", "text": text}}]}
+
+    def _plan_prompt(self, arguments: Dict) -> Iterable[str]:
+        from vdoc.commands import plan
+
+        spec_file = self.root_path / CONFIG_DIR_NAME / "spec.md"
+        if not spec_file.exists():
+            raise RequestError(INVALID_PARAMS, "Missing .vdoc/spec.md. Run `vdoc init` first.")
+        spec_content = spec_file.read_text()
+        token_budget = _int_argument(arguments, "token_budget")
+        map_budget = budget.remaining(token_budget, plan._iter_prompt([], spec_content)) if token_budget else None
+        return plan._iter_prompt(self._map_lines(map_budget), spec_content)
+
+    def _exec_prompt(self, arguments: Dict) -> Iterable[str]:
+        from vdoc.commands import exec as exec_command
+
+        plan_file = self.root_path / CONFIG_DIR_NAME / "doc_plan.md"
+        if not plan_file.exists():
+            raise RequestError(INVALID_PARAMS, "Documentation plan missing: create .vdoc/doc_plan.md first.")
+        plan_content = plan_file.read_text()
+        # The live listing, so the request neither lists the tree nor touches the scan cache
+        listed = set(self.live.render().files.rels())
+        referenced = sources.gather_sources(self.root_path, sources.extract_paths(plan_content), listed=listed)
+        return exec_command._iter_prompt(plan_content, referenced)
+
+    def _update_prompt(self, arguments: Dict) -> Iterable[str]:
+        from vdoc.commands import update
+        from vdoc.delta import DeltaError
+        from vdoc.state import load_state
+
+        mode = arguments.get("mode") or "full"
+        if mode not in update.INSTRUCTIONS:
+            raise RequestError(INVALID_PARAMS, f"Unknown update mode: {mode}")
+        prompts = self.prompts()
+        token_budget = _int_argument(arguments, "token_budget")
+        map_budget = budget.remaining(token_budget, update._iter_prompt(prompts, [], mode)) if token_budget else None
+        if mode == "stale":
+            lines = list(docindex.iter_stale(*docindex.refresh(self.root_path)))
+        elif mode == "delta":
+            since = arguments.get("since") or load_state().last_commit
+            if not since:
+                raise RequestError(INVALID_PARAMS, "No commit recorded by a previous run: pass `since`.")
+            try:
+                lines = list(iter_delta(compute_delta(self.root_path, since), map_budget))
+            except DeltaError as e:
+                raise RequestError(INVALID_PARAMS, str(e))
+        else:
+            lines = self._map_lines(map_budget)
+        return update._iter_prompt(prompts, lines, mode)
+
+    # --- Tools ---
+
+    def call_tool(self, params: Dict) -> Dict:
+        name = params.get("name")
+        arguments = _arguments(params)
+        tools = {"context_map": self._context_map, "find_files": self._find_files, "symbols": self._symbols}
+        if name not in tools:
+            raise RequestError(INVALID_PARAMS, f"Unknown tool: {name}")
+        try:
+            text = tools[name](arguments)
+        except RequestError as e:
+            # Tool failures are results the model can read, not protocol errors
+            return {"content": [{"type": "text", "text": str(e)}], "isError": True}
+        return {"content": [{"type": "text", "text": text}], "isError": False}
+
+    def _map_lines(self, token_budget: Optional[int] = None, tree_depth: Optional[int] = None) -> List[str]:
+        """The rendered map, reused until the live scan changes (or other options are asked for)."""
+        if tree_depth is None:
+            tree_depth = self.live.tree_depth
+        scan = self.live.render()
+        key = (token_budget, tree_depth)
+        cached = self._rendered
+        if cached is None or cached[0] is not scan or cached[1] != key:
+            cached = self._rendered = (scan, key, list(scanner.iter_context_map(scan, token_budget, tree_depth)))
+        return cached[2]
+
+    def _context_map(self, arguments: Dict) -> str:
+        return "\n".join(self._map_lines(_int_argument(arguments, "token_budget"), _int_argument(arguments, "tree_depth")))
+
+    def _find_files(self, arguments: Dict) -> str:
+        pattern = arguments.get("pattern")
+        if not isinstance(pattern, str) or not pattern:
+            raise RequestError(INVALID_PARAMS, "`pattern` is required")
+        limit = _int_argument(arguments, "limit") or FIND_FILES_LIMIT
+        is_glob = any(c in pattern for c in "*?[")
+        matches = [
+            rel for rel in self.live.render().files.rels()
+            if (fnmatch.fnmatchcase(rel, pattern) if is_glob else pattern in rel)
+        ]
+        lines = matches[:limit]
+        if len(matches) > limit:
+            lines.append(f"... ({len(matches) - limit} more)")
+        return "\n".join(lines) if lines else "No matching files."
+
+    def _symbols(self, arguments: Dict) -> str:
+        path = arguments.get("path")
+        if not isinstance(path, str):
+            raise RequestError(INVALID_PARAMS, "`path` is required")
+        path = path.strip().strip("/")
+        while path.startswith("./"):
+            path = path[2:]
+        repo_map = self.live.render().repo_map
+        if path in repo_map:
+            return "\n".join(repo_map[path]) or "No top-level definitions."
+        prefix = path + "/" if path else ""
+        lines = [f"- {rel}: {', '.join(defs)}" for rel, defs in sorted(repo_map.items()) if rel.startswith(prefix) and defs]
+        return "\n".join(lines) if lines else f"No definitions found under {path or 'the project'}."
+
+def _arguments(params: Dict) -> Dict:
+    """A prompt's or tool's arguments, which must be an object when given."""
+    arguments = params.get("arguments")
+    if arguments is None:
+        return {}
+    if not isinstance(arguments, dict):
+        raise RequestError(INVALID_PARAMS, "arguments must be an object")
+    return arguments
+
+def _int_argument(arguments: Dict, name: str) -> Optional[int]:
+    """Prompt arguments arrive as strings, tool arguments as JSON numbers."""
+    value = arguments.get(name)
+    if value is None or value == "":
+        return None
+    try:
+        number = int(value)
+    except (TypeError, ValueError):
+        raise RequestError(INVALID_PARAMS, f"`{name}` must be an integer")
+    if number < 0:
+        raise RequestError(INVALID_PARAMS, f"`{name}` must not be negative")
+    return number
+
+def _error(request_id: Any, code: int, message: str) -> Dict:
+    return {"jsonrpc": "2.0", "id": request_id, "error": {"code": code, "message": message}}
+
+def _version() -> str:
+    import importlib.metadata
+    try:
+        return importlib.metadata.version("vdoc")
+    except importlib.metadata.PackageNotFoundError:
+        return "unknown"
+
+def run_server(root_path: Path, watch_files: bool = True, poll: bool = False, use_cache: bool = True) -> None:
+    """
+    Serves MCP on stdin/stdout. stdout carries only the protocol: anything
+    else printed while serving (warnings, progress) goes to stderr.
+    """
+    protocol_out = sys.stdout
+    sys.stdout = sys.stderr
+    try:
+        cfg = config.load_config()
+        live = LiveMap(root_path, use_cache=use_cache, tree_depth=cfg.tree_depth)
+        server = Server(root_path, live, cfg.api_key)
+        if watch_files:
+            server.start_watching(poll)
+        try:
+            server.serve(sys.stdin, protocol_out)
+        finally:
+            server.stop()
+    finally:
+        sys.stdout = protocol_out
@@ -1,35 +1,225 @@
-import httpx
+import asyncio
+import atexit
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import Future
+from pathlib import Path
 from typing import Dict, Any, Optional
+from pydantic import BaseModel
 from rich.console import Console
+from vdoc import timing
 
 console = Console()
 
-# Placeholder URL
+# Placeholder URL (override with VDOC_API_URL, e.g. for a local stub server)
 API_BASE_URL = "https://api.vibepm.ai/v1"
 
+PROMPT_CACHE_FILE_NAME = "prompt_cache.json"
+# Cached prompts are served without any request while younger than this
+PROMPT_CACHE_TTL = 6 * 60 * 60
+# After a failed fetch, cached (or built-in) prompts are served without
+# contacting the service for this long
+PROMPT_FAILURE_BACKOFF = 15 * 60
+
+CONNECT_TIMEOUT = 3.0
+REQUEST_TIMEOUT = 10.0
+MAX_ATTEMPTS = 3
+BACKOFF_SECONDS = 0.5
+MAX_BACKOFF_SECONDS = 8.0
+RETRY_STATUS = {408, 425, 429, 500, 502, 503, 504}
+
+# Used without an API key, and for any prompt the service does not return
+DEFAULT_PROMPTS = {
+    "scout_system_prompt": (
+        "You are a VDoc Scout Agent. Your job is to analyze the codebase context "
+        "and create a detailed plan for documentation. "
+        "The user will provide a 'Context Map' of the project. "
+        "You must output a plan in a specific format."
+    ),
+    "writer_system_prompt": (
+        "You are a VDoc Technical Writer. Your job is to read the code and write "
+        "perfect documentation based on the user's plan."
+    )
+}
+
+class PromptFetchError(Exception):
+    """The prompt service could not be reached or kept failing after retries."""
+
+class PromptCache(BaseModel):
+    # Which service and key the prompts came from (a hash, never the key itself)
+    source: Optional[str] = None
+    etag: Optional[str] = None
+    # time.time() of the last successful fetch or revalidation
+    fetched_at: float = 0.0
+    # time.time() of the last failed fetch, cleared by the next success
+    failed_at: float = 0.0
+    prompts: Dict[str, str] = {}
+
+def get_api_base_url() -> str:
+    return os.environ.get("VDOC_API_URL", API_BASE_URL).rstrip("/")
+
+def get_prompt_cache_path() -> Path:
+    from vdoc.config import get_config_path
+    return get_config_path().parent / PROMPT_CACHE_FILE_NAME
+
+def _source_id(api_key: str) -> str:
+    return hashlib.sha256(f"{get_api_base_url()}\n{api_key}".encode()).hexdigest()[:16]
+
+def load_prompt_cache(source: str) -> PromptCache:
+    """Loads the prompt cache. Returns an empty cache if missing, corrupt or for another key/service."""
+    try:
+        with open(get_prompt_cache_path(), "r") as f:
+            cache = PromptCache(**json.load(f))
+    except Exception:
+        return PromptCache(source=source)
+    return cache if cache.source == source else PromptCache(source=source)
+
+def save_prompt_cache(cache: PromptCache) -> None:
+    """Writes the cache atomically. Skipped when `.vdoc/` is absent."""
+    cache_path = get_prompt_cache_path()
+    if not cache_path.parent.exists():
+        return
+    tmp_path = cache_path.with_suffix(".tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(cache.model_dump(), f, indent=2)
+    os.replace(tmp_path, cache_path)
+
+# --- HTTP ---
+
+# One event loop on a daemon thread owns the pooled client, so connections
+# are reused across calls instead of a loop and client per call.
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_lock = threading.Lock()
+_client = None
+
+def _event_loop() -> asyncio.AbstractEventLoop:
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="vdoc-services", daemon=True).start()
+            atexit.register(_shutdown)
+    return _loop
+
+def _get_client():
+    """The shared AsyncClient (created on the services loop on first use)."""
+    global _client
+    if _client is None:
+        import httpx
+        _client = httpx.AsyncClient(
+            timeout=httpx.Timeout(REQUEST_TIMEOUT, connect=CONNECT_TIMEOUT),
+            limits=httpx.Limits(max_connections=4, max_keepalive_connections=2),
+        )
+    return _client
+
+def _shutdown() -> None:
+    global _client
+    if _loop is None:
+        return
+    if _client is not None:
+        try:
+            asyncio.run_coroutine_threadsafe(_client.aclose(), _loop).result(timeout=1)
+        except Exception:
+            pass
+        _client = None
+    _loop.call_soon_threadsafe(_loop.stop)
+
+def _describe(error: BaseException) -> str:
+    """An error's message, or its type when the message is empty (e.g. a bare ConnectTimeout)."""
+    return str(error) or type(error).__name__
+
+def _retry_delay(attempt: int, retry_after: Optional[str]) -> float:
+    """Exponential backoff with jitter; a numeric Retry-After header wins when present."""
+    if retry_after and retry_after.isdigit():
+        return min(float(retry_after), MAX_BACKOFF_SECONDS)
+    return min(BACKOFF_SECONDS * 2 ** attempt, MAX_BACKOFF_SECONDS) * (0.5 + random.random() / 2)
+
+async def _request_prompts(api_key: str, etag: Optional[str]):
+    """GET {base}/prompts with retries on transport errors and retryable statuses."""
+    import httpx
+
+    headers = {"Authorization": f"Bearer {api_key}", "Accept": "application/json"}
+    if etag:
+        headers["If-None-Match"] = etag
+    client = _get_client()
+    last_error = None
+    for attempt in range(MAX_ATTEMPTS):
+        retry_after = None
+        timing.count("prompt_requests")
+        try:
+            resp = await client.get(f"{get_api_base_url()}/prompts", headers=headers)
+        except httpx.TransportError as e:
+            last_error = _describe(e)
+        else:
+            if resp.status_code not in RETRY_STATUS:
+                return resp
+            last_error = f"HTTP {resp.status_code}"
+            retry_after = resp.headers.get("Retry-After")
+        if attempt + 1 < MAX_ATTEMPTS:
+            await asyncio.sleep(_retry_delay(attempt, retry_after))
+    raise PromptFetchError(f"prompt service unavailable ({last_error})")
+
 async def fetch_prompts(api_key: Optional[str]) -> Dict[str, str]:
     """
     Fetches system prompts from the VibePM Intelligence Service.
+
+    Prompts are cached in `.vdoc/prompt_cache.json`: within PROMPT_CACHE_TTL
+    they are used without a request, afterwards they are revalidated with
+    If-None-Match. When the service is unreachable or errors, the last good
+    prompts (or the built-in defaults) are used instead, and the service is
+    not contacted again until PROMPT_FAILURE_BACKOFF has passed.
     """
-    # TODO: Implement actual API call
-    # async with httpx.AsyncClient() as client:
-    #     resp = await client.get(...)
-    
-    # Mock Response
-    return {
-        "scout_system_prompt": (
-            "You are a VDoc Scout Agent. Your job is to analyze the codebase context "
-            "and create a detailed plan for documentation. "
-            "The user will provide a 'Context Map' of the project. "
-            "You must output a plan in a specific format."
-        ),
-        "writer_system_prompt": (
-            "You are a VDoc Technical Writer. Your job is to read the code and write "
-            "perfect documentation based on the user's plan."
-        )
-    }
+    if not api_key:
+        return dict(DEFAULT_PROMPTS)
+
+    cache = load_prompt_cache(_source_id(api_key))
+    now = time.time()
+    if cache.prompts and now - cache.fetched_at < PROMPT_CACHE_TTL:
+        return {**DEFAULT_PROMPTS, **cache.prompts}
+    if now - cache.failed_at < PROMPT_FAILURE_BACKOFF:
+        timing.count("prompt_fetches_skipped")
+        return {**DEFAULT_PROMPTS, **cache.prompts}
+
+    try:
+        # Runs on the services loop thread: reported as a phase of its own
+        with timing.phase("prompts_fetch"):
+            resp = await _request_prompts(api_key, cache.etag if cache.prompts else None)
+        if resp.status_code == 304 and cache.prompts:
+            cache.fetched_at = now
+        else:
+            resp.raise_for_status()
+            data = resp.json()
+            prompts = data.get("prompts", data) if isinstance(data, dict) else None
+            if not isinstance(prompts, dict):
+                raise PromptFetchError("unexpected response from prompt service")
+            cache.prompts = {k: v for k, v in prompts.items() if isinstance(v, str)}
+            cache.etag = resp.headers.get("ETag")
+            cache.fetched_at = now
+        cache.failed_at = 0.0
+        save_prompt_cache(cache)
+    except Exception as e:
+        fallback = "cached" if cache.prompts else "built-in"
+        console.print(f"[yellow]! Could not refresh prompts ({_describe(e)}). Using {fallback} prompts.[/yellow]")
+        cache.failed_at = now
+        try:
+            save_prompt_cache(cache)
+        except OSError:
+            pass
+    return {**DEFAULT_PROMPTS, **cache.prompts}
+
+def start_prompt_fetch(api_key: Optional[str]) -> Future:
+    """Starts fetch_prompts on the services loop; returns a concurrent Future."""
+    if not api_key:
+        # Nothing to fetch: skip starting the loop thread
+        done: Future = Future()
+        done.set_result(dict(DEFAULT_PROMPTS))
+        return done
+    return asyncio.run_coroutine_threadsafe(fetch_prompts(api_key), _event_loop())
 
 def get_prompts_sync(api_key: Optional[str]) -> Dict[str, str]:
     """Sync wrapper for fetch_prompts"""
-    import asyncio
-    return asyncio.run(fetch_prompts(api_key))
+    return start_prompt_fetch(api_key).result()
@@ -0,0 +1,190 @@
+import mmap
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Collection, Iterator, List, Optional, Set, Tuple
+
+# Caps on what is inlined into the execution prompt
+MAX_FILE_BYTES = 64 * 1024
+MAX_TOTAL_BYTES = 512 * 1024
+# Files at least this large are memory-mapped rather than read
+MMAP_THRESHOLD = 256 * 1024
+# Bytes inspected for NUL bytes to detect binaries (same heuristic as git)
+BINARY_SNIFF_BYTES = 8000
+
+# Directories holding vdoc's own inputs/outputs rather than project sources
+SKIPPED_DIRS = (".vdoc/", "product_documentation/", ".git/")
+
+_FENCE_LANGUAGES = {
+    ".py": "python", ".js": "javascript", ".mjs": "javascript", ".cjs": "javascript",
+    ".ts": "typescript", ".tsx": "tsx", ".jsx": "jsx", ".go": "go", ".rs": "rust",
+    ".java": "java", ".rb": "ruby", ".php": "php", ".c": "c", ".h": "c", ".cpp": "cpp",
+    ".cs": "csharp", ".kt": "kotlin", ".swift": "swift", ".sh": "bash", ".sql": "sql",
+    ".html": "html", ".css": "css", ".scss": "scss", ".json": "json", ".toml": "toml",
+    ".yaml": "yaml", ".yml": "yaml", ".xml": "xml", ".md": "markdown",
+}
+
+# Backticked spans, markdown link targets, and bare path-like tokens
+_CANDIDATE = re.compile(
+    r"`([^`\n]+)`"
+    r"|\]\(([^)\s]+)\)"
+    r"|(?<![\w/.-])((?:\.{0,2}/)?[\w.-]+(?:/[\w.-]+)*\.[A-Za-z0-9]{1,10}|[\w.-]+(?:/[\w.-]+)+)"
+)
+# Trailing location suffixes: path:12, path:12:3, path#L12-L20
+_LOCATION = re.compile(r"(?::\d+(?::\d+)?|#L\d+(?:-L?\d+)?)$")
+
+def extract_paths(text: str) -> List[str]:
+    """Candidate file paths mentioned in a plan, normalised and deduplicated in order of appearance."""
+    seen = set()
+    paths = []
+    for m in _CANDIDATE.finditer(text):
+        raw = next(g for g in m.groups() if g)
+        candidate = _LOCATION.sub("", raw.strip().strip("'\"").rstrip(".,;:)"))
+        while candidate.startswith("./"):
+            candidate = candidate[2:]
+        if not candidate or " " in candidate or "://" in candidate or candidate in seen:
+            continue
+        seen.add(candidate)
+        paths.append(candidate)
+    return paths
+
+@dataclass
+class Source:
+    rel: str
+    text: Optional[str] = None
+    size: int = 0
+    # Why the file is not (fully) inlined: "binary", "truncated", "unreadable", "total cap"
+    note: Optional[str] = None
+
+def resolve(root_path: Path, rel: str) -> Optional[Tuple[str, Path, int]]:
+    """
+    (normalised rel, path, size) for an existing regular file inside the
+    root, else None. Symlinks are followed only while they stay inside it.
+    """
+    if os.path.isabs(rel):
+        return None
+    rel = os.path.normpath(rel).replace(os.sep, "/")
+    if rel.startswith("../") or rel == ".." or rel.startswith(SKIPPED_DIRS):
+        return None
+    path = root_path / rel
+    try:
+        st = path.stat()
+        root = os.path.realpath(root_path)
+        if os.path.commonpath([root, os.path.realpath(path)]) != root:
+            return None
+    except (OSError, ValueError):
+        return None
+    if not path.is_file():
+        return None
+    return rel, path, st.st_size
+
+def listed_files(root_path: Path) -> Set[str]:
+    """The scan's file listing (gitignore respected), reused from the scan cache while valid."""
+    from vdoc import scanner
+    from vdoc.cache import ScanCache
+
+    cache = ScanCache.load(root_path)
+    rels = set(scanner.get_file_table(root_path, cache).rels())
+    cache.save()
+    return rels
+
+def _read(path: Path, size: int, limit: int) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Reads at most `limit` bytes of a file, cut at the last complete line.
+    Large files are memory-mapped so only the pages actually inspected are
+    loaded. Returns (text, note).
+    """
+    try:
+        with open(path, "rb") as f:
+            if size >= MMAP_THRESHOLD:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    if mm.find(b"\0", 0, BINARY_SNIFF_BYTES) != -1:
+                        return None, "binary"
+                    end = size if size <= limit else mm.rfind(b"\n", 0, limit) + 1 or limit
+                    data = mm[:end]
+            else:
+                data = f.read(limit)
+                if b"\0" in data[:BINARY_SNIFF_BYTES]:
+                    return None, "binary"
+                if size > limit:
+                    data = data[:data.rfind(b"\n") + 1 or limit]
+    except (OSError, ValueError):
+        return None, "unreadable"
+    return data.decode("utf-8", "replace"), "truncated" if size > limit else None
+
+def gather_sources(
+    root_path: Path,
+    candidates: List[str],
+    max_file_bytes: int = MAX_FILE_BYTES,
+    max_total_bytes: int = MAX_TOTAL_BYTES,
+    workers: Optional[int] = None,
+    listed: Optional[Collection[str]] = None,
+) -> List[Source]:
+    """
+    Reads the candidate files that exist inside root_path, concurrently.
+    Only files in the scan listing (default `listed_files`) are read, so
+    ignored files such as `.env` are never inlined. The total cap is applied
+    in plan order from file sizes before anything is read, so files that
+    would not fit are never opened.
+    """
+    if listed is None:
+        listed = listed_files(root_path)
+    resolved = []
+    seen = set()
+    for candidate in candidates:
+        hit = resolve(root_path, candidate)
+        if hit is not None and hit[0] in listed and hit[0] not in seen:
+            seen.add(hit[0])
+            resolved.append(hit)
+
+    sources: List[Source] = []
+    jobs = []
+    remaining = max_total_bytes
+    for rel, path, size in resolved:
+        source = Source(rel, size=size)
+        sources.append(source)
+        limit = min(size, max_file_bytes, remaining)
+        if remaining <= 0 or (limit < size and limit < max_file_bytes):
+            source.note = "total cap"
+            continue
+        remaining -= limit
+        jobs.append((source, path, limit))
+
+    def load(job) -> None:
+        source, path, limit = job
+        source.text, source.note = _read(path, source.size, max(limit, 1))
+
+    if workers is None:
+        workers = min(16, len(jobs))
+    if workers > 1:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(load, jobs))
+    else:
+        for job in jobs:
+            load(job)
+    return sources
+
+def _fence(text: str) -> str:
+    longest = max((len(run) for run in re.findall(r"`{3,}", text)), default=2)
+    return "`" * max(3, longest + 1)
+
+def iter_source_lines(sources: List[Source]) -> Iterator[str]:
+    """Markdown for the gathered files: one fenced block per file, then what was left out."""
+    skipped = []
+    for source in sources:
+        if source.text is None:
+            skipped.append(f"`{source.rel}` ({source.note})")
+            continue
+        fence = _fence(source.text)
+        yield f"### `{source.rel}`"
+        yield fence + _FENCE_LANGUAGES.get(os.path.splitext(source.rel)[1], "")
+        yield source.text.rstrip("\n")
+        yield fence
+        if source.note == "truncated":
+            yield f"_(truncated: first {len(source.text.encode('utf-8', 'replace')):,} of {source.size:,} bytes)_"
+        yield ""
+    if skipped:
+        yield f"Not inlined: {', '.join(skipped)}"
+        yield ""
@@ -1,36 +1,160 @@
 import json
+import sqlite3
+import sys
+from contextlib import closing, contextmanager
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Iterator
 from pydantic import BaseModel
 
 class VDocState(BaseModel):
     last_run: Optional[str] = None
+    # HEAD when init/update last ran: the default base for `vdoc update --delta`
+    last_commit: Optional[str] = None
     # flexible dictionary to store other state items
     local_context: Dict[str, Any] = {}
 
-STATE_FILE_NAME = "state.json"
+# State lives in a SQLite database in WAL mode, one row per field (and per
+# local_context entry) holding its JSON value. Saves only write the rows
+# that changed, in one transaction, so a killed process leaves either the
+# old or the new state, never a truncated file.
+STATE_FILE_NAME = "state.db"
+# Earlier versions kept the whole state in one JSON file; it is imported once
+LEGACY_STATE_FILE_NAME = "state.json"
 CONFIG_DIR_NAME = ".vdoc"
 
+# Row key prefix of local_context entries
+CONTEXT_PREFIX = "local_context/"
+# Seconds to wait for another vdoc process holding the write lock
+BUSY_TIMEOUT = 5.0
+
 def get_state_path() -> Path:
     return Path.cwd() / CONFIG_DIR_NAME / STATE_FILE_NAME
 
-def load_state() -> VDocState:
-    state_path = get_state_path()
-    if not state_path.exists():
-        return VDocState()
-    
+def _connect(path: Path) -> sqlite3.Connection:
+    conn = sqlite3.connect(str(path), timeout=BUSY_TIMEOUT, isolation_level=None)
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")
+        # With WAL, NORMAL loses no committed data on a process crash (only on power loss)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("CREATE TABLE IF NOT EXISTS state (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+    except sqlite3.DatabaseError:
+        conn.close()
+        raise
+    return conn
+
+@contextmanager
+def _open(create: bool) -> Iterator[Optional[sqlite3.Connection]]:
+    """
+    Connection to the state database, after importing a legacy state.json.
+    Yields None when there is no state and create is False. A file that is
+    not a readable database is moved aside (with a warning) and started afresh.
+    """
+    path = get_state_path()
+    legacy = path.with_name(LEGACY_STATE_FILE_NAME)
+    if not create and not path.exists() and not legacy.exists():
+        yield None
+        return
+    path.parent.mkdir(parents=True, exist_ok=True)
     try:
-        with open(state_path, "r") as f:
-            data = json.load(f)
-            return VDocState(**data)
+        conn = _connect(path)
+    except sqlite3.DatabaseError as e:
+        aside = path.with_name(path.name + ".corrupt")
+        path.replace(aside)
+        for suffix in ("-wal", "-shm"):
+            path.with_name(path.name + suffix).unlink(missing_ok=True)
+        print(f"! Unreadable {path.name} ({e}); moved to {aside.name} and starting with empty state.", file=sys.stderr)
+        conn = _connect(path)
+    with closing(conn):
+        if legacy.exists():
+            _import_legacy(conn, legacy)
+        yield conn
+
+def _import_legacy(conn: sqlite3.Connection, legacy: Path) -> None:
+    try:
+        with open(legacy, "r") as f:
+            state = VDocState(**json.load(f))
     except Exception:
-        return VDocState()
+        state = VDocState()
+    with _transaction(conn):
+        # Rows already in the database are newer than the legacy file
+        existing = {key for (key,) in conn.execute("SELECT key FROM state")}
+        conn.executemany(
+            "INSERT INTO state (key, value) VALUES (?, ?)",
+            [(key, value) for key, value in _rows(state).items() if key not in existing],
+        )
+    legacy.unlink()
+
+@contextmanager
+def _transaction(conn: sqlite3.Connection) -> Iterator[None]:
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute("COMMIT")
+
+def _rows(state: VDocState) -> Dict[str, str]:
+    """{row key: JSON value} for a state; None fields have no row."""
+    rows = {}
+    for name, value in state.model_dump().items():
+        if name == "local_context":
+            for key, item in value.items():
+                rows[CONTEXT_PREFIX + key] = json.dumps(item)
+        elif value is not None:
+            rows[name] = json.dumps(value)
+    return rows
+
+def load_state() -> VDocState:
+    with _open(create=False) as conn:
+        if conn is None:
+            return VDocState()
+        data: Dict[str, Any] = {"local_context": {}}
+        for key, value in conn.execute("SELECT key, value FROM state"):
+            if key.startswith(CONTEXT_PREFIX):
+                data["local_context"][key[len(CONTEXT_PREFIX):]] = json.loads(value)
+            elif key in VDocState.model_fields:
+                data[key] = json.loads(value)
+        return VDocState(**data)
 
 def save_state(state: VDocState) -> None:
-    state_path = get_state_path()
-    # Assume directory exists as config usually takes care of it, 
-    # but good measure to ensure parent exists
-    state_path.parent.mkdir(parents=True, exist_ok=True)
-    
-    with open(state_path, "w") as f:
-        json.dump(state.model_dump(), f, indent=2)
+    """Writes the rows that differ from the stored state (and deletes dropped ones) atomically."""
+    rows = _rows(state)
+    with _open(create=True) as conn, _transaction(conn):
+        stored = dict(conn.execute("SELECT key, value FROM state"))
+        conn.executemany(
+            "INSERT OR REPLACE INTO state (key, value) VALUES (?, ?)",
+            [(key, value) for key, value in rows.items() if stored.get(key) != value],
+        )
+        conn.executemany(
+            "DELETE FROM state WHERE key = ?",
+            [(key,) for key in stored if key not in rows and (key in VDocState.model_fields or key.startswith(CONTEXT_PREFIX))],
+        )
+
+def update_state(**fields: Any) -> None:
+    """Sets the given state fields (None clears one) without reading the rest."""
+    unknown = {name for name in fields if name not in VDocState.model_fields or name == "local_context"}
+    if unknown:
+        raise ValueError(f"not a state field: {', '.join(sorted(unknown))}")
+    with _open(create=True) as conn, _transaction(conn):
+        for key, value in fields.items():
+            _put(conn, key, value)
+
+def get_context(key: str, default: Any = None) -> Any:
+    """One local_context entry, looked up by key."""
+    with _open(create=False) as conn:
+        if conn is None:
+            return default
+        row = conn.execute("SELECT value FROM state WHERE key = ?", (CONTEXT_PREFIX + key,)).fetchone()
+        return default if row is None else json.loads(row[0])
+
+def set_context(key: str, value: Any) -> None:
+    """Stores one local_context entry (None removes it)."""
+    with _open(create=True) as conn, _transaction(conn):
+        _put(conn, CONTEXT_PREFIX + key, value)
+
+def _put(conn: sqlite3.Connection, key: str, value: Any) -> None:
+    if value is None:
+        conn.execute("DELETE FROM state WHERE key = ?", (key,))
+    else:
+        conn.execute("INSERT OR REPLACE INTO state (key, value) VALUES (?, ?)", (key, json.dumps(value)))
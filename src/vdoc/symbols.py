@@ -0,0 +1,146 @@
+import hashlib
+import re
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple, Union
+from vdoc import timing
+from vdoc.cache import ScanCache, cached_map
+from vdoc.filetable import FileTable, as_table
+
+# Extension -> symbol grammar
+SYMBOL_LANGUAGES = {
+    ".py": "python",
+    ".js": "js", ".mjs": "js", ".cjs": "js", ".ts": "js",
+    ".jsx": "jsx", ".tsx": "jsx",
+    ".go": "go",
+}
+
+# Files larger than this are almost always generated or minified
+MAX_SYMBOL_FILE_BYTES = 1_000_000
+MAX_SYMBOLS_PER_FILE = 15
+
+_JS_NAME = r"[A-Za-z_$][\w$]*"
+
+# (regex, formatter) pairs; formatters receive the match and the file's language
+_GRAMMARS = {
+    "python": [
+        (re.compile(r"^class\s+([A-Za-z_]\w*)", re.M), lambda m, lang: f"class {m.group(1)}"),
+        (re.compile(r"^(?:async\s+)?def\s+([A-Za-z_]\w*)", re.M), lambda m, lang: f"def {m.group(1)}"),
+    ],
+    "js": [
+        (re.compile(rf"^(?:export\s+(?:default\s+)?)?(?:async\s+)?function\*?\s+({_JS_NAME})", re.M),
+         lambda m, lang: f"{_js_kind(m.group(1), 'function', lang)} {m.group(1)}"),
+        (re.compile(rf"^(?:export\s+(?:default\s+)?)?(?:abstract\s+)?class\s+({_JS_NAME})", re.M),
+         lambda m, lang: f"class {m.group(1)}"),
+        (re.compile(rf"^export\s+(?:const|let|var)\s+({_JS_NAME})", re.M),
+         lambda m, lang: f"{_js_kind(m.group(1), 'const', lang)} {m.group(1)}"),
+        (re.compile(rf"^export\s+(?:declare\s+)?(interface|type|enum)\s+({_JS_NAME})", re.M),
+         lambda m, lang: f"{m.group(1)} {m.group(2)}"),
+    ],
+    "go": [
+        (re.compile(r"^func\s+\(\s*\w*\s*\*?\s*(\w+)[^)]*\)\s*(\w+)", re.M),
+         lambda m, lang: f"func {m.group(1)}.{m.group(2)}"),
+        (re.compile(r"^func\s+(\w+)", re.M), lambda m, lang: f"func {m.group(1)}"),
+        (re.compile(r"^type\s+(\w+)\s+(struct|interface)\b", re.M), lambda m, lang: f"{m.group(2)} {m.group(1)}"),
+    ],
+}
+_GRAMMARS["jsx"] = _GRAMMARS["js"]
+
+def _js_kind(name: str, default: str, lang: str) -> str:
+    """PascalCase functions/constants in JSX/TSX files are React components."""
+    is_pascal = name[:1].isupper() and not name.isupper()
+    return "component" if lang == "jsx" and is_pascal else default
+
+def extract_symbols(text: str, lang: str) -> List[str]:
+    """
+    Extracts top-level definitions (classes, functions, exported components,
+    types) from source text, in file order. Private Python names are skipped.
+    """
+    found = []
+    for regex, fmt in _GRAMMARS.get(lang, []):
+        for m in regex.finditer(text):
+            if lang == "python" and m.group(1).startswith("_"):
+                continue
+            found.append((m.start(), fmt(m, lang)))
+    found.sort()
+    symbols = []
+    seen = set()
+    for _, symbol in found:
+        if symbol not in seen:
+            seen.add(symbol)
+            symbols.append(symbol)
+    return symbols
+
+def content_digest(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+_known_digests: Set[str] = set()
+
+def _init_worker(known: Set[str]) -> None:
+    global _known_digests
+    _known_digests = known
+
+def _parse_file(job: Tuple[str, str, str]) -> Tuple[Optional[str], Optional[List[str]]]:
+    """
+    Worker: reads and hashes one (rel, path, grammar) file. Returns
+    (digest, symbols), where symbols is None when the digest is already
+    known to the parent.
+    """
+    _, path, lang = job
+    try:
+        with open(path, "rb") as f:
+            data = f.read(MAX_SYMBOL_FILE_BYTES + 1)
+    except OSError:
+        return None, None
+    if len(data) > MAX_SYMBOL_FILE_BYTES:
+        return None, []
+    digest = content_digest(data)
+    if digest in _known_digests:
+        return digest, None
+    return digest, extract_symbols(data.decode("utf-8", "replace"), lang)
+
+def build_repository_map(
+    root_path: Path,
+    files: Union[FileTable, List[Path]],
+    cache: Optional[ScanCache] = None,
+    workers: Optional[int] = None,
+) -> Dict[str, List[str]]:
+    """
+    Returns {relative path: symbols} for every supported source file.
+
+    Files whose stamp is unchanged are served from the scan cache without
+    being read. Changed files are read and hashed; if their content digest
+    matches any cached file (e.g. after a branch switch touched mtimes) the
+    symbols are reused, otherwise they are parsed. Large batches are parsed
+    on a process pool.
+    """
+    with timing.phase("symbols"):
+        return _build(root_path, as_table(root_path, files), cache, workers)
+
+def _build(root_path: Path, table: FileTable, cache: Optional[ScanCache], workers: Optional[int]) -> Dict[str, List[str]]:
+    files = []
+    for i in range(len(table)):
+        lang = SYMBOL_LANGUAGES.get(table.suffix(i))
+        if lang is not None:
+            files.append((table.rel(i), lang))
+
+    by_digest: Dict[str, List[str]] = {}
+    if cache is not None:
+        for _, (digest, symbols) in cache.data["entries"].get("symbols", {}).values():
+            if digest is not None:
+                by_digest[digest] = symbols
+
+    def finish(rel: str, parsed: Tuple[Optional[str], Optional[List[str]]]) -> List:
+        digest, symbols = parsed
+        if digest is None:
+            return [None, symbols or []]
+        if symbols is None:
+            symbols = by_digest[digest]
+        by_digest[digest] = symbols
+        return [digest, symbols]
+
+    # Cached [digest, symbols] for unchanged files; the rest are parsed on a process pool
+    found = cached_map(
+        root_path, cache, "symbols", files, _parse_file, counter="files_parsed", finish=finish,
+        workers=workers, processes=True, initializer=_init_worker, initargs=(set(by_digest),),
+    )
+    return {rel: symbols for rel, (_, symbols) in found.items()}
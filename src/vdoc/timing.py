@@ -0,0 +1,153 @@
+import json
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Optional
+
+# Per-phase timings for `vdoc --timings`. Instrumented code calls `phase` and
+# `count` unconditionally; both are no-ops until `enable` is called, so the
+# hooks cost next to nothing on a normal run. Stdlib only: imported by
+# vdoc.main as soon as the flag is given.
+
+@dataclass
+class PhaseStats:
+    calls: int = 0
+    wall: float = 0.0
+    cpu: float = 0.0
+
+class Recorder:
+    """
+    Wall and CPU time per phase, keyed by the path of enclosing phases on the
+    same thread (e.g. "scan/symbols"), plus named counters.
+    CPU time is process-wide (time.process_time), so it includes worker
+    threads and anything running concurrently, such as the prompt fetch.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.cpu_started = time.process_time()
+        self.phases: Dict[str, PhaseStats] = {}
+        self.counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def stack(self) -> List[str]:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def add(self, path: str, wall: float, cpu: float, calls: int = 1) -> None:
+        with self._lock:
+            stats = self.phases.setdefault(path, PhaseStats())
+            stats.calls += calls
+            stats.wall += wall
+            stats.cpu += cpu
+
+    def count(self, name: str, n: int) -> None:
+        with self._lock:
+            self.counts[name] = self.counts.get(name, 0) + n
+
+    def report(self) -> Dict:
+        """Totals, phases (parents before their children, in start order) and counters."""
+        with self._lock:
+            order = {path: i for i, path in enumerate(self.phases)}
+
+            def key(path: str):
+                parts = path.split("/")
+                return [order.get("/".join(parts[:i + 1]), -1) for i in range(len(parts))]
+
+            phases = [
+                {"phase": path, "calls": stats.calls, "wall_ms": _ms(stats.wall), "cpu_ms": _ms(stats.cpu)}
+                for path, stats in sorted(self.phases.items(), key=lambda item: key(item[0]))
+            ]
+            return {
+                "wall_ms": _ms(time.perf_counter() - self.started),
+                "cpu_ms": _ms(time.process_time() - self.cpu_started),
+                "phases": phases,
+                "counts": dict(sorted(self.counts.items())),
+            }
+
+_recorder: Optional[Recorder] = None
+
+def enable() -> Recorder:
+    global _recorder
+    _recorder = Recorder()
+    return _recorder
+
+def disable() -> None:
+    global _recorder
+    _recorder = None
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    """Times the enclosed block as `name`, nested under the phases enclosing it on this thread."""
+    recorder = _recorder
+    if recorder is None:
+        yield
+        return
+    stack = recorder.stack()
+    stack.append(name)
+    path = "/".join(stack)
+    # Registered on entry so that the report lists phases in start order
+    recorder.add(path, 0.0, 0.0, calls=0)
+    wall, cpu = time.perf_counter(), time.process_time()
+    try:
+        yield
+    finally:
+        recorder.add(path, time.perf_counter() - wall, time.process_time() - cpu)
+        stack.pop()
+
+def timed(name: str, lines: Iterable[str]) -> Iterable[str]:
+    """
+    Wraps a lazily produced sequence (e.g. a rendered map) so that the time
+    spent producing its items is recorded as one call of `name`, nested under
+    whatever phase consumes it. Returns lines unchanged when timings are off.
+    """
+    if _recorder is None:
+        return lines
+    return _timed(_recorder, name, iter(lines))
+
+def _timed(recorder: Recorder, name: str, lines: Iterator[str]) -> Iterator[str]:
+    path, wall, cpu = None, 0.0, 0.0
+    try:
+        while True:
+            if path is None:
+                path = "/".join(recorder.stack() + [name])
+                recorder.add(path, 0.0, 0.0, calls=0)
+            started, cpu_started = time.perf_counter(), time.process_time()
+            try:
+                line = next(lines)
+            except StopIteration:
+                return
+            finally:
+                wall += time.perf_counter() - started
+                cpu += time.process_time() - cpu_started
+            yield line
+    finally:
+        if path is not None:
+            recorder.add(path, wall, cpu)
+
+def count(name: str, n: int = 1) -> None:
+    """Adds n to the counter `name` (files listed, bytes written, ...)."""
+    recorder = _recorder
+    if recorder is not None:
+        recorder.count(name, n)
+
+def format_text(report: Dict) -> str:
+    lines = [f"{'phase':<36} {'wall ms':>10} {'cpu ms':>10} {'calls':>6}"]
+    for entry in report["phases"]:
+        depth = entry["phase"].count("/")
+        label = "  " * depth + entry["phase"].rsplit("/", 1)[-1]
+        lines.append(f"{label:<36} {entry['wall_ms']:>10} {entry['cpu_ms']:>10} {entry['calls']:>6}")
+    lines.append(f"{'total':<36} {report['wall_ms']:>10} {report['cpu_ms']:>10}")
+    if report["counts"]:
+        lines.append("counts: " + ", ".join(f"{name}={value}" for name, value in report["counts"].items()))
+    return "\n".join(lines)
+
+def format_json(report: Dict) -> str:
+    return json.dumps(report, indent=2)
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 2)
@@ -0,0 +1,199 @@
+from collections import Counter
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from vdoc import importance
+
+# Directory levels expanded below a top-level directory before subtrees are
+# summarised, and files listed per directory before the rest are counted.
+DEFAULT_TREE_DEPTH = 2
+FILES_PER_DIR = 15
+
+class TreeNode:
+    """A directory in the path trie, with counts aggregated over its subtree."""
+    __slots__ = ("name", "dirs", "files", "count", "languages")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.dirs: Dict[str, "TreeNode"] = {}
+        self.files: List[str] = []
+        self.count = 0
+        self.languages: Counter = Counter()
+
+def build_tree(rel_paths: Iterable[str], classify: Callable[[str], Optional[str]]) -> TreeNode:
+    """
+    Builds a trie of posix relative paths in one pass over the input, then
+    aggregates file counts and languages bottom-up in one pass over the
+    directories. `classify` maps a file name to a language (or None).
+    """
+    root = TreeNode("")
+    for rel in rel_paths:
+        node = root
+        *dirs, name = rel.split("/")
+        for d in dirs:
+            child = node.dirs.get(d)
+            if child is None:
+                child = node.dirs[d] = TreeNode(d)
+            node = child
+        node.files.append(name)
+
+    # Post-order aggregation without recursion (deep trees are common)
+    order = []
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        order.append(node)
+        stack.extend(node.dirs.values())
+    for node in reversed(order):
+        node.count = len(node.files)
+        for name in node.files:
+            lang = classify(name)
+            if lang:
+                node.languages[lang] += 1
+        for child in node.dirs.values():
+            node.count += child.count
+            node.languages.update(child.languages)
+    return root
+
+def summarize(node: TreeNode, top: int = 2) -> str:
+    """'N files' plus the dominant languages of the subtree, e.g. '120 files: Python 80%, HTML 15%'."""
+    noun = "file" if node.count == 1 else "files"
+    classified = sum(node.languages.values())
+    if not classified:
+        return f"{node.count} {noun}"
+    langs = ", ".join(
+        f"{lang} {round(100 * n / classified)}%" for lang, n in node.languages.most_common(top)
+    )
+    return f"{node.count} {noun}: {langs}"
+
+def _subdirs(current: TreeNode, path: str) -> List[Tuple[str, TreeNode, str]]:
+    """(label, node, path) of each subdirectory, by name, with single-child chains folded."""
+    found = []
+    for name in sorted(current.dirs):
+        child = current.dirs[name]
+        label = name
+        while not child.files and len(child.dirs) == 1:
+            (sub_name, sub), = child.dirs.items()
+            label += "/" + sub_name
+            child = sub
+        found.append((label, child, f"{path}{label}/"))
+    return found
+
+def _plural(n: int, singular: str, plural: str) -> str:
+    return f"{n} more {singular if n == 1 else plural}"
+
+def render_tree(
+    node: TreeNode,
+    max_depth: int = DEFAULT_TREE_DEPTH,
+    files_per_dir: Optional[int] = FILES_PER_DIR,
+    score: Optional[Callable[[str], float]] = None,
+    prefix: str = "",
+    max_lines: Optional[int] = None,
+) -> List[str]:
+    """
+    Renders the contents of `node` as an indented markdown list: directories
+    first (with subtree summaries), then files. Directories deeper than
+    max_depth are shown as a summary line only; chains of directories that
+    contain nothing but a single subdirectory are folded into one line.
+    files_per_dir=None lists every file. A directory with more files lists
+    the alphabetically first ones, or with `score` (called with prefix plus
+    the file's path below `node`) the highest-scoring ones, in name order.
+
+    With max_lines, the listing is cut to that many lines by shape first:
+    directory summaries are kept a whole level at a time (a level that does
+    not fit is left collapsed into its parents' summaries; if even the top
+    level does not, its largest directories are kept and a quarter of the
+    lines go to files) and only file lines are trimmed, shared out between
+    the listed directories. Each directory with hidden entries ends in one
+    line counting them.
+    """
+    if max_lines is not None and max_lines <= 0:
+        return []
+
+    # 1. Directory lines, one level at a time. `reserved` holds a line for
+    #    the overflow marker of every listed directory that may need one.
+    top = _subdirs(node, prefix)
+    hidden_dirs = 0
+    if max_lines is not None and len(top) + bool(node.files) > max_lines:
+        # Too many directories: the largest ones, with a quarter of the lines
+        # left for the directory's own (most important) files
+        file_room = min(len(node.files), files_per_dir or len(node.files), max(1, (max_lines - 1) // 4))
+        keep = max(max_lines - 1 - file_room, 0)
+        largest = sorted(top, key=lambda entry: -entry[1].count)[:keep]
+        hidden_dirs = len(top) - len(largest)
+        top = sorted(largest, key=lambda entry: entry[0])
+    shown: Dict[int, List[Tuple[str, TreeNode, str]]] = {id(node): top}
+    order: List[Tuple[TreeNode, str]] = [(node, prefix)]
+    used = len(top)
+    reserved = int(bool(node.files) or hidden_dirs > 0)
+    frontier = top
+    for _ in range(1, max_depth):
+        below = {id(child): _subdirs(child, path) for _, child, path in frontier}
+        cost = sum(len(subs) for subs in below.values()) + sum(1 for _, child, _ in frontier if child.files)
+        if not frontier or (max_lines is not None and used + reserved + cost > max_lines):
+            break
+        shown.update(below)
+        order.extend((child, path) for _, child, path in frontier)
+        used += sum(len(subs) for subs in below.values())
+        reserved += sum(1 for _, child, _ in frontier if child.files)
+        frontier = [entry for subs in below.values() for entry in subs]
+
+    # 2. File lines: up to files_per_dir per listed directory, shared out
+    #    evenly: the largest per-directory count that fits, then one more
+    #    file each for the first directories (shallowest first) while lines remain
+    files = {id(current): sorted(current.files) for current, _ in order}
+    wanted = {key: len(names) if files_per_dir is None else min(files_per_dir, len(names)) for key, names in files.items()}
+    counts = wanted
+    if max_lines is not None:
+        room = max_lines - used
+        marked = {id(node)} if hidden_dirs else set()
+
+        def cost(per_dir: int) -> int:
+            lines = 0
+            for key, names in files.items():
+                n = min(wanted[key], per_dir)
+                lines += n + (n < len(names) or key in marked)
+            return lines
+
+        low, high = 0, max(wanted.values())
+        while low < high:
+            mid = (low + high + 1) // 2
+            if cost(mid) <= room:
+                low = mid
+            else:
+                high = mid - 1
+        counts = {key: min(wanted[key], low) for key in files}
+        free = room - cost(low)
+        for current, _ in order:
+            key = id(current)
+            if free <= 0:
+                break
+            if counts[key] < wanted[key]:
+                counts[key] += 1
+                # A directory listed in full needs no marker
+                free -= 0 if counts[key] == len(files[key]) and key not in marked else 1
+
+    # 3. Render in tree order
+    lines: List[str] = []
+
+    def walk(current: TreeNode, depth: int, path: str) -> None:
+        indent = "  " * (depth - 1)
+        for label, child, child_path in shown[id(current)]:
+            lines.append(f"{indent}- {label}/ ({summarize(child)})")
+            if id(child) in shown:
+                walk(child, depth + 1, child_path)
+        names = files[id(current)]
+        count = counts[id(current)]
+        listed = names[:count]
+        if score is not None and count < len(names):
+            listed = importance.top_k(names, count, lambda name: score(path + name))
+        for name in listed:
+            lines.append(f"{indent}- {name}")
+        hidden = []
+        if current is node and hidden_dirs:
+            hidden.append(_plural(hidden_dirs, "directory", "directories"))
+        if count < len(names):
+            hidden.append(_plural(len(names) - count, "file", "files"))
+        if hidden:
+            lines.append(f"{indent}- ... ({', '.join(hidden)})")
+
+    walk(node, 1, prefix)
+    return lines
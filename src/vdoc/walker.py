@@ -0,0 +1,144 @@
+import os
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import List, Optional, Sequence, Set, Tuple
+from vdoc.ignore import IgnoreRules, IGNORE_FILE_NAMES, is_ignored, load_rules
+
+# Applied (at lowest precedence) when walking trees that are not git repos,
+# where there may be no .gitignore to keep dependency folders out.
+DEFAULT_IGNORES = ["node_modules/", "__pycache__/", "venv/", "site-packages/", "*.py[cod]"]
+
+def default_rules() -> List[IgnoreRules]:
+    return [IgnoreRules(DEFAULT_IGNORES)]
+
+def _scan_dir(
+    root: Path,
+    rel_dir: str,
+    stack: Sequence[IgnoreRules],
+    ignore_files: Sequence[str],
+    skip_hidden: bool,
+    skip_nested_repos: bool,
+    follow_symlinks: bool,
+) -> Tuple[List[str], List[Tuple[str, Sequence[IgnoreRules], Optional[Tuple[int, int]]]]]:
+    """
+    Lists one directory. Returns the non-ignored files and the subdirectories
+    to descend into (with the ignore stack that applies to them and, when
+    following symlinks, their (st_dev, st_ino) identity).
+    """
+    abs_dir = root / rel_dir if rel_dir else root
+    try:
+        with os.scandir(abs_dir) as it:
+            entries = list(it)
+    except OSError:
+        return [], []
+
+    names = {e.name for e in entries}
+    for ignore_name in ignore_files:
+        if ignore_name in names:
+            rules = load_rules(abs_dir / ignore_name, rel_dir)
+            if rules:
+                stack = list(stack) + [rules]
+
+    prefix = rel_dir + "/" if rel_dir else ""
+    files = []
+    subdirs = []
+    for entry in entries:
+        name = entry.name
+        if skip_hidden and name.startswith("."):
+            continue
+        rel = prefix + name
+        try:
+            is_dir = entry.is_dir()
+            is_link = entry.is_symlink()
+        except OSError:
+            continue
+        if not is_dir:
+            if not is_ignored(stack, rel, False):
+                files.append(rel)
+            continue
+        if (is_link and not follow_symlinks) or name == ".git" or is_ignored(stack, rel, True):
+            continue
+        if skip_nested_repos and os.path.lexists(os.path.join(entry.path, ".git")):
+            continue
+        identity = None
+        if follow_symlinks:
+            try:
+                st = entry.stat()
+            except OSError:
+                continue
+            identity = (st.st_dev, st.st_ino)
+        subdirs.append((rel, stack, identity))
+    return files, subdirs
+
+def walk(
+    root: Path,
+    start: str = "",
+    ignore_files: Sequence[str] = IGNORE_FILE_NAMES,
+    base_stack: Sequence[IgnoreRules] = (),
+    skip_hidden: bool = False,
+    skip_nested_repos: bool = False,
+    follow_symlinks: bool = False,
+    workers: Optional[int] = None,
+    visited_dirs: Optional[List[str]] = None,
+) -> List[str]:
+    """
+    Multi-threaded, ignore-aware directory walk.
+
+    Returns file paths relative to root (posix, unordered) below `start`.
+    Each directory is listed with `os.scandir` on a thread pool; ignore files
+    found in a directory are compiled once and apply to its whole subtree,
+    and ignored directories are pruned without being listed. With
+    follow_symlinks, directories are visited at most once by (device, inode)
+    so symlink cycles terminate; otherwise symlinked directories are skipped.
+    Every directory listed (including ones that hold no listed file) is
+    appended to visited_dirs when given.
+    """
+    start_dir = root / start if start else root
+    visited: Set[Tuple[int, int]] = set()
+    if follow_symlinks:
+        try:
+            st = os.stat(start_dir)
+            visited.add((st.st_dev, st.st_ino))
+        except OSError:
+            return []
+
+    def admit(identity: Optional[Tuple[int, int]]) -> bool:
+        if identity is None:
+            return True
+        if identity in visited:
+            return False
+        visited.add(identity)
+        return True
+
+    options = (ignore_files, skip_hidden, skip_nested_repos, follow_symlinks)
+    results: List[str] = []
+    cpus = os.cpu_count() or 1
+    if workers is None:
+        workers = min(32, cpus * 4) if cpus > 1 else 1
+
+    if workers == 1:
+        # Single core: the pool would only add scheduling overhead
+        queue = [(start, list(base_stack))]
+        while queue:
+            rel_dir, stack = queue.pop()
+            files, subdirs = _scan_dir(root, rel_dir, stack, *options)
+            if visited_dirs is not None:
+                visited_dirs.append(rel_dir)
+            results.extend(files)
+            queue.extend((rel, stack) for rel, stack, identity in subdirs if admit(identity))
+        return results
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = {pool.submit(_scan_dir, root, start, list(base_stack), *options): start}
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                rel_dir = pending.pop(future)
+                files, subdirs = future.result()
+                if visited_dirs is not None:
+                    visited_dirs.append(rel_dir)
+                results.extend(files)
+                for rel, stack, identity in subdirs:
+                    if admit(identity):
+                        pending[pool.submit(_scan_dir, root, rel, stack, *options)] = rel
+    return results
@@ -0,0 +1,426 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Set, Tuple
+from vdoc import gitindex, imports, languages, manifests, output, scanner, symbols, walker
+from vdoc.cache import CONFIG_DIR_NAME, ScanCache
+from vdoc.filetable import FileTable
+from vdoc.ignore import IGNORE_FILE_NAMES, IgnoreRules, global_rules, is_ignored, load_rules
+
+# Quiet period after the last event before the map is rewritten, and the
+# longest a continuous burst (e.g. a branch switch) may delay a rewrite
+DEBOUNCE_SECONDS = 0.3
+MAX_DELAY_SECONDS = 2.0
+POLL_INTERVAL = 1.0
+
+# (kind, rel, is_dir): kind is "created", "deleted", "modified" or "rescan"
+Event = Tuple[str, str, bool]
+
+# --- The live listing ---
+
+class LiveMap:
+    """
+    The file listing of a project and what the map needs per file (symbols,
+    language, manifest and import results), kept in memory and updated from
+    file events, so the context map can be re-rendered without listing the
+    tree or re-reading unchanged files.
+
+    New files are admitted with the same rules as the scan listing: in a git
+    repository, `.gitignore` files plus info/exclude and the global excludes;
+    otherwise `.gitignore`/`.vdocignore`, the walker defaults and no hidden
+    entries.
+    """
+
+    def __init__(self, root_path: Path, use_cache: bool = True, tree_depth: Optional[int] = None):
+        self.root_path = root_path
+        self.tree_depth = tree_depth
+        self.cache = ScanCache.load(root_path) if use_cache else None
+        self.rels: Set[str] = set()
+        self.repo_map: Dict[str, List[str]] = {}
+        self.file_langs: Dict[str, languages.FileLanguage] = {}
+        self.import_specs: Dict[str, Tuple[str, List[str]]] = {}
+        self.manifests: Dict[str, Tuple[List[str], List[str]]] = {}
+        self.changed: Set[str] = set()
+        # Guards the listing when events are applied while another thread renders
+        self.lock = threading.RLock()
+        self._scan: Optional[scanner.ProjectScan] = None
+        self._reset_rules()
+        self.rescan()
+
+    def _reset_rules(self) -> None:
+        located = gitindex.find_repository(self.root_path)
+        self._dir_ok: Dict[str, bool] = {}
+        self._stacks: Dict[str, List[IgnoreRules]] = {}
+        if located is None:
+            self._prefix = ""
+            self._ignore_files = IGNORE_FILE_NAMES
+            self._skip_hidden = True
+            self._stacks[""] = self._with_rules(walker.default_rules(), "")
+            return
+        git_root, git_dir = located
+        resolved = self.root_path.resolve()
+        rel_root = resolved.relative_to(git_root.resolve()).as_posix() if resolved != git_root.resolve() else ""
+        self._prefix = rel_root + "/" if rel_root else ""
+        self._ignore_files = (".gitignore",)
+        self._skip_hidden = False
+        stack = global_rules(gitindex.common_dir(git_dir))
+        # .gitignore files between the worktree root and the project root
+        parts = [p for p in rel_root.split("/") if p]
+        for depth in range(len(parts)):
+            rel = "/".join(parts[:depth])
+            rules = load_rules(git_root / rel / ".gitignore", rel)
+            if rules:
+                stack.append(rules)
+        self._stacks[""] = self._with_rules(stack, "")
+
+    def _with_rules(self, stack: List[IgnoreRules], rel_dir: str) -> List[IgnoreRules]:
+        """stack plus the ignore files of rel_dir (relative to the project root)."""
+        base = self._prefix + rel_dir if rel_dir else self._prefix.rstrip("/")
+        for name in self._ignore_files:
+            rules = load_rules(self.root_path / rel_dir / name, base)
+            if rules:
+                stack = stack + [rules]
+        return stack
+
+    def _stack(self, rel_dir: str) -> List[IgnoreRules]:
+        stack = self._stacks.get(rel_dir)
+        if stack is None:
+            parent = rel_dir[:max(rel_dir.rfind("/"), 0)]
+            stack = self._with_rules(self._stack(parent), rel_dir)
+            self._stacks[rel_dir] = stack
+        return stack
+
+    def dir_included(self, rel_dir: str) -> bool:
+        """Whether files below a directory (relative, "" for the root) can be listed."""
+        if not rel_dir:
+            return True
+        ok = self._dir_ok.get(rel_dir)
+        if ok is None:
+            slash = rel_dir.rfind("/")
+            parent, name = rel_dir[:max(slash, 0)], rel_dir[slash + 1:]
+            ok = (
+                self.dir_included(parent)
+                and name != ".git"
+                and rel_dir != CONFIG_DIR_NAME
+                and not (self._skip_hidden and name.startswith("."))
+                and not os.path.lexists(self.root_path / rel_dir / ".git")
+                and not is_ignored(self._stack(parent), self._prefix + rel_dir, True)
+            )
+            self._dir_ok[rel_dir] = ok
+        return ok
+
+    def file_included(self, rel: str) -> bool:
+        slash = rel.rfind("/")
+        parent, name = rel[:max(slash, 0)], rel[slash + 1:]
+        if self._skip_hidden and name.startswith("."):
+            return False
+        return self.dir_included(parent) and not is_ignored(self._stack(parent), self._prefix + rel, False)
+
+    def rescan(self) -> None:
+        """Full listing and per-file results (at start, and when ignore rules change)."""
+        with self.lock:
+            table = scanner.get_file_table(self.root_path, self.cache)
+            self.rels = set(table.rels())
+            self.repo_map = symbols.build_repository_map(self.root_path, table, self.cache)
+            self.file_langs = languages.file_languages(self.root_path, table, self.cache)
+            self.import_specs = imports.import_specs(self.root_path, table, self.cache)
+            self.manifests = scanner.read_manifests(self.root_path, manifests.find_manifests(table.rels()), self.cache)
+            self.changed.clear()
+            self._scan = None
+
+    def apply(self, events: List[Event]) -> None:
+        """
+        Applies a batch of file events to the listing. A queue overflow or an
+        edited ignore file may change membership anywhere, so the tree is
+        listed again instead (the rescan sees every other event's effect too).
+        """
+        with self.lock:
+            self._scan = None
+            if any(kind == "rescan" or rel.rsplit("/", 1)[-1] in IGNORE_FILE_NAMES for kind, rel, _ in events):
+                self._reset_rules()
+                self.rescan()
+                return
+            for event in events:
+                self._apply(*event)
+
+    def _apply(self, kind: str, rel: str, is_dir: bool) -> None:
+        if kind == "deleted":
+            if is_dir:
+                prefix = rel + "/"
+                gone = [r for r in self.rels if r.startswith(prefix)]
+                self.rels.difference_update(gone)
+                self.changed.update(gone)
+                self._dir_ok = {d: ok for d, ok in self._dir_ok.items() if d != rel and not d.startswith(prefix)}
+                self._stacks = {d: s for d, s in self._stacks.items() if d != rel and not d.startswith(prefix)}
+            elif rel in self.rels:
+                self.rels.discard(rel)
+                self.changed.add(rel)
+        elif not is_dir and (rel in self.rels or self.file_included(rel)) and os.path.isfile(self.root_path / rel):
+            self.rels.add(rel)
+            self.changed.add(rel)
+
+    def render(self) -> scanner.ProjectScan:
+        """
+        The current scan, reused until the next batch of events. Only files
+        changed since the last render are re-read; the stats and import graph
+        are then rebuilt from the per-file results in memory.
+        """
+        with self.lock:
+            if self._scan is not None:
+                return self._scan
+            if self.changed:
+                present = FileTable(self.root_path, sorted(rel for rel in self.changed if rel in self.rels))
+                parsed = symbols.build_repository_map(self.root_path, present, None, workers=1)
+                for rel in self.changed:
+                    if rel in parsed:
+                        self.repo_map[rel] = parsed[rel]
+                    else:
+                        self.repo_map.pop(rel, None)
+                    self.file_langs.pop(rel, None)
+                    self.import_specs.pop(rel, None)
+                    self.manifests.pop(rel, None)
+                self.file_langs.update(languages.file_languages(self.root_path, present, None, workers=1))
+                self.import_specs.update(imports.import_specs(self.root_path, present, None, workers=1))
+                self.changed.clear()
+            # Which manifests count depends on the whole listing (a lockfile
+            # yields to its manifest); only new or changed ones are read
+            listed = manifests.find_manifests(self.rels)
+            self.manifests.update(scanner.read_manifests(self.root_path, [rel for rel in listed if rel not in self.manifests]))
+            found = {rel: self.manifests[rel] for rel in listed if rel in self.manifests}
+            table = FileTable(self.root_path, sorted(self.rels))
+            stats = scanner.project_stats(languages.summarize(self.file_langs), found)
+            graph = imports.graph_from_specs(self.import_specs)
+            # A copy: the scan stays valid while later events update the live map
+            self._scan = scanner.ProjectScan(self.root_path, table, stats, dict(self.repo_map), graph)
+            return self._scan
+
+    def write(self, map_path: Path) -> int:
+        """Rewrites the context map atomically (readers never see a partial map)."""
+        tmp_path = map_path.with_suffix(".tmp")
+        written = output.emit(scanner.iter_context_map(self.render(), None, self.tree_depth), tmp_path)
+        os.replace(tmp_path, map_path)
+        return written
+
+    def close(self) -> None:
+        if self.cache is not None:
+            with self.lock:
+                self.cache.save()
+
+# --- Event sources ---
+
+class PollingWatcher:
+    """Portable fallback: diffs [mtime_ns, size] snapshots of the tree."""
+
+    name = "polling"
+
+    def __init__(self, live: LiveMap, interval: float = POLL_INTERVAL):
+        self.live = live
+        self.interval = interval
+        self.snapshot = self._snapshot()
+
+    def _snapshot(self) -> Dict[str, Tuple[int, int]]:
+        root = self.live.root_path
+        found = {}
+        for dirpath, dirnames, filenames in os.walk(root):
+            rel_dir = Path(dirpath).relative_to(root).as_posix()
+            rel_dir = "" if rel_dir == "." else rel_dir
+            prefix = rel_dir + "/" if rel_dir else ""
+            dirnames[:] = [d for d in dirnames if self.live.dir_included(prefix + d)]
+            for name in filenames:
+                try:
+                    st = os.stat(os.path.join(dirpath, name))
+                except OSError:
+                    continue
+                found[prefix + name] = (st.st_mtime_ns, st.st_size)
+        return found
+
+    def read(self, timeout: float) -> List[Event]:
+        time.sleep(min(timeout, self.interval))
+        current = self._snapshot()
+        events: List[Event] = [("deleted", rel, False) for rel in self.snapshot.keys() - current.keys()]
+        for rel, stamp in current.items():
+            old = self.snapshot.get(rel)
+            if old is None:
+                events.append(("created", rel, False))
+            elif old != stamp:
+                events.append(("modified", rel, False))
+        self.snapshot = current
+        return events
+
+    def close(self) -> None:
+        pass
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+_WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_ONLYDIR
+_EVENT_HEADER = struct.Struct("iIII")
+
+class InotifyWatcher:
+    """
+    Linux inotify through libc (no dependency): one watch per listed
+    directory. Renames arrive as a delete plus a create; directories that
+    appear are watched and their existing files reported as created.
+    """
+
+    name = "inotify"
+
+    def __init__(self, live: LiveMap):
+        if not sys.platform.startswith("linux"):
+            raise OSError("inotify is only available on Linux")
+        self.live = live
+        self.libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = self.libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.dirs: Dict[int, str] = {}
+        try:
+            self._watch_tree("")
+        except OSError:
+            os.close(self.fd)
+            raise
+
+    def _watch_tree(self, rel_dir: str) -> List[Event]:
+        """Watches rel_dir and its included subdirectories; returns the files found in them."""
+        found: List[Event] = []
+        stack = [rel_dir]
+        while stack:
+            current = stack.pop()
+            path = str(self.live.root_path / current) if current else str(self.live.root_path)
+            wd = self.libc.inotify_add_watch(self.fd, os.fsencode(path), _WATCH_MASK)
+            if wd < 0:
+                errno = ctypes.get_errno()
+                if errno == 28:  # ENOSPC: fs.inotify.max_user_watches reached
+                    raise OSError(errno, "inotify watch limit reached")
+                continue
+            self.dirs[wd] = current
+            prefix = current + "/" if current else ""
+            try:
+                with os.scandir(path) as it:
+                    for entry in it:
+                        rel = prefix + entry.name
+                        if entry.is_dir(follow_symlinks=False):
+                            if self.live.dir_included(rel):
+                                stack.append(rel)
+                        else:
+                            found.append(("created", rel, False))
+            except OSError:
+                continue
+        return found
+
+    def _unwatch(self, rel_dir: str) -> None:
+        """Drops the watches of a directory that moved away (its events would carry stale paths)."""
+        prefix = rel_dir + "/"
+        for wd, rel in list(self.dirs.items()):
+            if rel == rel_dir or rel.startswith(prefix):
+                self.libc.inotify_rm_watch(self.fd, wd)
+                del self.dirs[wd]
+
+    def read(self, timeout: float) -> List[Event]:
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        events: List[Event] = []
+        pos = 0
+        while pos + _EVENT_HEADER.size <= len(data):
+            wd, mask, _cookie, length = _EVENT_HEADER.unpack_from(data, pos)
+            pos += _EVENT_HEADER.size
+            name = os.fsdecode(data[pos:pos + length].rstrip(b"\0"))
+            pos += length
+            if mask & IN_Q_OVERFLOW:
+                events.append(("rescan", "", True))
+                continue
+            if mask & IN_IGNORED:
+                self.dirs.pop(wd, None)
+                continue
+            parent = self.dirs.get(wd)
+            if parent is None or not name:
+                continue
+            rel = f"{parent}/{name}" if parent else name
+            is_dir = bool(mask & IN_ISDIR)
+            if mask & (IN_DELETE | IN_MOVED_FROM):
+                events.append(("deleted", rel, is_dir))
+                if is_dir:
+                    self._unwatch(rel)
+            elif is_dir:
+                if mask & (IN_CREATE | IN_MOVED_TO) and self.live.dir_included(rel):
+                    try:
+                        events.extend(self._watch_tree(rel))
+                    except OSError:
+                        events.append(("rescan", "", True))
+            elif mask & (IN_CREATE | IN_MOVED_TO):
+                events.append(("created", rel, False))
+            else:
+                events.append(("modified", rel, False))
+        return events
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+def open_watcher(live: LiveMap, poll: bool = False):
+    """An inotify watcher where available, else (or with poll) a polling one."""
+    if not poll:
+        try:
+            return InotifyWatcher(live)
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(live)
+
+# --- The loop ---
+
+def watch(
+    live: LiveMap,
+    map_path: Path,
+    poll: bool = False,
+    debounce: float = DEBOUNCE_SECONDS,
+    on_write: Optional[Callable[[int, float], None]] = None,
+    stop: Optional[threading.Event] = None,
+) -> None:
+    """
+    Rewrites map_path whenever files change, until `stop` is set (or
+    KeyboardInterrupt). Events are collected until `debounce` seconds pass
+    without one (at most MAX_DELAY_SECONDS after the first), then applied
+    as one batch. on_write receives the number of events and the rewrite
+    time in seconds.
+    """
+    watcher = open_watcher(live, poll)
+    pending: List[Event] = []
+    first = last = 0.0
+    try:
+        while stop is None or not stop.is_set():
+            timeout = debounce if pending else 0.5
+            events = watcher.read(timeout)
+            now = time.monotonic()
+            if events:
+                if not pending:
+                    first = now
+                pending.extend(events)
+                last = now
+            if pending and (now - last >= debounce or now - first >= MAX_DELAY_SECONDS):
+                started = time.perf_counter()
+                live.apply(pending)
+                live.write(map_path)
+                if on_write is not None:
+                    on_write(len(pending), time.perf_counter() - started)
+                pending = []
+    finally:
+        watcher.close()
+        live.close()
@@ -0,0 +1,311 @@
+import json
+import os
+import re
+import shutil
+import xml.etree.ElementTree as ElementTree
+from fnmatch import fnmatchcase
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from vdoc import imports, manifests, output, scanner, symbols, tree
+from vdoc.cache import CACHE_VERSION, CONFIG_DIR_NAME, ScanCache
+from vdoc.filetable import FileTable
+
+# Per-package maps live at .vdoc/packages/<package dir>/context_map.md,
+# next to the index linking them (.vdoc/packages/index.md)
+PACKAGES_DIR_NAME = "packages"
+INDEX_FILE_NAME = "index.md"
+
+# Files marking a directory as a package for workspace detection
+PACKAGE_MARKERS = ("package.json", "pyproject.toml", "setup.py")
+
+def package_map_path(root_path: Path, package: str) -> Path:
+    return root_path / CONFIG_DIR_NAME / PACKAGES_DIR_NAME / package / "context_map.md"
+
+# --- Detection ---
+
+def _glob_match(pattern: str, rel: str) -> bool:
+    """Workspace glob match on whole path segments; `**` spans any number of them."""
+    def match(pats: List[str], parts: List[str]) -> bool:
+        if not pats:
+            return not parts
+        if pats[0] == "**":
+            return any(match(pats[1:], parts[i:]) for i in range(len(parts) + 1))
+        return bool(parts) and fnmatchcase(parts[0], pats[0]) and match(pats[1:], parts[1:])
+    return match(_clean(pattern).split("/"), rel.split("/"))
+
+def _clean(path: str) -> str:
+    path = path.strip().strip("'\"").replace("\\", "/")
+    while path.startswith("./"):
+        path = path[2:]
+    return path.rstrip("/")
+
+def _expand_globs(patterns: Iterable[str], candidates: Set[str]) -> Set[str]:
+    """Candidate directories matched by the patterns, minus `!` exclusions."""
+    included, excluded = [], []
+    for pattern in patterns:
+        if not isinstance(pattern, str):
+            continue
+        (excluded if pattern.startswith("!") else included).append(pattern.lstrip("!"))
+    return {
+        d for d in candidates
+        if any(_glob_match(p, d) for p in included) and not any(_glob_match(p, d) for p in excluded)
+    }
+
+def _npm_workspaces(root_path: Path, dirs_with: Dict[str, Set[str]]) -> Set[str]:
+    patterns: List[str] = []
+    try:
+        with open(root_path / "package.json", encoding="utf-8") as f:
+            declared = json.load(f).get("workspaces") or []
+        if isinstance(declared, dict):
+            declared = declared.get("packages") or []
+        patterns.extend(declared)
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        in_packages = False
+        for line in (root_path / "pnpm-workspace.yaml").read_text(errors="replace").splitlines():
+            if not line.startswith((" ", "-")):
+                in_packages = line.split(":", 1)[0].strip() == "packages"
+            elif in_packages and line.strip().startswith("-"):
+                patterns.append(line.strip()[1:].split("#", 1)[0])
+    except OSError:
+        pass
+    return _expand_globs(patterns, dirs_with.get("package.json", set()))
+
+_GO_USE = re.compile(r"^\s*(?:use\s+)?(\.{1,2}/?[^\s()]*)\s*$")
+
+def _go_workspaces(root_path: Path) -> Set[str]:
+    try:
+        text = (root_path / "go.work").read_text(errors="replace")
+    except OSError:
+        return set()
+    found = set()
+    in_block = False
+    for line in text.splitlines():
+        line = line.split("//", 1)[0]
+        stripped = line.strip()
+        if stripped.startswith("use") and stripped.endswith("("):
+            in_block = True
+            continue
+        if in_block and stripped == ")":
+            in_block = False
+            continue
+        if in_block or stripped.startswith("use "):
+            m = _GO_USE.match(stripped)
+            if m:
+                found.add(_clean(m.group(1)))
+    found.discard("")
+    found.discard(".")
+    return found
+
+def _maven_modules(root_path: Path, base: str = "", depth: int = 0) -> Set[str]:
+    """Modules declared by pom.xml files, following nested aggregators."""
+    if depth > 8:
+        return set()
+    try:
+        pom = ElementTree.parse(root_path / base / "pom.xml").getroot()
+    except (OSError, ElementTree.ParseError):
+        return set()
+    found = set()
+    for el in pom.iter():
+        if el.tag.rsplit("}", 1)[-1] != "module" or not el.text:
+            continue
+        module = _clean(os.path.normpath(os.path.join(base, _clean(el.text))))
+        if module.startswith("..") or module in ("", "."):
+            continue
+        found.add(module)
+        found |= _maven_modules(root_path, module, depth + 1)
+    return found
+
+def detect_packages(root_path: Path, table: FileTable) -> Dict[str, str]:
+    """
+    Returns {package dir: workspace kind} for the packages of a monorepo:
+    npm/pnpm workspaces, Go workspace modules (go.work), Maven modules and
+    Python sub-packages (directories below the root with a pyproject.toml or
+    setup.py). Only directories present in the listing are reported.
+    """
+    dirs_with: Dict[str, Set[str]] = {}
+    listed_dirs: Set[str] = set()
+    for rel in table.rels():
+        slash = rel.rfind("/")
+        if slash < 0:
+            continue
+        d = rel[:slash]
+        name = rel[slash + 1:]
+        if name in PACKAGE_MARKERS and not manifests.VENDORED_DIRS.intersection(d.split("/")):
+            dirs_with.setdefault(name, set()).add(d)
+        while d and d not in listed_dirs:
+            listed_dirs.add(d)
+            d = d[:max(d.rfind("/"), 0)]
+
+    packages: Dict[str, str] = {}
+    sources = [
+        ("npm", _npm_workspaces(root_path, dirs_with)),
+        ("go", _go_workspaces(root_path) & listed_dirs),
+        ("maven", _maven_modules(root_path) & listed_dirs),
+        ("python", dirs_with.get("pyproject.toml", set()) | dirs_with.get("setup.py", set())),
+    ]
+    for kind, dirs in sources:
+        for d in sorted(dirs):
+            packages.setdefault(d, kind)
+    return dict(sorted(packages.items()))
+
+def _owner(rel: str, packages: Set[str]) -> Optional[str]:
+    """The deepest package containing a file, if any."""
+    slash = rel.rfind("/")
+    while slash > 0:
+        d = rel[:slash]
+        if d in packages:
+            return d
+        slash = d.rfind("/")
+    return None
+
+# --- Per-package maps ---
+
+def _build_package(job: Tuple) -> Tuple[str, Dict, Dict]:
+    """
+    Worker: scans one package from its share of the repo listing and cache
+    entries (both keyed relative to the repo root), writes its context map
+    and returns (package, summary, updated cache entries).
+    """
+    root, package, rels, entries, token_budget, tree_depth = job
+    root_path = Path(root)
+    cache = ScanCache(root_path, {"version": CACHE_VERSION, "root": root, "listing": None, "entries": entries})
+    table = FileTable(root_path, rels)
+    stats = scanner.analyze_project_root(root_path, table, cache)
+    repo_map = symbols.build_repository_map(root_path, table, cache, workers=1)
+    graph = imports.build_import_graph(root_path, table, cache, workers=1)
+
+    # Render relative to the package directory
+    skip = len(package) + 1
+    stats["config_files"] = [rel[skip:] for rel in stats["config_files"]]
+    stats["entry_points"] = [rel[skip:] for rel in stats["entry_points"] if rel.startswith(package + "/")]
+    scan = scanner.ProjectScan(
+        root_path / package,
+        FileTable(root_path / package, [rel[skip:] for rel in rels]),
+        stats,
+        {rel[skip:]: defs for rel, defs in repo_map.items()},
+        graph.relative_to(package + "/"),
+    )
+    out_path = package_map_path(root_path, package)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    output.emit(scanner.iter_context_map(scan, token_budget, tree_depth), out_path)
+
+    summary = {
+        "files": len(rels),
+        "languages": [lang for lang, _ in stats["languages"].most_common(3)],
+        "frameworks": sorted(stats["frameworks"]),
+    }
+    return package, summary, cache.data["entries"]
+
+def build_workspace(
+    root_path: Path,
+    use_cache: bool = True,
+    token_budget: Optional[int] = None,
+    tree_depth: Optional[int] = None,
+    workers: Optional[int] = None,
+) -> Optional[List[str]]:
+    """
+    Workspace mode: lists the repo once, writes one context map per detected
+    package (built concurrently on a process pool) plus a top-level index
+    linking them, and returns the index lines. Returns None (and writes
+    nothing) if no packages are found.
+
+    Each worker receives only its package's files and cache entries, and
+    hands back the updated entries; the parent merges them and saves the
+    scan cache once, so no file is scanned twice and workers never share
+    the cache file.
+    """
+    cache = ScanCache.load(root_path) if use_cache else None
+    table = scanner.get_file_table(root_path, cache)
+    packages = detect_packages(root_path, table)
+    if not packages:
+        if cache is not None:
+            cache.save()
+        return None
+
+    names = set(packages)
+    owned: Dict[str, List[str]] = {p: [] for p in packages}
+    shared: List[str] = []
+    for rel in table.rels():
+        package = _owner(rel, names)
+        (owned[package] if package is not None else shared).append(rel)
+
+    # Hand each worker its slice of the cache
+    old_entries = cache.data["entries"] if cache is not None else {}
+    slices: Dict[str, Dict[str, Dict]] = {p: {} for p in packages}
+    kept: Dict[str, Dict] = {}
+    shared_set = set(shared)
+    for ns, entries in old_entries.items():
+        for rel, entry in entries.items():
+            package = _owner(rel, names)
+            if package is not None:
+                slices[package].setdefault(ns, {})[rel] = entry
+            elif rel in shared_set:
+                kept.setdefault(ns, {})[rel] = entry
+
+    packages_dir = root_path / CONFIG_DIR_NAME / PACKAGES_DIR_NAME
+    if packages_dir.exists():
+        shutil.rmtree(packages_dir)
+
+    jobs = [(str(root_path), p, owned[p], slices[p], token_budget, tree_depth) for p in packages if owned[p]]
+    if workers is None:
+        workers = min(os.cpu_count() or 1, len(jobs))
+    if workers > 1 and len(jobs) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_build_package, jobs))
+    else:
+        results = [_build_package(job) for job in jobs]
+
+    summaries = {}
+    for package, summary, entries in results:
+        summaries[package] = summary
+        for ns, ns_entries in entries.items():
+            kept.setdefault(ns, {}).update(ns_entries)
+    if cache is not None:
+        if kept != old_entries:
+            cache.data["entries"] = kept
+            cache.dirty = True
+        cache.save()
+
+    index = _index_lines(root_path, packages, summaries, len(table), shared)
+    packages_dir.mkdir(parents=True, exist_ok=True)
+    output.emit(index, packages_dir / INDEX_FILE_NAME)
+    return index
+
+def _index_lines(
+    root_path: Path,
+    packages: Dict[str, str],
+    summaries: Dict[str, Dict],
+    total_files: int,
+    shared: List[str],
+) -> List[str]:
+    kinds = sorted(set(packages.values()))
+    lines = [
+        "# Workspace Index",
+        "",
+        "## Workspace Overview",
+        f"- **Workspaces:** {', '.join(kinds)}",
+        f"- **Packages:** {len(summaries)}",
+        f"- **Total Files:** {total_files}",
+        "",
+        "## Packages",
+    ]
+    for package, summary in summaries.items():
+        noun = "file" if summary["files"] == 1 else "files"
+        lines.append(f"### {package}/ ({packages[package]})")
+        details = f"- **Files:** {summary['files']} {noun}"
+        if summary["languages"]:
+            details += f" ({', '.join(summary['languages'])})"
+        lines.append(details)
+        if summary["frameworks"]:
+            lines.append(f"- **Frameworks:** {', '.join(summary['frameworks'])}")
+        lines.append(f"- **Map:** {package_map_path(root_path, package).relative_to(root_path).as_posix()}")
+        lines.append("")
+    if shared:
+        node = tree.build_tree(shared, scanner.language_of)
+        lines.append(f"### Shared (outside packages, {tree.summarize(node)})")
+        lines.extend(tree.render_tree(node, max_depth=1))
+        lines.append("")
+    return lines
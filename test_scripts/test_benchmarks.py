@@ -0,0 +1,46 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+BENCHMARKS = Path(__file__).resolve().parent.parent / "benchmarks"
+sys.path.insert(0, str(BENCHMARKS))
+import synthrepo  # noqa: E402
+import suite  # noqa: E402
+
+def test_synthrepo_is_deterministic(tmp_path):
+    first = synthrepo.generate(tmp_path / "a", files=40, shape="deep", manifests=3)
+    second = synthrepo.generate(tmp_path / "b", files=40, shape="deep", manifests=3)
+    files = sorted(p.relative_to(first).as_posix() for p in first.rglob("*") if p.is_file())
+    assert files == sorted(p.relative_to(second).as_posix() for p in second.rglob("*") if p.is_file())
+    assert all((first / rel).read_bytes() == (second / rel).read_bytes() for rel in files)
+    assert sum(name.rsplit("/", 1)[-1] in ("package.json", "pyproject.toml", "go.mod") for name in files) == 3
+    # Regenerating with the same parameters reuses the tree
+    marker = first / synthrepo.MARKER
+    stamp = marker.stat().st_mtime_ns
+    synthrepo.generate(first, files=40, shape="deep", manifests=3)
+    assert marker.stat().st_mtime_ns == stamp
+
+def test_compare_flags_regressions():
+    baseline = {"a/list_files": {"wall_ms": 100.0}, "a/plan": {"wall_ms": 1.0}}
+    current = {"a/list_files": {"wall_ms": 150.0}, "a/plan": {"wall_ms": 3.0}, "b/plan": {"wall_ms": 1.0}}
+    rows = {key: regressed for key, *_, regressed in suite.compare(current, baseline, 0.25)}
+    # plan tripled but stays under the noise floor; b/plan has no baseline
+    assert rows == {"a/list_files": True, "a/plan": False}
+    assert suite.parse_size("1k") == 1000 and suite.parse_size("1.5m") == 1_500_000 and suite.parse_size("250") == 250
+
+def test_suite_runs(tmp_path):
+    baseline = tmp_path / "baseline.json"
+    command = [
+        sys.executable, str(BENCHMARKS / "suite.py"), "--sizes", "60", "--kinds", "plain,git",
+        "--repeat", "1", "--workdir", str(tmp_path / "repos"), "--json",
+    ]
+    result = subprocess.run(command + ["--save-baseline", str(baseline)], capture_output=True, text=True, timeout=300)
+    assert result.returncode == 0, result.stderr
+    results = json.loads(result.stdout)["results"]
+    assert {"60-balanced-plain/list_files", "60-balanced-git/update", "60-balanced-git/plan"} <= set(results)
+    assert json.loads(baseline.read_text())["results"].keys() == results.keys()
+
+    result = subprocess.run(command + ["--baseline", str(baseline), "--tolerance", "1000"], capture_output=True, text=True, timeout=300)
+    assert result.returncode == 0, result.stderr
+    assert len(json.loads(result.stdout)["comparison"]) == len(results)
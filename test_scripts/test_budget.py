@@ -0,0 +1,64 @@
+from pathlib import Path
+from typer.testing import CliRunner
+from vdoc import budget, scanner
+from vdoc.main import app
+
+runner = CliRunner()
+
+def _group(name, n, weight):
+    return budget.Group(
+        name=name,
+        header=f"### {name} ({n} files)",
+        items=[f"- {name}file_{i}.py" for i in range(n)],
+        weight=weight,
+    )
+
+def test_fit_groups_prefers_important_groups():
+    groups = [_group("src/", 200, 5.0), _group("tests/", 200, 0.5)]
+    kept, collapsed = budget.fit_groups(groups, 300)
+    assert not collapsed
+    src, tests = kept
+    assert src.kept_items > tests.kept_items > 0
+
+def test_fit_groups_collapses_least_valuable_first():
+    groups = [_group(f"d{i}/", 5, float(i)) for i in range(1, 40)]
+    kept, collapsed = budget.fit_groups(groups, 120)
+    assert collapsed and kept
+    assert max(g.weight for g in collapsed) <= min(g.weight for g in kept)
+
+def test_fit_symbols_keeps_the_most_important_lines():
+    lines = [f"- src/mod_{i:02d}.py: def handler_{i}" for i in range(30)]
+    scores = [0.0] * 29 + [10.0]
+    assert budget.fit_ranked(lines, scores, 20) == [lines[0], lines[29]]
+
+    group = _group("src/", 30, 1.0)
+    group.symbols, group.total_symbols = lines, len(lines)
+    group.fit_symbols = lambda tokens: budget.fit_ranked(lines, scores, tokens)
+    (kept,), _ = budget.fit_groups([group], 80)
+    assert lines[29] in kept.symbols[:kept.kept_symbols]
+    assert kept.kept_symbols < len(lines) == kept.total_symbols
+
+def _project(root: Path):
+    for d in ["api", "web", "tests", "docs"]:
+        (root / d).mkdir()
+        for i in range(60):
+            (root / d / f"module_{i}.py").write_text(f"class Thing{i}:\n    pass\n")
+
+def test_map_fits_budget_and_uncapped_when_small(tmp_path):
+    _project(tmp_path)
+    scan = scanner.scan_project(tmp_path, use_cache=False)
+    content = scanner.render_context_map(scan, 800)
+    assert budget.estimate_lines(content.split("\n")) <= 800
+
+    # A generous budget lifts the fixed 50-file cap
+    content = scanner.render_context_map(scan, 100_000)
+    assert "more)" not in content
+    assert "- module_59.py" in content
+
+def test_update_token_budget(tmp_path, monkeypatch):
+    _project(tmp_path)
+    monkeypatch.chdir(tmp_path)
+    result = runner.invoke(app, ["update", "--save", "--token-budget", "1000"])
+    assert result.exit_code == 0
+    prompt = (tmp_path / "product_documentation" / "UPDATE_PROMPT.md").read_text()
+    assert budget.estimate_lines(prompt.split("\n")) <= 1000
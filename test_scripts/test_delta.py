@@ -0,0 +1,87 @@
+import subprocess
+from pathlib import Path
+import pytest
+from typer.testing import CliRunner
+from vdoc import delta
+from vdoc.main import app
+from vdoc.state import load_state
+
+runner = CliRunner()
+
+def _git(root: Path, *args):
+    return subprocess.check_output(
+        ["git", "-c", "user.email=vdoc@test", "-c", "user.name=vdoc", *args], cwd=root, text=True
+    ).strip()
+
+def _make_repo(root: Path) -> str:
+    _git(root, "init", "-q", ".")
+    (root / "src").mkdir()
+    (root / "src" / "keep.py").write_text("def keep():\n    pass\n")
+    (root / "src" / "old_name.py").write_text("".join(f"line_{i} = {i}\n" for i in range(20)))
+    (root / "src" / "gone.py").write_text("a = 1\nb = 2\n")
+    (root / "logo.png").write_bytes(b"\x89PNG\x00\x01")
+    _git(root, "add", ".")
+    _git(root, "commit", "-qm", "init")
+    return _git(root, "rev-parse", "HEAD")
+
+def _change(root: Path):
+    (root / "src" / "keep.py").write_text("def keep():\n    pass\n\ndef extra():\n    pass\n")
+    _git(root, "mv", "src/old_name.py", "src/new_name.py")
+    _git(root, "rm", "-q", "src/gone.py")
+    _git(root, "commit", "-qm", "change")
+    (root / "src" / "fresh.py").write_text("class Fresh:\n    pass\n")
+    (root / ".vdoc").mkdir(exist_ok=True)
+    (root / ".vdoc" / "context_map.md").write_text("# map")
+
+def test_compute_delta(tmp_path):
+    base = _make_repo(tmp_path)
+    _change(tmp_path)
+    d = delta.compute_delta(tmp_path, base)
+    assert d.commit == base
+    got = {c.rel: (c.status, c.old_rel, c.added, c.removed) for c in d.changes}
+    assert got == {
+        "src/fresh.py": ("A", None, 2, 0),
+        "src/gone.py": ("D", None, 0, 2),
+        "src/keep.py": ("M", None, 3, 0),
+        "src/new_name.py": ("R", "src/old_name.py", 0, 0),
+    }
+
+    text = "\n".join(delta.iter_delta(d))
+    assert text.startswith(f"## Changes Since {base[:12]}\n")
+    assert "- **Files Changed:** 4 (1 added, 1 deleted, 1 renamed, 1 modified), +5 -2 lines" in text
+    assert "### Added\n- src/fresh.py (+2): class Fresh" in text
+    assert "- src/old_name.py -> src/new_name.py (+0 -0)" in text
+    assert "- src/keep.py (+3 -0): def keep, def extra" in text
+
+def test_delta_in_subdirectory_and_unknown_ref(tmp_path):
+    base = _make_repo(tmp_path)
+    _change(tmp_path)
+    d = delta.compute_delta(tmp_path / "src", "HEAD~1")
+    assert d.commit == base
+    assert sorted(c.rel for c in d.changes) == ["fresh.py", "gone.py", "keep.py", "new_name.py"]
+    with pytest.raises(delta.DeltaError):
+        delta.compute_delta(tmp_path, "no-such-ref")
+
+def test_update_delta_uses_recorded_commit(tmp_path, monkeypatch):
+    _make_repo(tmp_path)
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / ".vdoc").mkdir()
+    # A printed prompt records nothing; a saved one records HEAD as the next delta's base
+    assert runner.invoke(app, ["update"]).exit_code == 0
+    assert load_state().last_commit is None
+    assert runner.invoke(app, ["update", "--save"]).exit_code == 0
+    assert load_state().last_commit == _git(tmp_path, "rev-parse", "HEAD")
+
+    _change(tmp_path)
+    result = runner.invoke(app, ["update", "--delta", "--save"])
+    assert result.exit_code == 0
+    prompt = (tmp_path / "product_documentation" / "UPDATE_PROMPT.md").read_text()
+    assert "## Changes Since" in prompt
+    assert "## Current Context Map" not in prompt
+    assert "- src/fresh.py (+2): class Fresh" in prompt
+    assert "logo.png" not in prompt
+    assert load_state().last_commit == _git(tmp_path, "rev-parse", "HEAD")
+
+    result = runner.invoke(app, ["update", "--since", "no-such-ref"])
+    assert result.exit_code == 1
+    assert "unknown git ref" in result.stdout
@@ -0,0 +1,72 @@
+import subprocess
+from pathlib import Path
+from typer.testing import CliRunner
+from vdoc import docindex
+from vdoc.main import app
+
+runner = CliRunner()
+
+def _project(root: Path):
+    (root / ".vdoc").mkdir()
+    (root / "src").mkdir()
+    (root / "src" / "api.py").write_text("def get():\n    pass\n")
+    (root / "src" / "db.py").write_text("def connect():\n    pass\n")
+    docs = root / "product_documentation"
+    docs.mkdir()
+    (docs / "API.md").write_text("# API\nSee `src/api.py`.\n")
+    (docs / "DB.md").write_text("# DB\nImplemented in [db](../src/db.py).\n")
+    (docs / "UPDATE_PROMPT.md").write_text("mentions src/api.py")
+
+def test_blob_hash_matches_git(tmp_path):
+    (tmp_path / "f.txt").write_bytes(b"hello\n")
+    expected = subprocess.check_output(["git", "hash-object", str(tmp_path / "f.txt")], text=True).strip()
+    assert docindex.blob_hash(b"hello\n") == expected
+
+def test_refresh_records_then_flags_changed_sources(tmp_path):
+    _project(tmp_path)
+    stale, total = docindex.refresh(tmp_path)
+    assert (stale, total) == ([], 2)
+    index = docindex.load_index(tmp_path)
+    assert index.docs["product_documentation/API.md"].sources == {
+        "src/api.py": docindex.blob_hash(b"def get():\n    pass\n")
+    }
+    # Document-relative links resolve too
+    assert list(index.docs["product_documentation/DB.md"].sources) == ["src/db.py"]
+
+    (tmp_path / "src" / "api.py").write_text("def get():\n    return 1\n")
+    (tmp_path / "src" / "db.py").unlink()
+    stale, _ = docindex.refresh(tmp_path)
+    assert [(d.doc, d.changed) for d in stale] == [
+        ("product_documentation/API.md", [("src/api.py", "modified")]),
+        ("product_documentation/DB.md", [("src/db.py", "deleted")]),
+    ]
+
+    # Rewriting a doc re-baselines it against the current sources
+    (tmp_path / "product_documentation" / "API.md").write_text("# API\nSee `src/api.py` (returns 1).\n")
+    stale, _ = docindex.refresh(tmp_path)
+    assert [d.doc for d in stale] == ["product_documentation/DB.md"]
+
+def test_unchanged_files_are_not_rehashed(tmp_path, monkeypatch):
+    _project(tmp_path)
+    docindex.refresh(tmp_path)
+    calls = []
+    original = docindex.blob_hash
+    monkeypatch.setattr(docindex, "blob_hash", lambda data: calls.append(data) or original(data))
+    assert docindex.refresh(tmp_path) == ([], 2)
+    assert calls == []
+
+def test_update_stale_lists_only_stale_docs(tmp_path, monkeypatch):
+    _project(tmp_path)
+    monkeypatch.chdir(tmp_path)
+    assert runner.invoke(app, ["update", "--save"]).exit_code == 0
+    (tmp_path / "src" / "db.py").write_text("def connect(url):\n    pass\n")
+
+    result = runner.invoke(app, ["update", "--stale", "--save"])
+    assert result.exit_code == 0
+    prompt = (tmp_path / "product_documentation" / "UPDATE_PROMPT.md").read_text()
+    assert "- **Stale:** 1 of 2 documents" in prompt
+    assert "### product_documentation/DB.md\n- src/db.py (modified)" in prompt
+    assert "API.md" not in prompt
+    assert "## Current Context Map" not in prompt
+
+    assert runner.invoke(app, ["update", "--stale", "--workspace"]).exit_code == 1
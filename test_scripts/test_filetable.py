@@ -0,0 +1,32 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+from vdoc.filetable import FileTable, as_table
+
+BENCHMARK = Path(__file__).resolve().parent.parent / "benchmarks" / "filetable.py"
+
+RELS = ["LICENSE", "README.md", ".gitignore", "src/app.py", "src/pkg/a.tar.gz", "src/pkg/b.", "web/App.tsx"]
+
+def test_table_round_trips_paths(tmp_path):
+    table = FileTable(tmp_path, RELS)
+    assert len(table) == len(RELS)
+    assert list(table.rels()) == RELS
+    assert table.paths() == [tmp_path / rel for rel in RELS]
+    assert [table.suffix(i) for i in range(len(table))] == [Path(rel).suffix for rel in RELS]
+    assert table.name(3) == "app.py" and table.rel(4) == "src/pkg/a.tar.gz"
+    # Directory prefixes are stored once
+    assert table.dirs == ["", "src/", "src/pkg/", "web/"]
+    assert table.suffix_counts() == {"": 3, ".md": 1, ".py": 1, ".gz": 1, ".tsx": 1}
+
+def test_as_table_accepts_paths(tmp_path):
+    table = as_table(tmp_path, [tmp_path / rel for rel in RELS])
+    assert list(table.rels()) == RELS
+    assert as_table(tmp_path, table) is table
+
+def test_benchmark_runs():
+    result = subprocess.run(
+        [sys.executable, str(BENCHMARK), "--files", "2000", "--json"], capture_output=True, text=True
+    )
+    assert result.returncode == 0, result.stderr
+    assert json.loads(result.stdout)["files"] == 2000
@@ -0,0 +1,75 @@
+import os
+from pathlib import Path
+from vdoc import cache, fingerprint, scanner, timing
+from vdoc.fingerprint import Fingerprints
+
+def _write(root: Path, rel: str, text: str) -> None:
+    path = root / rel
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+
+def _bump_mtime(path: Path) -> None:
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 5_000_000_000))
+
+def test_refresh_classifies_changes_and_persists(tmp_path):
+    (tmp_path / ".vdoc").mkdir()
+    for rel in ["a.py", "b.py", "c.py", "d.py"]:
+        _write(tmp_path, rel, f"# {rel}\n")
+    first = Fingerprints.load(tmp_path).refresh(["a.py", "b.py", "c.py", "d.py"])
+    assert first.added == ["a.py", "b.py", "c.py", "d.py"] and first.changed() == first.added
+    first.save()
+
+    _write(tmp_path, "a.py", "# edited\n")
+    _bump_mtime(tmp_path / "a.py")
+    _bump_mtime(tmp_path / "b.py")
+    (tmp_path / "c.py").unlink()
+    _write(tmp_path, "e.py", "new\n")
+    recorder = timing.enable()
+    try:
+        second = Fingerprints.load(tmp_path).refresh(["a.py", "b.py", "d.py", "e.py"], workers=1)
+    finally:
+        timing.disable()
+    assert second.modified == ["a.py"]
+    assert second.touched == ["b.py"]
+    assert second.deleted == ["c.py"]
+    assert second.added == ["e.py"]
+    assert second.changed() == ["e.py", "a.py"]
+    # d.py is unchanged and not re-hashed
+    assert recorder.report()["counts"]["files_hashed"] == 3
+    assert second.records["d.py"] == first.records["d.py"]
+
+def test_large_files_are_memory_mapped(tmp_path, monkeypatch):
+    monkeypatch.setattr(fingerprint, "MMAP_THRESHOLD", 16)
+    data = b"x" * 100
+    (tmp_path / "big.bin").write_bytes(data)
+    (tmp_path / "empty.bin").write_bytes(b"")
+    prints = Fingerprints(tmp_path).refresh(["big.bin", "empty.bin", "missing.bin"])
+    assert prints.records["big.bin"][3] == fingerprint.digest(data)
+    assert prints.records["empty.bin"][3] == fingerprint.digest(b"")
+    assert "missing.bin" not in prints.records
+
+def test_parallel_matches_serial(tmp_path):
+    rels = [f"pkg/f{i}.py" for i in range(cache.THREAD_POOL_THRESHOLD * 3)]
+    for i, rel in enumerate(rels):
+        _write(tmp_path, rel, f"value = {i}\n")
+    parallel = Fingerprints(tmp_path).refresh(rels, workers=8).records
+    assert parallel == Fingerprints(tmp_path).refresh(rels, workers=1).records
+
+def test_scan_reuses_results_for_touched_files(tmp_path):
+    (tmp_path / ".vdoc").mkdir()
+    _write(tmp_path, "src/app.py", "def main():\n    pass\n")
+    _write(tmp_path, "src/util.py", "def helper():\n    pass\n")
+    scanner.scan_project(tmp_path)
+    assert Fingerprints.get_path(tmp_path).exists()
+
+    _bump_mtime(tmp_path / "src/app.py")
+    _write(tmp_path, "src/util.py", "def changed():\n    pass\n")
+    recorder = timing.enable()
+    try:
+        scan = scanner.scan_project(tmp_path)
+    finally:
+        timing.disable()
+    # Only the edited file is read again
+    assert recorder.report()["counts"]["files_parsed"] == 1
+    assert scan.repo_map == {"src/app.py": ["def main"], "src/util.py": ["def changed"]}
@@ -0,0 +1,66 @@
+import subprocess
+from pathlib import Path
+import pytest
+import vdoc.scanner as scanner
+from vdoc import gitindex
+from vdoc.ignore import IgnoreRules, is_ignored
+
+def _git(root: Path, *args):
+    return subprocess.check_output(
+        ["git", "-c", "user.email=vdoc@test", "-c", "user.name=vdoc", *args], cwd=root, text=True
+    )
+
+def _make_repo(root: Path):
+    _git(root, "init", "-q", ".")
+    (root / "src" / "pkg").mkdir(parents=True)
+    (root / "src" / "pkg" / "core.py").write_text("x = 1")
+    (root / "node_modules" / "dep").mkdir(parents=True)
+    (root / "node_modules" / "dep" / "index.js").write_text("")
+    (root / ".gitignore").write_text("node_modules/\n*.log\n!keep.log\n")
+    (root / "debug.log").write_text("")
+    (root / "keep.log").write_text("")
+    _git(root, "add", "src", ".gitignore")
+    _git(root, "commit", "-qm", "init")
+    (root / "src" / "pkg" / ".gitignore").write_text("generated\n")
+    (root / "src" / "pkg" / "generated").write_text("")
+    (root / "src" / "new.py").write_text("")
+
+def _git_listing(root: Path):
+    tracked = _git(root, "ls-files").split()
+    untracked = _git(root, "ls-files", "--others", "--exclude-standard").split()
+    return sorted(set(tracked) | set(untracked))
+
+@pytest.mark.parametrize("version", ["2", "3", "4"])
+def test_listing_matches_git(tmp_path, version):
+    _make_repo(tmp_path)
+    _git(tmp_path, "update-index", "--index-version", version)
+    assert scanner._list_repo_files(tmp_path) == sorted(_git_listing(tmp_path))
+
+def test_split_index(tmp_path):
+    _make_repo(tmp_path)
+    _git(tmp_path, "update-index", "--split-index")
+    (tmp_path / ".gitignore").write_text("node_modules/\n")
+    _git(tmp_path, "add", ".gitignore", "src/new.py")
+    _git(tmp_path, "rm", "-q", "--cached", "src/pkg/core.py")
+    assert list((tmp_path / ".git").glob("sharedindex.*"))
+    assert gitindex.read_index_paths(tmp_path / ".git") == _git(tmp_path, "ls-files").split()
+
+def test_subdirectory_root(tmp_path):
+    _make_repo(tmp_path)
+    assert scanner._list_repo_files(tmp_path / "src") == ["new.py", "pkg/.gitignore", "pkg/core.py"]
+
+def test_ignore_rules():
+    stack = [IgnoreRules(["build/", "*.pyc", "/TODO", "docs/**/draft.md", "!important.pyc"])]
+    assert is_ignored(stack, "build", True)
+    assert not is_ignored(stack, "build", False)
+    assert is_ignored(stack, "a/b/c.pyc", False)
+    assert not is_ignored(stack, "a/important.pyc", False)
+    assert is_ignored(stack, "TODO", False)
+    assert not is_ignored(stack, "src/TODO", False)
+    assert is_ignored(stack, "docs/draft.md", False)
+    assert is_ignored(stack, "docs/x/y/draft.md", False)
+
+    # Deeper ignore files take precedence over shallower ones
+    stack.append(IgnoreRules(["!*.pyc"], base="vendor"))
+    assert not is_ignored(stack, "vendor/lib.pyc", False)
+    assert is_ignored(stack, "other/lib.pyc", False)
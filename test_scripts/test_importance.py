@@ -0,0 +1,100 @@
+import json
+from vdoc import importance, manifests, scanner, tree
+
+def test_score_signals():
+    base = importance.score_file("pkg/helpers.py", 1000)
+    assert importance.score_file("pkg/main.py", 1000) > base
+    assert importance.score_file("pkg/helpers.py", 1000, referenced=True) > importance.score_file("pkg/main.py", 1000)
+    assert importance.score_file("pkg/helpers.py", 50_000) > base
+    assert importance.score_file("pkg/deep/er/helpers.py", 1000) < base
+    for noise in ["pkg/test_helpers.py", "pkg/helpers.spec.ts", "pkg/tests/helpers.py",
+                  "pkg/bundle.min.js", "pkg/api_pb2.py", "pkg/.eslintrc", "pkg/__init__.py"]:
+        assert importance.score_file(noise, 1000) < base, noise
+
+def test_top_k_keeps_order_and_breaks_ties_by_position():
+    names = ["a", "b", "c", "d", "e"]
+    scores = {"a": 1, "b": 5, "c": 1, "d": 5, "e": 3}
+    assert importance.top_k(names, 3, scores.get) == ["b", "d", "e"]
+    assert importance.top_k(names, 2, lambda name: 0) == ["a", "b"]
+    assert importance.top_k(names, 10, scores.get) == names
+
+def test_render_tree_ranks_truncated_directories():
+    files = [f"src/.rc{i}" for i in range(3)] + ["src/__init__.py", "src/zz_main.py", "src/main.py", "src/util.py"]
+    root = tree.build_tree(files, scanner.language_of)
+    seen = []
+
+    def score(rel):
+        seen.append(rel)
+        return importance.score_file(rel, 100)
+
+    lines = tree.render_tree(root, files_per_dir=2, score=score, prefix="repo/")
+    assert lines[1:] == ["  - main.py", "  - util.py", "  - ... (5 more files)"]
+    assert "repo/src/main.py" in seen
+    # Directories that fit are listed without scoring
+    seen.clear()
+    tree.render_tree(root, files_per_dir=10, score=score)
+    assert seen == []
+
+def test_manifest_entry_points(tmp_path):
+    pkg = {"main": "./lib/index.js", "bin": {"tool": "bin/tool.js"}, "exports": {".": {"import": "./esm/index.mjs"}}}
+    (tmp_path / "web").mkdir()
+    (tmp_path / "web" / "package.json").write_text(json.dumps(pkg))
+    assert manifests.entry_points(str(tmp_path / "web" / "package.json"), "web/package.json") == [
+        "web/lib/index.js", "web/bin/tool.js", "web/esm/index.mjs",
+    ]
+    (tmp_path / "pyproject.toml").write_text('[project.scripts]\nvdoc = "vdoc.main:app"\n')
+    assert "src/vdoc/main.py" in manifests.entry_points(str(tmp_path / "pyproject.toml"), "pyproject.toml")
+
+def test_context_map_lists_important_files_first(tmp_path):
+    (tmp_path / ".vdoc").mkdir()
+    (tmp_path / "pyproject.toml").write_text('[project.scripts]\nrun = "app.zz_launch:main"\n')
+    pkg = tmp_path / "app"
+    pkg.mkdir()
+    for i in range(tree.FILES_PER_DIR + 5):
+        (pkg / f"a_{i:02d}.py").write_text("")
+    (pkg / "core.py").write_text("def engine():\n    pass\n" * 200)
+    (pkg / "zz_launch.py").write_text("def main():\n    pass\n")
+
+    # The second run takes the manifest's entry points from the scan cache
+    for _ in range(2):
+        text = scanner.generate_context_map(tmp_path)
+        listing = text.split("## Repository Map")[0]
+        assert "- core.py" in listing
+        assert "- zz_launch.py" in listing
+        assert "- ... (7 more files)" in listing
+
+def _wide_api(root):
+    for i in range(1, 41):
+        (root / "api" / f"sub{i:02d}").mkdir(parents=True)
+        (root / "api" / f"sub{i:02d}" / "handler.py").write_text("")
+    for i in range(30):
+        (root / "api" / f"aa_{i:02d}.py").write_text("")
+    (root / "api" / "main.py").write_text("import os\n" * 2000)
+    for i in range(60):
+        (root / f"z_{i:02d}.txt").write_text("")
+    (root / "README.md").write_text("# Project\n" * 100)
+
+def test_capped_and_budgeted_listings_keep_important_files(tmp_path):
+    _wide_api(tmp_path)
+    listing = scanner.generate_context_map(tmp_path, use_cache=False).split("## Repository Map")[0]
+    assert "  - main.py" not in listing and "- main.py" in listing
+    assert "- README.md" in listing
+    assert "- ... (" in listing and "more files)" in listing
+
+    budgeted = scanner.generate_context_map(tmp_path, use_cache=False, token_budget=350)
+    assert "- main.py" in budgeted
+    assert "- README.md" in budgeted
+    assert "- aa_29.py" not in budgeted
+
+def test_budgeted_repository_map_keeps_important_files(tmp_path):
+    (tmp_path / "pyproject.toml").write_text('[project.scripts]\nrun = "pkg.zz_main:main"\n')
+    (tmp_path / "pkg").mkdir()
+    for i in range(40):
+        (tmp_path / "pkg" / f"a_{i:02d}.py").write_text(f"def helper_{i}():\n    pass\n")
+    (tmp_path / "pkg" / "zz_main.py").write_text("def main():\n    pass\n" + "x = 1\n" * 2000)
+
+    text = scanner.generate_context_map(tmp_path, use_cache=False, token_budget=300)
+    repo_map = text.split("## Repository Map")[1]
+    assert "- pkg/zz_main.py: def main" in repo_map
+    assert "- pkg/a_39.py" not in repo_map
+    assert "more files in pkg/)" in repo_map
@@ -0,0 +1,105 @@
+from pathlib import Path
+from vdoc import budget, imports, scanner, timing
+from vdoc.cache import ScanCache
+from vdoc.filetable import FileTable
+
+FILES = {
+    "src/app/__init__.py": "",
+    "src/app/main.py": "import os\nfrom app import models\nfrom .services import (\n    billing as b,\n    users,\n)\n",
+    "src/app/models.py": "from . import db\n",
+    "src/app/db.py": "import sqlite3\n",
+    "src/app/services/__init__.py": "",
+    "src/app/services/billing.py": "from ..models import Invoice\nfrom app.db import connect\n",
+    "src/app/services/users.py": "from ..models import *\n",
+    "tests/test_main.py": "from app.main import run\n",
+    "web/index.ts": "import { api } from './lib/api.js';\nimport './styles.css';\nexport * from './components';\n",
+    "web/lib/api.ts": "import axios from 'axios';\nconst util = require('../util');\n",
+    "web/util.js": "module.exports = {};\n",
+    "web/components/index.tsx": "export { Button } from './Button';\n",
+    "web/components/Button.tsx": "import React from 'react';\nconst lazy = import('../lib/api');\n",
+    "go.mod": "module example.com/svc\n\ngo 1.21\n",
+    "cmd/server/main.go": 'package main\n\nimport (\n\t"fmt"\n\tdb "example.com/svc/internal/store"\n)\n',
+    "internal/store/store.go": 'package store\n\nimport "example.com/svc/internal/model"\n',
+    "internal/store/cache.go": "package store\n",
+    "internal/model/model.go": "package model\n",
+}
+
+def _project(root: Path) -> FileTable:
+    for rel, text in FILES.items():
+        path = root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text)
+    return FileTable(root, sorted(FILES))
+
+def test_extract_imports_per_language():
+    assert imports.extract_imports(FILES["src/app/main.py"], "python") == [
+        "os", "app.models", ".services.billing", ".services.users",
+    ]
+    assert imports.extract_imports("from . import db, cache as c\n", "python") == [".db", ".cache"]
+    assert imports.extract_imports(FILES["web/index.ts"], "js") == ["./lib/api.js", "./styles.css", "./components"]
+    assert imports.extract_imports("import {\n  a,\n  b,\n} from '../x';\n", "js") == ["../x"]
+    assert imports.extract_imports(FILES["cmd/server/main.go"], "go") == ["fmt", "example.com/svc/internal/store"]
+    assert imports.extract_imports(FILES["go.mod"], "gomod") == ["example.com/svc"]
+
+def test_graph_resolves_to_repo_modules(tmp_path):
+    graph = imports.build_import_graph(tmp_path, _project(tmp_path))
+    assert graph.edges == {
+        "cmd/server/": ["internal/store/"],
+        "internal/store/": ["internal/model/"],
+        "src/app/main.py": ["src/app/models.py", "src/app/services/billing.py", "src/app/services/users.py"],
+        "src/app/models.py": ["src/app/db.py"],
+        "src/app/services/billing.py": ["src/app/db.py", "src/app/models.py"],
+        "src/app/services/users.py": ["src/app/models.py"],
+        "tests/test_main.py": ["src/app/main.py"],
+        "web/components/Button.tsx": ["web/lib/api.ts"],
+        "web/components/index.tsx": ["web/components/Button.tsx"],
+        "web/index.ts": ["web/components/index.tsx", "web/lib/api.ts"],
+        "web/lib/api.ts": ["web/util.js"],
+    }
+    assert graph.fan_in()["src/app/models.py"] == 3
+    assert graph.directory_edges()[("src/app/services/", "src/app/")] == 3
+
+    lines = imports.summary_lines(graph)
+    assert lines[0] == "## Dependencies"
+    assert lines[1].startswith("- **Most imported:** src/app/models.py (3), src/app/db.py (2), web/lib/api.ts (2)")
+    assert lines[2].startswith("- **Most imports:** src/app/main.py (3)")
+    assert "src/app/services/ -> src/app/ (3)" in lines[3]
+
+    web = graph.relative_to("web/")
+    assert web.edges["index.ts"] == ["components/index.tsx", "lib/api.ts"]
+    assert not any(node.startswith("src/") for node in web.edges)
+
+def test_imports_are_cached_per_file(tmp_path):
+    table = _project(tmp_path)
+    cache = ScanCache(tmp_path)
+    first = imports.build_import_graph(tmp_path, table, cache)
+    (tmp_path / "src/app/db.py").write_text("from .models import Base\n")
+    recorder = timing.enable()
+    try:
+        second = imports.build_import_graph(tmp_path, table, cache)
+    finally:
+        timing.disable()
+    assert recorder.report()["counts"]["import_files_parsed"] == 1
+    assert second.edges["src/app/db.py"] == ["src/app/models.py"]
+    assert "src/app/db.py" not in first.edges
+
+def test_context_map_has_dependency_summary(tmp_path):
+    _project(tmp_path)
+    text = scanner.generate_context_map(tmp_path, use_cache=False)
+    assert "## Dependencies\n- **Most imported:** src/app/models.py (3)" in text
+    budgeted = scanner.generate_context_map(tmp_path, use_cache=False, token_budget=300)
+    assert "## Dependencies" in budgeted
+
+def test_dependency_summary_fits_the_budget(tmp_path):
+    _project(tmp_path)
+    for token_budget in (100, 300):
+        text = scanner.generate_context_map(tmp_path, use_cache=False, token_budget=token_budget)
+        assert budget.estimate_lines(text.split("\n")) <= token_budget
+
+    graph = imports.build_import_graph(tmp_path, FileTable(tmp_path, sorted(FILES)))
+    full = imports.summary_lines(graph)
+    short = imports.summary_lines(graph, budget.estimate_lines(full) - 1)
+    assert short[0] == "## Dependencies"
+    assert budget.estimate_lines(short) < budget.estimate_lines(full)
+    assert short[1].startswith("- **Most imported:** src/app/models.py (3)")
+    assert imports.summary_lines(graph, 5) == []
@@ -0,0 +1,65 @@
+from pathlib import Path
+from vdoc import languages, scanner, timing
+from vdoc.cache import ScanCache
+from vdoc.filetable import FileTable
+
+FILES = {
+    "src/app.py": "import os\n\ndef main():\n    pass\n",
+    "src/util.mjs": "export const a = 1;\nexport const b = 2;",
+    "src/Main.kt": "fun main() {}\n",
+    "bin/deploy": "#!/usr/bin/env -S python3 -u\nprint('deploy')\n",
+    "bin/run": "#!/bin/bash\necho hi\n",
+    "LICENSE": "MIT License\n",
+    "Makefile": "all:\n\techo\n",
+    "data.json": '{"a": 1}\n',
+}
+
+def _project(root: Path) -> FileTable:
+    for rel, text in FILES.items():
+        path = root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text)
+    return FileTable(root, sorted(FILES))
+
+def test_classification():
+    assert languages.classify_name("app.cjs") == "JavaScript"
+    assert languages.classify_name("Dockerfile") == "Dockerfile"
+    assert languages.classify_name("CMakeLists.txt") == "CMake"
+    assert languages.classify_name("notes.txt") is None
+    assert languages.sniff_shebang(b"#!/usr/bin/python3.11\n") == "Python"
+    assert languages.sniff_shebang(b"#!/usr/bin/env NODE_ENV=prod node\n") == "JavaScript"
+    assert languages.sniff_shebang(b"#!/bin/sh -e\nset -x\n") == "Shell"
+    assert languages.sniff_shebang(b"# not a shebang\n") is None
+
+def test_lines_and_bytes_per_language(tmp_path):
+    table = _project(tmp_path)
+    stats = languages.language_stats(tmp_path, table, workers=1)
+    assert set(stats) == {"Python", "JavaScript", "Kotlin", "Shell", "Makefile"}
+    assert (stats["Python"].files, stats["Python"].lines) == (2, 6)
+    assert stats["Python"].bytes == len(FILES["src/app.py"]) + len(FILES["bin/deploy"])
+    # The last line counts without a trailing newline
+    assert stats["JavaScript"].lines == 2
+    assert stats["Shell"].lines == 2 and stats["Makefile"].lines == 2
+    assert languages.language_stats(tmp_path, table, workers=4) == stats
+
+def test_results_are_cached_per_file(tmp_path):
+    table = _project(tmp_path)
+    cache = ScanCache(tmp_path)
+    first = languages.language_stats(tmp_path, table, cache)
+    recorder = timing.enable()
+    try:
+        assert languages.language_stats(tmp_path, table, cache) == first
+        (tmp_path / "src" / "app.py").write_text("x = 1\n")
+        second = languages.language_stats(tmp_path, table, cache)
+    finally:
+        timing.disable()
+    # Unknown files (LICENSE) are sniffed once; the cache remembers them too
+    assert recorder.report()["counts"]["files_measured"] == 1
+    assert second["Python"].lines == 3
+
+def test_overview_weighs_languages_by_lines(tmp_path):
+    (tmp_path / "big.go").write_text("package main\n" * 500)
+    for i in range(5):
+        (tmp_path / f"small{i}.py").write_text("x = 1\n")
+    content = scanner.generate_context_map(tmp_path, use_cache=False)
+    assert "- **Languages:** Go (500 lines in 1 file), Python (5 lines in 5 files)" in content
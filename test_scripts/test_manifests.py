@@ -0,0 +1,57 @@
+import json
+from pathlib import Path
+from vdoc import manifests, scanner
+from vdoc.filetable import FileTable
+
+def _write(path: Path, text: str):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+
+def _detect(tmp_path: Path, rel: str, text: str):
+    _write(tmp_path / rel, text)
+    return manifests.detect_frameworks(str(tmp_path / rel), rel)
+
+def test_parsers_read_declared_dependencies(tmp_path):
+    assert _detect(tmp_path, "pyproject.toml", '[project]\ndependencies = ["Django>=4", "flask_cors"]\n') == ["Django"]
+    assert _detect(tmp_path, "a/requirements-dev.txt", "-r base.txt\nSanic[ext]==23.0 ; python_version>'3.8'\n# flask\n") == ["Sanic"]
+    assert _detect(tmp_path, "b/requirements/base.txt", "fastapi\n") == ["FastAPI"]
+    assert _detect(tmp_path, "go.mod", "module x\n\nrequire (\n\tgithub.com/gofiber/fiber/v2 v2.1.0\n)\n") == ["Fiber"]
+    assert _detect(tmp_path, "pom.xml", (
+        '<project xmlns="http://maven.apache.org/POM/4.0.0"><parent><groupId>org.springframework.boot</groupId>'
+        '<artifactId>spring-boot-starter-parent</artifactId></parent></project>'
+    )) == ["Spring Boot"]
+    assert _detect(tmp_path, "Gemfile", "source 'https://rubygems.org'\ngem 'rails', '~> 7.0'\n") == ["Ruby on Rails"]
+    assert _detect(tmp_path, "composer.json", '{"require": {"laravel/framework": "^10"}}') == ["Laravel"]
+    lock = {"lockfileVersion": 3, "packages": {"": {"dependencies": {"vue": "^3"}}, "node_modules/react": {}}}
+    assert _detect(tmp_path, "c/package-lock.json", json.dumps(lock)) == ["Vue"]
+    pnpm = "importers:\n\n  .:\n    dependencies:\n      '@nestjs/core':\n        specifier: ^10\n"
+    assert _detect(tmp_path, "d/pnpm-lock.yaml", pnpm) == ["NestJS"]
+    assert _detect(tmp_path, "broken/package.json", "{not json") == []
+
+def test_names_must_match_exactly(tmp_path):
+    deps = {"dependencies": {"nextjs-anything": "1", "react-dom": "1", "@nestjs/common": "1"}}
+    assert _detect(tmp_path, "package.json", json.dumps(deps)) == []
+
+def test_discovery_across_monorepo(tmp_path):
+    rels = [
+        "package.json", "package-lock.json",
+        "apps/api/pyproject.toml", "apps/api/poetry.lock",
+        "apps/legacy/poetry.lock",
+        "apps/web/node_modules/next/package.json", "apps/web/package.json",
+        "tools/requirements.txt", "README.md",
+    ]
+    assert manifests.find_manifests(rels) == [
+        "package.json", "tools/requirements.txt",
+        "apps/api/pyproject.toml", "apps/legacy/poetry.lock", "apps/web/package.json",
+    ]
+
+def test_analyze_detects_nested_packages_concurrently(tmp_path):
+    for i in range(300):
+        _write(tmp_path / "packages" / f"p{i:03d}" / "package.json", json.dumps({"dependencies": {"koa": "2"}}))
+    _write(tmp_path / "services" / "api" / "go.mod", "module api\n\nrequire github.com/go-chi/chi/v5 v5.0.0\n")
+    table = FileTable(tmp_path, scanner._list_repo_files(tmp_path))
+
+    stats = scanner.analyze_project_root(tmp_path, table)
+    assert stats["frameworks"] == {"Koa", "Chi"}
+    assert len(stats["config_files"]) == 301
+    assert stats["config_files"][-1] == "services/api/go.mod"
@@ -0,0 +1,28 @@
+import threading
+import time
+from concurrent.futures import Future
+from vdoc import pipeline, services
+
+def test_scan_overlaps_prompt_fetch(monkeypatch):
+    def slow_fetch(api_key):
+        future = Future()
+        def finish():
+            time.sleep(0.3)
+            future.set_result({"scout_system_prompt": api_key})
+        threading.Thread(target=finish, daemon=True).start()
+        return future
+
+    monkeypatch.setattr(services, "start_prompt_fetch", slow_fetch)
+
+    def scan(prompts_future):
+        assert not prompts_future.done()
+        time.sleep(0.3)
+        return "scanned"
+
+    prepared = pipeline.scan_while_fetching("key", scan)
+    assert prepared.result == "scanned"
+    assert prepared.prompts == {"scout_system_prompt": "key"}
+    assert prepared.scan_seconds >= 0.3 and prepared.fetch_seconds >= 0.3
+    # Overlapped: well under the 0.6s the two phases take back to back
+    assert prepared.wall_seconds < 0.55
+    assert "scan 0." in prepared.timing_summary()
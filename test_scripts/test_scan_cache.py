@@ -0,0 +1,105 @@
+import subprocess
+from pathlib import Path
+import pytest
+import vdoc.scanner as scanner
+from vdoc import timing
+from vdoc.cache import ScanCache, cached_map, map_jobs
+
+def _make_project(root: Path):
+    (root / ".vdoc").mkdir()
+    (root / "src").mkdir()
+    (root / "src" / "main.py").write_text("print('hello')")
+    (root / "package.json").write_text('{"dependencies": {"react": "^18.0.0"}}')
+
+def test_listing_is_reused_and_invalidated(tmp_path, monkeypatch):
+    _make_project(tmp_path)
+    calls = []
+    real_list = scanner._list_repo_files
+    monkeypatch.setattr(scanner, "_list_repo_files", lambda root, *args: calls.append(root) or real_list(root, *args))
+
+    scanner.generate_context_map(tmp_path)
+    assert (tmp_path / ".vdoc" / "scan_cache.json").exists()
+    assert len(calls) == 1
+
+    # Unchanged tree: listing comes from the cache
+    content = scanner.generate_context_map(tmp_path)
+    assert len(calls) == 1
+    assert "main.py" in content
+
+    # Adding a file bumps the parent directory mtime and forces a relist
+    (tmp_path / "src" / "new.py").write_text("print('new')")
+    content = scanner.generate_context_map(tmp_path)
+    assert len(calls) == 2
+    assert "new.py" in content
+
+    # --no-cache always rescans
+    scanner.generate_context_map(tmp_path, use_cache=False)
+    assert len(calls) == 3
+
+def test_vdoc_artifacts_are_not_scanned(tmp_path):
+    _make_project(tmp_path)
+    (tmp_path / ".vdoc" / "context_map.md").write_text("# old map")
+    files = scanner.get_repo_files(tmp_path, ScanCache(tmp_path))
+    assert all(".vdoc" not in f.parts for f in files)
+
+def test_manifest_results_follow_file_stamp(tmp_path):
+    _make_project(tmp_path)
+    cache = ScanCache(tmp_path)
+    files = scanner.get_repo_files(tmp_path, cache)
+    stats = scanner.analyze_project_root(tmp_path, files, cache)
+    assert "React" in stats["frameworks"]
+    cache.save()
+
+    (tmp_path / "package.json").write_text('{"dependencies": {"vue": "^3.0.0", "left-pad": "1.0.0"}}')
+    cache = ScanCache.load(tmp_path)
+    stats = scanner.analyze_project_root(tmp_path, files, cache)
+    assert "Vue" in stats["frameworks"]
+    assert "React" not in stats["frameworks"]
+
+@pytest.mark.parametrize("use_git", [False, True])
+def test_files_in_previously_unlisted_directories_are_found(tmp_path, use_git):
+    _make_project(tmp_path)
+    if use_git:
+        subprocess.check_call(["git", "init", "-q", "."], cwd=tmp_path)
+        (tmp_path / ".gitignore").write_text("*.log\n")
+    (tmp_path / "docs").mkdir()
+    (tmp_path / "logs").mkdir()
+    (tmp_path / "logs" / ("debug.log" if use_git else ".hidden")).write_text("")
+    scanner.generate_context_map(tmp_path)
+
+    # Neither directory held a listed file when the listing was cached
+    (tmp_path / "docs" / "new.md").write_text("# New\n")
+    (tmp_path / "logs" / "notes.md").write_text("# Notes\n")
+    rels = [p.relative_to(tmp_path).as_posix() for p in scanner.get_repo_files(tmp_path, ScanCache.load(tmp_path))]
+    assert "docs/new.md" in rels and "logs/notes.md" in rels
+
+def _length(job):
+    rel, path, arg = job
+    return None if arg == "skip" else [arg, Path(path).stat().st_size]
+
+def test_cached_map_reuses_stores_and_prunes(tmp_path):
+    for name in ["a.txt", "b.txt", "c.txt"]:
+        (tmp_path / name).write_text(name)
+    cache = ScanCache(tmp_path)
+    files = [("a.txt", "x"), ("b.txt", "skip"), ("c.txt", "y"), ("gone.txt", "z")]
+    assert cached_map(tmp_path, cache, "lengths", files, _length) == {"a.txt": ["x", 5], "c.txt": ["y", 5]}
+
+    (tmp_path / "c.txt").write_text("longer")
+    recorder = timing.enable()
+    try:
+        again = cached_map(tmp_path, cache, "lengths", files[:3], _length, counter="computed")
+    finally:
+        timing.disable()
+    # a.txt is cached; b.txt (nothing stored) and the changed c.txt are computed
+    assert recorder.report()["counts"]["computed"] == 2
+    assert again == {"a.txt": ["x", 5], "c.txt": ["y", 6]}
+
+    cached_map(tmp_path, cache, "lengths", [("c.txt", "y")], _length)
+    assert set(cache.data["entries"]["lengths"]) == {"c.txt"}
+
+@pytest.mark.parametrize("processes", [False, True])
+def test_map_jobs_keeps_order_on_a_pool(monkeypatch, processes):
+    monkeypatch.setattr("vdoc.cache.THREAD_POOL_THRESHOLD", 1)
+    monkeypatch.setattr("vdoc.cache.PROCESS_POOL_THRESHOLD", 1)
+    jobs = list(range(200))
+    assert map_jobs(abs, [-j for j in jobs], workers=2, processes=processes) == jobs
@@ -0,0 +1,94 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+from vdoc import server
+from vdoc.cache import ScanCache
+from vdoc.watch import LiveMap
+
+BENCHMARK = Path(__file__).resolve().parent.parent / "benchmarks" / "serve.py"
+
+def _project(root: Path):
+    (root / ".vdoc").mkdir()
+    (root / ".vdoc" / "spec.md").write_text("# Spec\nDocument the API.")
+    (root / "src").mkdir()
+    (root / "src" / "api.py").write_text("def get():\n    pass\n\nclass Router:\n    pass\n")
+    (root / "src" / "util.py").write_text("def helper():\n    pass\n")
+
+def _server(root: Path) -> server.Server:
+    return server.Server(root, LiveMap(root, use_cache=False))
+
+def _call(srv, method, params=None, request_id=1):
+    return srv.handle({"jsonrpc": "2.0", "id": request_id, "method": method, "params": params or {}})
+
+def _text(response):
+    return response["result"]["content"][0]["text"]
+
+def test_initialize_and_listings(tmp_path):
+    _project(tmp_path)
+    srv = _server(tmp_path)
+    result = _call(srv, "initialize", {"protocolVersion": "2024-11-05"})["result"]
+    assert result["capabilities"] == {"prompts": {}, "tools": {}}
+    assert srv.handle({"jsonrpc": "2.0", "method": "notifications/initialized"}) is None
+    assert {p["name"] for p in _call(srv, "prompts/list")["result"]["prompts"]} == {"vdoc-plan", "vdoc-exec", "vdoc-update"}
+    assert {t["name"] for t in _call(srv, "tools/list")["result"]["tools"]} == {"context_map", "find_files", "symbols"}
+    assert _call(srv, "no/such")["error"]["code"] == server.METHOD_NOT_FOUND
+    assert srv.handle_line("{not json")["error"]["code"] == server.PARSE_ERROR
+    positional = srv.handle({"jsonrpc": "2.0", "id": 2, "method": "prompts/get", "params": ["vdoc-plan"]})
+    assert positional["error"]["code"] == server.INVALID_PARAMS
+    bad_arguments = _call(srv, "tools/call", {"name": "find_files", "arguments": ["src"]})
+    assert bad_arguments["error"]["code"] == server.INVALID_PARAMS
+
+def test_tools(tmp_path):
+    _project(tmp_path)
+    srv = _server(tmp_path)
+    assert "- src/api.py: def get, class Router" in _text(_call(srv, "tools/call", {"name": "context_map"}))
+    assert _text(_call(srv, "tools/call", {"name": "find_files", "arguments": {"pattern": "src/*.py"}})) == "src/api.py\nsrc/util.py"
+    assert _text(_call(srv, "tools/call", {"name": "find_files", "arguments": {"pattern": "util"}})) == "src/util.py"
+    assert _text(_call(srv, "tools/call", {"name": "symbols", "arguments": {"path": "src/api.py"}})) == "def get\nclass Router"
+    assert "- src/util.py: def helper" in _text(_call(srv, "tools/call", {"name": "symbols", "arguments": {"path": "src/"}}))
+    failed = _call(srv, "tools/call", {"name": "find_files", "arguments": {}})["result"]
+    assert failed["isError"] is True
+
+def test_prompts_follow_live_changes(tmp_path):
+    _project(tmp_path)
+    srv = _server(tmp_path)
+    plan = _call(srv, "prompts/get", {"name": "vdoc-plan"})["result"]
+    text = plan["messages"][0]["content"]["text"]
+    assert text.startswith("# VDoc Planning Prompt") and "Document the API." in text
+
+    (tmp_path / "src" / "new.py").write_text("def fresh():\n    pass\n")
+    srv.live.apply([("created", "src/new.py", False)])
+    update = _call(srv, "prompts/get", {"name": "vdoc-update", "arguments": {"mode": "full"}})["result"]
+    assert "- src/new.py: def fresh" in update["messages"][0]["content"]["text"]
+
+    missing = _call(srv, "prompts/get", {"name": "vdoc-exec"})
+    assert missing["error"]["code"] == server.INVALID_PARAMS
+    (tmp_path / ".vdoc" / "doc_plan.md").write_text("Document `src/util.py`.")
+    exec_text = _call(srv, "prompts/get", {"name": "vdoc-exec"})["result"]["messages"][0]["content"]["text"]
+    assert "### `src/util.py`" in exec_text
+    assert not ScanCache.get_path(tmp_path).exists()
+
+def test_serve_over_stdio(tmp_path):
+    _project(tmp_path)
+    requests = [
+        {"jsonrpc": "2.0", "id": 1, "method": "initialize", "params": {}},
+        {"jsonrpc": "2.0", "method": "notifications/initialized"},
+        {"jsonrpc": "2.0", "id": 2, "method": "tools/call", "params": {"name": "symbols", "arguments": {"path": "src/util.py"}}},
+    ]
+    proc = subprocess.run(
+        [sys.executable, "-m", "vdoc.main", "serve", "--no-watch"],
+        input="".join(json.dumps(r) + "\n" for r in requests), capture_output=True, text=True, cwd=tmp_path, timeout=60,
+    )
+    assert proc.returncode == 0, proc.stderr
+    responses = [json.loads(line) for line in proc.stdout.splitlines()]
+    assert [r["id"] for r in responses] == [1, 2]
+    assert responses[1]["result"]["content"][0]["text"] == "def helper"
+
+def test_benchmark_runs():
+    result = subprocess.run(
+        [sys.executable, str(BENCHMARK), "--files", "50", "--requests", "2", "--cli-runs", "1", "--json"],
+        capture_output=True, text=True, timeout=120,
+    )
+    assert result.returncode == 0, result.stderr
+    assert json.loads(result.stdout)["files"] == 50
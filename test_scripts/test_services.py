@@ -0,0 +1,104 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from vdoc import services
+
+class _Stub(BaseHTTPRequestHandler):
+    """Prompt service stub: serves `prompts` with an ETag, after `fail_first` 503s."""
+    prompts = {"scout_system_prompt": "remote scout"}
+    etag = '"v1"'
+    fail_first = 0
+    requests = []
+
+    def do_GET(self):
+        cls = type(self)
+        cls.requests.append(dict(self.headers))
+        if cls.fail_first:
+            cls.fail_first -= 1
+            self.send_response(503)
+            self.send_header("Retry-After", "0")
+            self.end_headers()
+            return
+        if self.headers.get("If-None-Match") == cls.etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        body = json.dumps({"prompts": cls.prompts}).encode()
+        self.send_response(200)
+        self.send_header("ETag", cls.etag)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def stub(tmp_path, monkeypatch):
+    _Stub.requests, _Stub.fail_first = [], 0
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Stub)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setenv("VDOC_API_URL", f"http://127.0.0.1:{server.server_address[1]}/v1")
+    monkeypatch.setattr(services, "BACKOFF_SECONDS", 0)
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / ".vdoc").mkdir()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+def test_no_api_key_needs_no_network(monkeypatch):
+    monkeypatch.setenv("VDOC_API_URL", "http://127.0.0.1:9")
+    assert services.get_prompts_sync(None) == services.DEFAULT_PROMPTS
+
+def test_prompts_are_cached_and_revalidated(stub, monkeypatch):
+    prompts = services.get_prompts_sync("key")
+    assert prompts["scout_system_prompt"] == "remote scout"
+    assert prompts["writer_system_prompt"] == services.DEFAULT_PROMPTS["writer_system_prompt"]
+    assert _Stub.requests[0]["Authorization"] == "Bearer key"
+
+    # Within the TTL: no request at all
+    assert services.get_prompts_sync("key") == prompts
+    assert len(_Stub.requests) == 1
+
+    # Expired: conditional request, answered with 304
+    monkeypatch.setattr(services, "PROMPT_CACHE_TTL", 0)
+    assert services.get_prompts_sync("key") == prompts
+    assert _Stub.requests[1]["If-None-Match"] == '"v1"'
+
+    # Another key never sees this key's cache
+    services.get_prompts_sync("other")
+    assert "If-None-Match" not in _Stub.requests[2]
+
+def test_retries_then_falls_back_offline(stub, monkeypatch):
+    _Stub.fail_first = 2
+    assert services.get_prompts_sync("key")["scout_system_prompt"] == "remote scout"
+    assert len(_Stub.requests) == 3
+
+    monkeypatch.setattr(services, "PROMPT_CACHE_TTL", 0)
+    stub.shutdown()
+    stub.server_close()
+    assert services.get_prompts_sync("key")["scout_system_prompt"] == "remote scout"
+
+    cache_path = services.get_prompt_cache_path()
+    cache_path.unlink()
+    assert services.get_prompts_sync("key") == services.DEFAULT_PROMPTS
+
+def test_failures_are_remembered(stub, monkeypatch):
+    _Stub.fail_first = services.MAX_ATTEMPTS
+    assert services.get_prompts_sync("key") == services.DEFAULT_PROMPTS
+    assert len(_Stub.requests) == services.MAX_ATTEMPTS
+
+    # Within the backoff window the service is not contacted at all
+    assert services.get_prompts_sync("key") == services.DEFAULT_PROMPTS
+    assert len(_Stub.requests) == services.MAX_ATTEMPTS
+
+    monkeypatch.setattr(services, "PROMPT_FAILURE_BACKOFF", 0)
+    assert services.get_prompts_sync("key")["scout_system_prompt"] == "remote scout"
+    assert services.load_prompt_cache(services._source_id("key")).failed_at == 0.0
+
+def test_errors_without_a_message_are_named():
+    import httpx
+    assert services._describe(httpx.ConnectTimeout("")) == "ConnectTimeout"
+    assert services._describe(OSError("refused")) == "refused"
@@ -0,0 +1,69 @@
+from typer.testing import CliRunner
+from vdoc import sources
+from vdoc.main import app
+
+runner = CliRunner()
+
+def test_extract_paths_normalises_and_dedupes():
+    plan = (
+        "1. Document `src/api/routes.py` and ./src/api/routes.py:42\n"
+        "2. See [models](src/models.py#L10-L20), then README.md.\n"
+        "3. Ignore https://example.com/page.html and plain words.\n"
+    )
+    assert sources.extract_paths(plan) == ["src/api/routes.py", "src/models.py", "README.md"]
+
+def test_gather_resolves_only_files_inside_root(tmp_path):
+    (tmp_path / "a.py").write_text("x = 1\n")
+    (tmp_path / ".vdoc").mkdir()
+    (tmp_path / ".vdoc" / "doc_plan.md").write_text("plan")
+    (tmp_path.parent / "outside.py").write_text("secret")
+    got = sources.gather_sources(tmp_path, ["a.py", "./a.py", "missing.py", ".vdoc/doc_plan.md", "../outside.py"])
+    assert [(s.rel, s.text, s.note) for s in got] == [("a.py", "x = 1\n", None)]
+
+def test_gather_skips_ignored_files_and_escaping_symlinks(tmp_path):
+    (tmp_path / "a.py").write_text("x = 1\n")
+    (tmp_path / ".gitignore").write_text(".env\n")
+    (tmp_path / ".env").write_text("TOKEN=secret\n")
+    (tmp_path.parent / "outside.py").write_text("secret")
+    (tmp_path / "linked.py").symlink_to(tmp_path.parent / "outside.py")
+    (tmp_path / "alias.py").symlink_to(tmp_path / "a.py")
+    got = sources.gather_sources(tmp_path, ["a.py", ".env", "linked.py", "alias.py"])
+    assert [s.rel for s in got] == ["a.py", "alias.py"]
+    # An explicit listing replaces the scan's
+    assert [s.rel for s in sources.gather_sources(tmp_path, ["a.py", "alias.py"], listed={"alias.py"})] == ["alias.py"]
+
+def test_caps_and_binary_skip(tmp_path):
+    (tmp_path / "big.py").write_text("".join(f"line {i}\n" for i in range(100)))
+    (tmp_path / "blob.bin").write_bytes(b"\x00\x01" * 10)
+    (tmp_path / "late.py").write_text("y = 2\n" * 20)
+    got = sources.gather_sources(tmp_path, ["big.py", "blob.bin", "late.py"], max_file_bytes=50, max_total_bytes=80)
+    big, blob, late = got
+    assert big.note == "truncated" and big.text.endswith("\n") and len(big.text) <= 50
+    assert (blob.text, blob.note) == (None, "binary")
+    assert (late.text, late.note) == (None, "total cap")
+
+    text = "\n".join(sources.iter_source_lines(got))
+    assert "### `big.py`\n```python\nline 0" in text
+    assert "Not inlined: `blob.bin` (binary), `late.py` (total cap)" in text
+
+def test_large_files_are_memory_mapped(tmp_path, monkeypatch):
+    monkeypatch.setattr(sources, "MMAP_THRESHOLD", 0)
+    (tmp_path / "doc.md").write_text("```bash\nrun\n```\n" * 10)
+    (tmp_path / "data.bin").write_bytes(b"abc\x00def")
+    doc, data = sources.gather_sources(tmp_path, ["doc.md", "data.bin"], max_file_bytes=20)
+    assert doc.text == "```bash\nrun\n```\n" and doc.note == "truncated"
+    assert data.note == "binary"
+    # The fence outgrows any backtick run inside the file
+    assert "````markdown" in list(sources.iter_source_lines([doc]))
+
+def test_exec_inlines_referenced_files(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / ".vdoc").mkdir()
+    (tmp_path / "app.py").write_text("def main():\n    pass\n")
+    (tmp_path / ".vdoc" / "doc_plan.md").write_text("# Plan\n- Document `app.py` in API.md\n")
+    result = runner.invoke(app, ["exec", "--save"])
+    assert result.exit_code == 0
+    prompt = (tmp_path / "product_documentation" / "EXECUTION_PROMPT.md").read_text()
+    assert "## Referenced Files" in prompt
+    assert "### `app.py`\n```python\ndef main():\n    pass\n```" in prompt
+    assert prompt.index("## Documentation Plan") < prompt.index("## Referenced Files") < prompt.index("## Instruction")
@@ -0,0 +1,17 @@
+import subprocess
+import sys
+from pathlib import Path
+
+BENCHMARK = Path(__file__).resolve().parent.parent / "benchmarks" / "startup.py"
+
+def _loaded(code: str, modules):
+    probe = f"import sys; {code}; print(','.join(m for m in {list(modules)!r} if m in sys.modules))"
+    out = subprocess.run([sys.executable, "-c", probe], capture_output=True, text=True, check=True).stdout
+    return [m for m in out.strip().split(",") if m]
+
+def test_cold_start_does_not_regress():
+    result = subprocess.run([sys.executable, str(BENCHMARK), "--runs", "1"], capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+
+def test_exec_needs_neither_git_nor_httpx():
+    assert _loaded("import vdoc.commands.exec", ["git", "httpx", "vdoc.scanner"]) == []
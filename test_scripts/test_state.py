@@ -0,0 +1,71 @@
+import json
+import sqlite3
+import subprocess
+import sys
+import pytest
+from vdoc import state
+from vdoc.state import VDocState, load_state, save_state
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / ".vdoc").mkdir()
+    return tmp_path
+
+def _rows(project):
+    with sqlite3.connect(str(project / ".vdoc" / state.STATE_FILE_NAME)) as conn:
+        return dict(conn.execute("SELECT key, value FROM state"))
+
+def test_round_trip_and_incremental_updates(project):
+    assert load_state() == VDocState()
+    assert not (project / ".vdoc" / state.STATE_FILE_NAME).exists()
+
+    save_state(VDocState(last_run="t1", local_context={"runs": 1, "scan": {"files": 3}}))
+    assert load_state() == VDocState(last_run="t1", local_context={"runs": 1, "scan": {"files": 3}})
+    assert _rows(project) == {"last_run": '"t1"', "local_context/runs": "1", "local_context/scan": '{"files": 3}'}
+
+    # Field updates leave every other row alone
+    state.update_state(last_commit="abc", last_run=None)
+    state.set_context("runs", 2)
+    assert state.get_context("runs") == 2 and state.get_context("missing", "x") == "x"
+    assert load_state() == VDocState(last_commit="abc", local_context={"runs": 2, "scan": {"files": 3}})
+
+    loaded = load_state()
+    del loaded.local_context["scan"]
+    save_state(loaded)
+    assert _rows(project) == {"last_commit": '"abc"', "local_context/runs": "2"}
+    with pytest.raises(ValueError):
+        state.update_state(local_context={})
+
+def test_legacy_json_is_imported_once(project):
+    legacy = project / ".vdoc" / state.LEGACY_STATE_FILE_NAME
+    legacy.write_text(json.dumps({"last_run": "old", "last_commit": "c0ffee", "local_context": {"k": [1]}}))
+    assert load_state() == VDocState(last_run="old", last_commit="c0ffee", local_context={"k": [1]})
+    assert not legacy.exists()
+    state.update_state(last_commit="new")
+    assert load_state().last_commit == "new"
+
+def test_unreadable_database_is_moved_aside(project, capsys):
+    (project / ".vdoc" / state.STATE_FILE_NAME).write_bytes(b"garbage, not sqlite" * 100)
+    assert load_state() == VDocState()
+    assert "Unreadable state.db" in capsys.readouterr().err
+    assert (project / ".vdoc" / "state.db.corrupt").exists()
+    state.update_state(last_run="fresh")
+    assert load_state().last_run == "fresh"
+
+def test_killed_writer_leaves_previous_state(project):
+    save_state(VDocState(last_run="before", local_context={"n": 1}))
+    # Dies in the middle of an update, after its first row was written
+    code = (
+        "import os, vdoc.state as s\n"
+        "put = s._put\n"
+        "def dying_put(conn, key, value):\n"
+        "    if key == 'last_commit':\n"
+        "        os._exit(9)\n"
+        "    put(conn, key, value)\n"
+        "s._put = dying_put\n"
+        "s.update_state(last_run='after', last_commit='abc')\n"
+    )
+    result = subprocess.run([sys.executable, "-c", code], cwd=project)
+    assert result.returncode == 9
+    assert load_state() == VDocState(last_run="before", local_context={"n": 1})
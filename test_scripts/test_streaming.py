@@ -0,0 +1,56 @@
+import types
+from pathlib import Path
+from typer.testing import CliRunner
+from vdoc import output, scanner
+from vdoc.main import app
+
+runner = CliRunner()
+
+def _project(root: Path):
+    (root / "README.md").write_text("# demo")
+    for d in ["api", "web"]:
+        (root / d).mkdir()
+        for i in range(60):
+            (root / d / f"m{i:02d}.py").write_text(f"def handler_{i}():\n    pass\n")
+
+def test_iter_context_map_streams_groups(tmp_path):
+    _project(tmp_path)
+    scan = scanner.scan_project(tmp_path, use_cache=False)
+    lines = scanner.iter_context_map(scan)
+    assert isinstance(lines, types.GeneratorType)
+    assert next(lines) == "# Context Map"
+
+    text = "\n".join(scanner.iter_context_map(scan))
+    assert text == scanner.render_context_map(scan)
+    assert "### api/ (60 files: Python 100%)" in text
+    assert "- ... (45 more files)" in text
+    assert "- web/m59.py: def handler_59" in text
+
+def test_repository_map_is_capped_without_budget(tmp_path):
+    _project(tmp_path)
+    (tmp_path / "api" / "main.py").write_text("def main():\n    pass\n" * 50)
+    text = scanner.generate_context_map(tmp_path, use_cache=False)
+    repo_map = text.split("## Repository Map")[1].splitlines()
+    assert sum(line.startswith("- api/") for line in repo_map) == scanner.DIR_LISTING_CAP
+    assert "- api/main.py: def main" in repo_map
+    assert "- ... (11 more files in api/)" in repo_map
+    assert "- ... (10 more files in web/)" in repo_map
+
+def test_emit_counts_bytes(tmp_path):
+    target = tmp_path / "out.md"
+    written = output.emit(iter(["# Title", "héllo"]), target)
+    assert target.read_text() == "# Title\nhéllo\n"
+    assert written == len("# Title\nhéllo\n".encode("utf-8"))
+    assert list(output.iter_file_lines(target)) == ["# Title", "héllo"]
+
+def test_update_streams_to_stdout_and_file(tmp_path, monkeypatch):
+    _project(tmp_path)
+    monkeypatch.chdir(tmp_path)
+    result = runner.invoke(app, ["update"])
+    assert result.exit_code == 0
+    assert "## Current Context Map" in result.stdout
+    assert "### web/ (60 files: Python 100%)" in result.stdout
+
+    result = runner.invoke(app, ["update", "--save"])
+    saved = (tmp_path / "product_documentation" / "UPDATE_PROMPT.md").read_text()
+    assert "### web/ (60 files: Python 100%)" in saved
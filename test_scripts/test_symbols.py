@@ -0,0 +1,54 @@
+import os
+from pathlib import Path
+from vdoc import symbols
+from vdoc.cache import ScanCache
+
+def test_extract_symbols_per_language():
+    py = "class Scanner:\n    def scan(self): pass\n\nasync def fetch():\n    pass\ndef _private(): pass\n"
+    assert symbols.extract_symbols(py, "python") == ["class Scanner", "def fetch"]
+
+    tsx = (
+        "import React from 'react';\n"
+        "export interface Props { name: string }\n"
+        "export const App = () => <div/>;\n"
+        "export const API_URL = '/api';\n"
+        "export default function Layout() {}\n"
+        "function helper() {}\n"
+    )
+    assert symbols.extract_symbols(tsx, "jsx") == [
+        "interface Props", "component App", "const API_URL", "component Layout", "function helper"
+    ]
+
+    go = "package main\n\ntype Server struct {}\n\nfunc (s *Server) Start() error {}\n\nfunc main() {}\n"
+    assert symbols.extract_symbols(go, "go") == ["struct Server", "func Server.Start", "func main"]
+
+def _project(root: Path, n: int = 3):
+    (root / "pkg").mkdir()
+    for i in range(n):
+        (root / "pkg" / f"mod{i}.py").write_text(f"class Model{i}:\n    pass\n")
+    return sorted((root / "pkg").iterdir())
+
+def test_only_changed_files_are_parsed(tmp_path, monkeypatch):
+    files = _project(tmp_path)
+    cache = ScanCache(tmp_path)
+    repo_map = symbols.build_repository_map(tmp_path, files, cache)
+    assert repo_map["pkg/mod1.py"] == ["class Model1"]
+
+    parsed = []
+    real = symbols.extract_symbols
+    monkeypatch.setattr(symbols, "extract_symbols", lambda text, lang: parsed.append(text) or real(text, lang))
+
+    # Touching a file changes its stamp but not its digest: nothing is re-parsed
+    st = os.stat(files[0])
+    os.utime(files[0], ns=(st.st_atime_ns, st.st_mtime_ns + 10_000_000))
+    files[2].write_text("class Renamed:\n    pass\n")
+    repo_map = symbols.build_repository_map(tmp_path, files, cache)
+    assert repo_map["pkg/mod0.py"] == ["class Model0"]
+    assert repo_map["pkg/mod2.py"] == ["class Renamed"]
+    assert len(parsed) == 1
+
+def test_process_pool_matches_inline(tmp_path, monkeypatch):
+    files = _project(tmp_path, n=20)
+    inline = symbols.build_repository_map(tmp_path, files, workers=1)
+    monkeypatch.setattr("vdoc.cache.PROCESS_POOL_THRESHOLD", 1)
+    assert symbols.build_repository_map(tmp_path, files, workers=2) == inline
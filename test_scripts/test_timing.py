@@ -0,0 +1,58 @@
+import json
+import pstats
+import subprocess
+import sys
+import threading
+from vdoc import timing
+
+def _fetch():
+    with timing.phase("prompts_fetch"):
+        pass
+
+def test_phases_nest_per_thread_and_count():
+    recorder = timing.enable()
+    try:
+        with timing.phase("scan"):
+            with timing.phase("list_files"):
+                timing.count("files_listed", 3)
+            # Another thread's phases do not nest under this thread's
+            worker = threading.Thread(target=_fetch)
+            worker.start()
+            worker.join()
+            with timing.phase("symbols"):
+                pass
+        with timing.phase("write"):
+            assert list(timing.timed("render", iter(["a", "b"]))) == ["a", "b"]
+        timing.count("files_listed", 2)
+        report = recorder.report()
+    finally:
+        timing.disable()
+    assert [p["phase"] for p in report["phases"]] == [
+        "scan", "scan/list_files", "scan/symbols", "prompts_fetch", "write", "write/render",
+    ]
+    assert report["counts"] == {"files_listed": 5}
+    assert next(p for p in report["phases"] if p["phase"] == "write/render")["calls"] == 1
+    text = timing.format_text(report)
+    assert "\n  list_files " in text and "counts: files_listed=5" in text
+
+def test_disabled_hooks_are_no_ops():
+    lines = iter(["x"])
+    assert timing.timed("render", lines) is lines
+    with timing.phase("scan"):
+        timing.count("files_listed")
+
+def test_cli_timings_and_profile(tmp_path):
+    (tmp_path / ".vdoc").mkdir()
+    (tmp_path / "app.py").write_text("def main():\n    pass\n")
+    profile = tmp_path / "update.prof"
+    result = subprocess.run(
+        [sys.executable, "-m", "vdoc.main", "--timings", "--timings-format", "json", "--profile", str(profile), "update", "--save"],
+        capture_output=True, text=True, cwd=tmp_path, timeout=60,
+    )
+    assert result.returncode == 0, result.stderr
+    report = json.loads(result.stderr[result.stderr.index("\n{") + 1:])
+    phases = {p["phase"] for p in report["phases"]}
+    assert {"scan", "scan/list_files", "scan/analyze", "scan/symbols", "write", "write/render"} <= phases
+    assert report["counts"]["files_listed"] == 1
+    assert report["counts"]["bytes_written"] == (tmp_path / "product_documentation" / "UPDATE_PROMPT.md").stat().st_size
+    assert pstats.Stats(str(profile)).total_calls > 0
@@ -0,0 +1,70 @@
+from vdoc import scanner, tree
+
+def _classify(name):
+    return {"py": "Python", "ts": "TypeScript"}.get(name.rsplit(".", 1)[-1])
+
+def test_build_tree_aggregates_subtrees():
+    root = tree.build_tree(
+        ["a.py", "pkg/b.py", "pkg/c.ts", "pkg/sub/d.py", "pkg/sub/e.txt"], _classify
+    )
+    assert root.count == 5
+    assert root.files == ["a.py"]
+    pkg = root.dirs["pkg"]
+    assert pkg.count == 4
+    assert pkg.languages == {"Python": 2, "TypeScript": 1}
+    assert pkg.dirs["sub"].count == 2
+    assert tree.summarize(pkg) == "4 files: Python 67%, TypeScript 33%"
+
+def test_render_tree_collapses_below_depth():
+    paths = [f"core/engine/part{i}/m{j}.py" for i in range(3) for j in range(4)]
+    paths += [f"core/util{i}.py" for i in range(20)]
+    paths += ["deep/only/child/leaf.py"]
+    root = tree.build_tree(paths, _classify)
+
+    lines = tree.render_tree(root, max_depth=2, files_per_dir=5)
+    assert lines[0] == "- core/ (32 files: Python 100%)"
+    assert "  - engine/ (12 files: Python 100%)" in lines
+    # Third level is summarised, not expanded
+    assert not any("part0/" in line for line in lines)
+    assert "  - ... (15 more files)" in lines
+    # Single-child chains are folded into one line
+    assert "- deep/only/child/ (1 file: Python 100%)" in lines
+
+    expanded = tree.render_tree(root, max_depth=3, files_per_dir=5)
+    assert "    - part0/ (4 files: Python 100%)" in expanded
+
+def test_context_map_renders_tree(tmp_path):
+    pkg = tmp_path / "src" / "app" / "models"
+    pkg.mkdir(parents=True)
+    for i in range(3):
+        (pkg / f"model{i}.py").write_text("class Model:\n    pass\n")
+    (tmp_path / "src" / "app" / "main.py").write_text("def main():\n    pass\n")
+
+    scan = scanner.scan_project(tmp_path, use_cache=False)
+    text = scanner.render_context_map(scan)
+    assert "### src/ (4 files: Python 100%)" in text
+    assert "- app/ (4 files: Python 100%)" in text
+    assert "  - models/ (3 files: Python 100%)" in text
+    assert "  - main.py" in text
+    assert "model0.py" not in text.split("## Repository Map")[0]
+
+    deeper = scanner.render_context_map(scan, tree_depth=3)
+    assert "    - model0.py" in deeper
+
+def test_line_cap_keeps_directory_summaries():
+    paths = [f"api/sub{i:02d}/m{j}.py" for i in range(1, 41) for j in range(2)]
+    paths += [f"api/aa_{i:02d}.py" for i in range(30)] + ["api/main.py"]
+    root = tree.build_tree(paths, _classify)
+
+    lines = tree.render_tree(root.dirs["api"], files_per_dir=15, max_lines=50)
+    assert len(lines) <= 50
+    # Every subdirectory keeps its summary; only file lines are trimmed
+    assert sum(line.startswith("- sub") for line in lines) == 40
+    assert lines[-1] == "- ... (22 more files)"
+
+    # Levels that do not fit stay collapsed into their parents' summaries
+    small = tree.render_tree(root, max_depth=3, max_lines=5)
+    assert small == ["- api/ (111 files: Python 100%)"]
+    narrow = tree.render_tree(root.dirs["api"], max_lines=10)
+    assert narrow[-1] == "- ... (33 more directories, 29 more files)"
+    assert len(narrow) == 10
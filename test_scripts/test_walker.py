@@ -0,0 +1,37 @@
+import os
+from pathlib import Path
+import vdoc.scanner as scanner
+from vdoc import walker
+
+def _touch(path: Path):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text("")
+
+def test_fallback_walk_honours_ignore_files(tmp_path):
+    _touch(tmp_path / "src" / "app.py")
+    _touch(tmp_path / "src" / "app.pyc")
+    _touch(tmp_path / "node_modules" / "dep" / "index.js")
+    _touch(tmp_path / "dist" / "bundle.js")
+    _touch(tmp_path / "docs" / "secret.md")
+    _touch(tmp_path / "docs" / "guide.md")
+    _touch(tmp_path / ".hidden" / "x.py")
+    (tmp_path / ".gitignore").write_text("dist/\n")
+    (tmp_path / "docs" / ".vdocignore").write_text("secret.md\n")
+
+    assert scanner._walk_files(tmp_path) == ["docs/guide.md", "src/app.py"]
+
+def test_symlink_cycles_terminate(tmp_path):
+    _touch(tmp_path / "a" / "b" / "file.txt")
+    os.symlink(tmp_path / "a", tmp_path / "a" / "b" / "loop")
+
+    assert walker.walk(tmp_path) == ["a/b/file.txt"]
+    followed = walker.walk(tmp_path, follow_symlinks=True, workers=4)
+    assert followed == ["a/b/file.txt"]
+
+def test_parallel_and_serial_walks_agree(tmp_path):
+    for i in range(30):
+        _touch(tmp_path / f"d{i % 5}" / f"s{i}" / "f.py")
+    (tmp_path / "d1" / ".gitignore").write_text("s1/\n")
+    serial = sorted(walker.walk(tmp_path, workers=1))
+    assert serial == sorted(walker.walk(tmp_path, workers=8))
+    assert "d1/s1/f.py" not in serial and len(serial) == 30
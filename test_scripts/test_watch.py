@@ -0,0 +1,111 @@
+import subprocess
+import threading
+import time
+from pathlib import Path
+import pytest
+from vdoc import timing, watch
+
+def _project(root: Path):
+    (root / ".vdoc").mkdir()
+    (root / "src").mkdir()
+    (root / "src" / "app.py").write_text("def main():\n    pass\n")
+    (root / "node_modules" / "dep").mkdir(parents=True)
+    (root / "node_modules" / "dep" / "index.js").write_text("")
+
+def _wait_for(predicate, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.05)
+    return False
+
+def test_live_map_applies_events(tmp_path):
+    _project(tmp_path)
+    live = watch.LiveMap(tmp_path, use_cache=False)
+    assert live.rels == {"src/app.py"}
+
+    (tmp_path / "src" / "new.py").write_text("class New:\n    pass\n")
+    (tmp_path / "node_modules" / "dep" / "other.js").write_text("")
+    (tmp_path / "src" / "app.py").write_text("def main():\n    pass\n\ndef extra():\n    pass\n")
+    live.apply([
+        ("created", "src/new.py", False),
+        ("created", "node_modules/dep/other.js", False),
+        ("modified", "src/app.py", False),
+    ])
+    scan = live.render()
+    assert sorted(scan.files.rels()) == ["src/app.py", "src/new.py"]
+    assert scan.repo_map == {"src/app.py": ["def main", "def extra"], "src/new.py": ["class New"]}
+
+    (tmp_path / "src" / "new.py").unlink()
+    live.apply([("deleted", "src/new.py", False)])
+    assert "src/new.py" not in live.render().repo_map
+
+    live.apply([("deleted", "src", True)])
+    assert live.rels == set()
+
+def test_render_reads_only_changed_files(tmp_path):
+    _project(tmp_path)
+    (tmp_path / "src" / "models.py").write_text("class Model:\n    pass\n")
+    (tmp_path / "requirements.txt").write_text("flask\n")
+    live = watch.LiveMap(tmp_path, use_cache=False)
+    assert live.render().stats["frameworks"] == {"Flask"}
+
+    (tmp_path / "src" / "app.py").write_text("from . import models\n" * 3)
+    live.apply([("modified", "src/app.py", False)])
+    recorder = timing.enable()
+    try:
+        scan = live.render()
+    finally:
+        timing.disable()
+    counts = recorder.report()["counts"]
+    assert counts["files_measured"] == 1 and counts["import_files_parsed"] == 1
+    assert counts.get("manifests_parsed", 0) == 0
+    assert scan.stats["languages"]["Python"] == 5
+    assert scan.import_graph.edges == {"src/app.py": ["src/models.py"]}
+
+    (tmp_path / "requirements.txt").unlink()
+    live.apply([("deleted", "requirements.txt", False)])
+    assert live.render().stats["frameworks"] == set()
+
+def test_ignore_file_change_triggers_rescan(tmp_path):
+    _project(tmp_path)
+    subprocess.check_call(["git", "init", "-q", "."], cwd=tmp_path)
+    (tmp_path / ".gitignore").write_text("node_modules/\n")
+    live = watch.LiveMap(tmp_path, use_cache=False)
+    assert live.rels == {".gitignore", "src/app.py"}
+
+    (tmp_path / ".gitignore").write_text("node_modules/\nsrc/\n")
+    live.apply([("modified", ".gitignore", False)])
+    assert live.rels == {".gitignore"}
+    assert not live.file_included("src/later.py")
+
+@pytest.mark.parametrize("poll", [False, True])
+def test_watch_rewrites_map(tmp_path, monkeypatch, poll):
+    monkeypatch.setattr(watch, "POLL_INTERVAL", 0.05)
+    _project(tmp_path)
+    live = watch.LiveMap(tmp_path, use_cache=False)
+    map_path = tmp_path / ".vdoc" / "context_map.md"
+    live.write(map_path)
+
+    stop = threading.Event()
+    writes = []
+    thread = threading.Thread(
+        target=watch.watch,
+        args=(live, map_path),
+        kwargs={"poll": poll, "debounce": 0.05, "on_write": lambda n, s: writes.append(n), "stop": stop},
+    )
+    thread.start()
+    try:
+        time.sleep(0.2)
+        (tmp_path / "src" / "pkg").mkdir()
+        (tmp_path / "src" / "pkg" / "mod.py").write_text("def handler():\n    pass\n")
+        (tmp_path / "src" / "app.py").rename(tmp_path / "src" / "main.py")
+        assert _wait_for(lambda: "def handler" in map_path.read_text() and "src/main.py" in map_path.read_text())
+        assert "src/app.py" not in map_path.read_text()
+        # on_write runs just after the map is replaced
+        assert _wait_for(lambda: writes)
+    finally:
+        stop.set()
+        thread.join(5)
+    assert not thread.is_alive()
@@ -0,0 +1,81 @@
+import json
+from pathlib import Path
+from typer.testing import CliRunner
+from vdoc import symbols, workspace
+from vdoc.filetable import FileTable
+from vdoc.main import app
+from vdoc.scanner import _list_repo_files
+
+runner = CliRunner()
+
+def _write(path: Path, text: str = ""):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+
+def _monorepo(root: Path):
+    _write(root / "package.json", json.dumps({"workspaces": ["apps/*", "!apps/legacy"]}))
+    _write(root / "apps" / "web" / "package.json", json.dumps({"dependencies": {"next": "14"}}))
+    _write(root / "apps" / "web" / "pages" / "index.tsx", "export default function Home() {}\n")
+    _write(root / "apps" / "legacy" / "package.json", "{}")
+    _write(root / "go.work", "go 1.22\n\nuse (\n\t./services/auth // login\n)\nuse ./missing\n")
+    _write(root / "services" / "auth" / "go.mod", "module auth\n")
+    _write(root / "services" / "auth" / "main.go", "package main\n\nfunc Serve() {}\n")
+    _write(root / "pom.xml", "<project><modules><module>jvm/core</module></modules></project>")
+    _write(root / "jvm" / "core" / "pom.xml", "<project><modules><module>../shared</module></modules></project>")
+    _write(root / "jvm" / "core" / "App.java", "class App {}\n")
+    _write(root / "jvm" / "shared" / "Util.java", "class Util {}\n")
+    _write(root / "libs" / "py" / "pyproject.toml", "[project]\nname = 'py'\ndependencies = ['fastapi']\n")
+    _write(root / "libs" / "py" / "api.py", "def handler():\n    pass\n")
+    _write(root / "tools" / "lint.py", "def lint():\n    pass\n")
+
+def test_detect_packages(tmp_path):
+    _monorepo(tmp_path)
+    table = FileTable(tmp_path, _list_repo_files(tmp_path))
+    assert workspace.detect_packages(tmp_path, table) == {
+        "apps/web": "npm",
+        "jvm/core": "maven",
+        "jvm/shared": "maven",
+        "libs/py": "python",
+        "services/auth": "go",
+    }
+
+def test_build_workspace_writes_maps_and_reuses_cache(tmp_path, monkeypatch):
+    _monorepo(tmp_path)
+    (tmp_path / ".vdoc").mkdir()
+    index = workspace.build_workspace(tmp_path, workers=2)
+
+    text = "\n".join(index)
+    assert "### apps/web/ (npm)" in text
+    assert "- **Frameworks:** Next.js" in text
+    assert "- **Map:** .vdoc/packages/libs/py/context_map.md" in text
+    assert "### Shared (outside packages, 5 files: Python 100%)" in text
+    assert "- tools/ (1 file: Python 100%)" in text
+    assert (tmp_path / ".vdoc" / "packages" / "index.md").read_text() == text + "\n"
+
+    web_map = workspace.package_map_path(tmp_path, "apps/web").read_text()
+    assert "- pages/index.tsx: component Home" in web_map
+    assert "FastAPI" not in web_map
+    assert "- api.py: def handler" in workspace.package_map_path(tmp_path, "libs/py").read_text()
+
+    parsed = []
+    real = symbols.extract_symbols
+    monkeypatch.setattr(symbols, "extract_symbols", lambda text, lang: parsed.append(lang) or real(text, lang))
+    assert workspace.build_workspace(tmp_path, workers=1) == index
+    assert parsed == []
+
+def test_update_and_plan_in_workspace_mode(tmp_path, monkeypatch):
+    _monorepo(tmp_path)
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / ".vdoc").mkdir()
+    (tmp_path / ".vdoc" / "spec.md").write_text("# Spec")
+
+    result = runner.invoke(app, ["update", "--workspace"])
+    assert result.exit_code == 0
+    assert "# Workspace Index" in result.stdout
+
+    result = runner.invoke(app, ["plan", "--package", "services/auth"])
+    assert result.exit_code == 0
+    assert "- main.go: func Serve" in result.stdout
+
+    result = runner.invoke(app, ["plan", "--package", "nope"])
+    assert result.exit_code == 1